@@ -0,0 +1,108 @@
+"""
+Measure cold-import time of each package module
+
+Every module is imported in a fresh interpreter, so the numbers include
+everything it drags in. ``GOOGLE_API_KEY`` is removed from the environment to
+check that nothing needs it at import time.
+
+Usage:
+    python benchmarks/bench_import.py [--repeat 3] [--top 5]
+"""
+
+import os
+import sys
+import argparse
+import statistics
+import subprocess
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+MODULES = [
+    "src.paper_to_voice.core.config",
+    "src.paper_to_voice.utils.pdf_processor",
+    "src.paper_to_voice.utils.artifacts",
+    "src.paper_to_voice.audio.tts",
+    "src.paper_to_voice.audio.processor",
+    "src.paper_to_voice.jobs.queue",
+    "src.paper_to_voice.jobs.worker",
+    "src.paper_to_voice.pipeline",
+    "src.paper_to_voice.cli",
+    "src.paper_to_voice.workflow.orchestrator",
+]
+
+
+def _importtime(code: str) -> tuple[list[tuple[int, str]], str]:
+    env = {k: v for k, v in os.environ.items() if k != "GOOGLE_API_KEY"}
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, env=env, capture_output=True, text=True,
+    )
+    entries = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        entries.append((int(cumulative), name[1:]))
+    error = proc.stderr.strip().splitlines()[-1] if proc.returncode else ""
+    return entries, error
+
+
+_STARTUP = None
+
+
+def cold_import(module: str) -> tuple[float, list[tuple[int, str]], str]:
+    """
+    Import ``module`` in a fresh interpreter
+
+    Returns:
+        Tuple of (seconds, [(cumulative microseconds, top-level package)]
+        heaviest first, error message or "")
+    """
+    global _STARTUP
+    if _STARTUP is None:
+        # Modules the bare interpreter loads anyway are not the module's cost
+        _STARTUP = {name.strip() for _, name in _importtime("pass")[0]}
+    entries, error = _importtime(f"import {module}")
+    total = 0
+    packages = {}
+    stack = []
+    # importtime prints children before their parent; walk it parent-first
+    # and charge each third-party import made directly by our code to its
+    # top-level package (its cumulative time covers everything below it)
+    for cumulative, name in reversed(entries):
+        depth = len(name) - len(name.lstrip())
+        name = name.strip()
+        while stack and stack[-1][0] >= depth:
+            stack.pop()
+        parent = stack[-1][1] if stack else None
+        stack.append((depth, name))
+        if name == module:
+            total = cumulative
+        top = name.split(".")[0]
+        if top != "src" and name not in _STARTUP and (parent is None or parent.startswith("src.")):
+            packages[top] = packages.get(top, 0) + cumulative
+    ranked = sorted(((us, pkg) for pkg, us in packages.items()), reverse=True)
+    return total / 1e6, ranked, error
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per module (median is reported)")
+    parser.add_argument("--top", type=int, default=3, help="Heaviest top-level packages to list")
+    parser.add_argument("modules", nargs="*", default=MODULES)
+    args = parser.parse_args()
+
+    print(f"{'module':45} {'median':>9}  heaviest imports")
+    for module in args.modules:
+        runs = [cold_import(module) for _ in range(args.repeat)]
+        error = runs[-1][2]
+        if error:
+            print(f"{module:45} {'failed':>9}  {error}")
+            continue
+        seconds = statistics.median(run[0] for run in runs)
+        heaviest = ", ".join(f"{pkg} {us / 1e3:.0f}ms" for us, pkg in runs[-1][1][:args.top])
+        print(f"{module:45} {seconds * 1000:7.0f}ms  {heaviest}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Benchmark the NumPy mixing engine against the pydub ``sum(segments)`` path
+
+Usage:
+    python benchmarks/bench_mixer.py [--minutes 30] [--clip-seconds 6]
+"""
+
+import os
+import sys
+import time
+import argparse
+
+from pydub import AudioSegment
+from pydub.generators import Sine
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.paper_to_voice.audio.encoder import PcmFormat  # noqa: E402
+from src.paper_to_voice.audio.mixer import Mixer, array_to_pcm, pcm_to_array, tone_bed  # noqa: E402
+
+
+def make_clips(minutes: float, clip_seconds: float, fmt: PcmFormat) -> list[AudioSegment]:
+    count = int(minutes * 60 / clip_seconds)
+    base = [
+        Sine(freq, sample_rate=fmt.frame_rate).to_audio_segment(duration=clip_seconds * 1000)
+        .set_channels(fmt.channels).set_sample_width(fmt.sample_width)
+        for freq in (180, 240)
+    ]
+    return [base[i % 2] for i in range(count)]
+
+
+def bench_pydub(clips: list[AudioSegment]) -> tuple[float, int]:
+    start = time.perf_counter()
+    combined = sum(clips)
+    return time.perf_counter() - start, len(combined.raw_data)
+
+
+def bench_numpy(clips: list[AudioSegment], fmt: PcmFormat) -> tuple[float, int]:
+    start = time.perf_counter()
+    mixer = Mixer(fmt, bed=tone_bed(1000, fmt), speaker_gains_db={"A": -1.0, "B": 1.5})
+    written = 0
+    for i, clip in enumerate(clips):
+        block = mixer.add(pcm_to_array(clip.raw_data, fmt), "A" if i % 2 else "B")
+        written += len(array_to_pcm(block))
+    written += len(array_to_pcm(mixer.finish()))
+    return time.perf_counter() - start, written
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--minutes", type=float, default=30)
+    parser.add_argument("--clip-seconds", type=float, default=6)
+    args = parser.parse_args()
+
+    fmt = PcmFormat()
+    clips = make_clips(args.minutes, args.clip_seconds, fmt)
+    print(f"{len(clips)} clips, {args.minutes:g} min episode, {fmt.frame_rate} Hz x {fmt.channels} ch")
+
+    numpy_seconds, numpy_bytes = bench_numpy(clips, fmt)
+    print(f"numpy mixer (crossfade + ducked bed + gain): {numpy_seconds:8.3f}s  {numpy_bytes / 1e6:8.1f} MB")
+
+    pydub_seconds, pydub_bytes = bench_pydub(clips)
+    print(f"pydub sum (butt-join only):                 {pydub_seconds:8.3f}s  {pydub_bytes / 1e6:8.1f} MB")
+    print(f"speedup: {pydub_seconds / numpy_seconds:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,337 @@
+"""
+End-to-end benchmark: PDF in, podcast out, with stand-ins for Gemini and TTS
+
+Drives the real ``run_pipeline`` (page rendering, image encoding, the
+LangGraph workflow, utterance scheduling, post-processing, mixing and
+encoding) over a corpus of PDFs. The network services are replaced by
+stand-ins that sleep for a configurable latency, so the numbers show what the
+pipeline itself costs and how it behaves under concurrency.
+
+Reports p50/p95 per stage, throughput for each concurrency level, LLM
+requests and page images sent, and peak memory. --pages builds long documents
+by repeating the corpus pages, to compare whole-document and map-reduce
+analysis (MAP_REDUCE_MIN_PAGES) as page count grows. With --memory, each job also reports the memory charged to each
+stage (use --concurrency 1 for exact attribution).
+
+Usage:
+    python benchmarks/bench_pipeline.py [--corpus examples] [--concurrency 1 4]
+        [--llm-latency 1.0] [--llm-image-latency 0.05] [--tts-latency 0.3]
+        [--steps 3] [--turns 8] [--pages 120]
+        [--trace-memory] [--memory] [--memory-ceiling 512] [--json results.json]
+
+Set OUTPUT_CODEC=wav to benchmark without ffmpeg.
+"""
+
+import io
+import os
+import sys
+import glob
+import json
+import math
+import time
+import wave
+import random
+import resource
+import argparse
+import tempfile
+import threading
+import tracemalloc
+from contextlib import redirect_stdout
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pypdfium2 as pdfium
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+# Every utterance must reach the TTS stand-in and every paper the LLM stand-in,
+# or repeated runs measure the caches
+os.environ.setdefault("TTS_CACHE_ENABLED", "0")
+os.environ.setdefault("STAGE_CACHE_ENABLED", "0")
+os.environ.setdefault("PAPER_STORE_ENABLED", "0")
+os.environ["TTS_BACKEND"] = "bench"
+
+from src.paper_to_voice.core.config import TEMP_DIR, OUTPUT_CODEC, set_llm_factory  # noqa: E402
+from src.paper_to_voice.core.memory import MemoryAccountant  # noqa: E402
+from src.paper_to_voice.audio.encoder import CODECS  # noqa: E402
+from src.paper_to_voice.audio.backends import TTSBackend, register_backend  # noqa: E402
+from src.paper_to_voice.pipeline import run_pipeline  # noqa: E402
+
+STAGES = ["render", "encode", "workflow", "tts", "audio", "total"]
+
+SENTENCE = ("The proposed method improves accuracy on the benchmark while using a fraction of the compute, "
+            "which matters for anyone deploying these models at scale.")
+
+
+class _Response:
+    def __init__(self, content: str):
+        self.content = content
+
+
+class StandInLLM:
+    """
+    Answers each workflow prompt with a well-formed canned response after a
+    simulated service latency
+    """
+
+    def __init__(self, latency: float, jitter: float, steps: int, turns: int, image_latency: float = 0.0,
+                 seed: int = 0):
+        self.latency = latency
+        self.jitter = jitter
+        self.steps = steps
+        self.turns = turns
+        self.image_latency = image_latency
+        self.calls = 0
+        self.images = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _prompt(self, messages) -> tuple[str, int]:
+        parts, images = [], 0
+        for message in messages:
+            content = getattr(message, "content", message)
+            if isinstance(content, list):
+                parts.extend(part.get("text", "") for part in content if isinstance(part, dict))
+                images += sum(1 for part in content if isinstance(part, dict) and part.get("type") == "image_url")
+            else:
+                parts.append(str(content))
+        return "\n".join(parts), images
+
+    def _respond(self, prompt: str) -> str:
+        if "Outlines:" in prompt:
+            sections = max(1, prompt.count("\nSection "))
+            return json.dumps([
+                {"step": f"Step {i + 1} of the method", "sections": [i * sections // self.steps + 1],
+                 "substeps": [{"key": f"Detail {j + 1}", "value": f"What does detail {j + 1} of step {i + 1} do?"}
+                              for j in range(2)]}
+                for i in range(self.steps)
+            ])
+        if "parse this data into json" in prompt:
+            return json.dumps([
+                {"step": f"Step {i + 1} of the method",
+                 "substeps": [{"key": f"Detail {j + 1}", "value": f"What does detail {j + 1} of step {i + 1} do?"}
+                              for j in range(2)]}
+                for i in range(self.steps)
+            ])
+        if "Questions:" in prompt:
+            return "\n".join(f"Question {i + 1}\nAnswer: {SENTENCE}" for i in range(2))
+        if "Dr. Sharma" in prompt:
+            speakers = ["Jane", "Dr. Sharma"]
+            lines = [f"{speakers[i % 2]}: {SENTENCE}" for i in range(self.turns)]
+            return "## Podcast Script\n\n" + "\n\n".join(lines)
+        return "\n".join(f"## Step {i + 1}\n- Detail 1\n- Detail 2" for i in range(self.steps))
+
+    def invoke(self, messages) -> _Response:
+        prompt, images = self._prompt(messages)
+        with self._lock:
+            self.calls += 1
+            self.images += images
+            delay = max(0.0, self._rng.gauss(self.latency, self.jitter)) + images * self.image_latency
+        time.sleep(delay)
+        return _Response(self._respond(prompt))
+
+
+class StandInTTS(TTSBackend):
+    """Writes a tone lasting as long as the text would take to speak, after a simulated latency"""
+
+    name = "bench"
+    model = "bench"
+
+    def __init__(self, latency: float, jitter: float, words_per_second: float = 2.5,
+                 frame_rate: int = 44100, seed: int = 0):
+        self.latency = latency
+        self.jitter = jitter
+        self.words_per_second = words_per_second
+        self.frame_rate = frame_rate
+        self.calls = 0
+        self.output_dir = os.path.join(TEMP_DIR, "tts_bench")
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def synthesize(self, text: str, speed: float, accent: str, language: str) -> str:
+        with self._lock:
+            self.calls += 1
+            delay = max(0.0, self._rng.gauss(self.latency, self.jitter))
+        time.sleep(delay)
+
+        seconds = max(0.5, len(text.split()) / self.words_per_second / speed)
+        t = np.arange(int(seconds * self.frame_rate)) / self.frame_rate
+        samples = (0.3 * np.sin(2 * np.pi * 220 * t) * 32767).astype("<i2")
+        os.makedirs(self.output_dir, exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=self.output_dir, delete=False, suffix=".wav") as temp_file:
+            output_path = temp_file.name
+        with wave.open(output_path, "wb") as out:
+            out.setnchannels(1)
+            out.setsampwidth(2)
+            out.setframerate(self.frame_rate)
+            out.writeframes(samples.tobytes())
+        return output_path
+
+
+def long_document(pdfs: list[str], pages: int, directory: str) -> str:
+    """
+    Build a PDF of ``pages`` pages by repeating the corpus pages
+
+    Returns:
+        Path of the new document
+    """
+    document = pdfium.PdfDocument.new()
+    sources = [pdfium.PdfDocument(pdf) for pdf in pdfs]
+    while len(document) < pages:
+        for source in sources:
+            document.import_pages(source, list(range(min(len(source), pages - len(document)))))
+            if len(document) >= pages:
+                break
+    path = os.path.join(directory, f"long-{pages}.pdf")
+    document.save(path)
+    return path
+
+
+def percentile(values: list[float], p: float) -> float:
+    """Nearest-rank percentile"""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+
+def run_level(pdfs: list[str], concurrency: int, jobs: int, output_dir: str,
+              memory: bool = False, ceiling_bytes: int = 0) -> dict:
+    """
+    Run ``jobs`` papers (cycling through the corpus) with ``concurrency`` in flight
+
+    With ``memory`` set, every job runs with a MemoryAccountant (optionally
+    under ``ceiling_bytes``) and the per-stage peaks are summarised too.
+
+    Returns:
+        Summary with per-stage percentiles, throughput and failures
+    """
+    papers = [pdfs[i % len(pdfs)] for i in range(jobs)]
+
+    def convert(index_pdf):
+        index, pdf = index_pdf
+        output_path = os.path.join(output_dir, f"{concurrency}-{index}{CODECS[OUTPUT_CODEC].extension}")
+        accountant = MemoryAccountant(ceiling_bytes, enabled=True) if memory else None
+        return run_pipeline(pdf, output_path, memory=accountant)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(convert, enumerate(papers)))
+    wall = time.perf_counter() - start
+
+    failed = [r for r in results if not r.ok]
+    succeeded = [r for r in results if r.ok]
+    stages = {}
+    for stage in STAGES:
+        values = [r.timings[stage] for r in succeeded if stage in r.timings]
+        if values:
+            stages[stage] = {"p50": percentile(values, 50), "p95": percentile(values, 95)}
+    memory_stages = {}
+    reports = [r.stats["memory"] for r in succeeded if "memory" in r.stats]
+    for label in sorted({label for report in reports for label in report["stages"]}):
+        values = [report["stages"][label]["peak_bytes"] for report in reports if label in report["stages"]]
+        memory_stages[label] = {"p50": percentile(values, 50), "p95": percentile(values, 95)}
+    for result in succeeded:
+        os.remove(result.output_path)
+    return {
+        "concurrency": concurrency,
+        "jobs": jobs,
+        "failed": len(failed),
+        "errors": sorted({(r.error or "no audio produced").strip().splitlines()[-1] for r in failed}),
+        "wall_seconds": wall,
+        "jobs_per_minute": len(succeeded) / wall * 60 if wall else 0.0,
+        "stages": stages,
+        "memory_stages": memory_stages,
+        "degraded": sorted({d["action"] for report in reports for d in report["degraded"]}),
+    }
+
+
+def print_level(level: dict) -> None:
+    pages = f"{level['pages']} pages, " if level.get("pages") else ""
+    print(f"\n{pages}concurrency {level['concurrency']}: {level['jobs']} job(s) in {level['wall_seconds']:.1f}s, "
+          f"{level['jobs_per_minute']:.1f} jobs/min, {level['failed']} failed, "
+          f"{level['llm_calls'] / level['jobs']:.0f} LLM calls and {level['llm_images'] / level['jobs']:.0f} "
+          f"page images per job")
+    for error in level["errors"]:
+        print(f"  error: {error}")
+    print(f"  {'stage':10} {'p50':>9} {'p95':>9}")
+    for stage, values in level["stages"].items():
+        print(f"  {stage:10} {values['p50']:8.2f}s {values['p95']:8.2f}s")
+    if level["memory_stages"]:
+        print(f"  {'memory':30} {'p50':>9} {'p95':>9}")
+        for label, values in level["memory_stages"].items():
+            print(f"  {label:30} {values['p50'] / 2 ** 20:5.1f} MiB {values['p95'] / 2 ** 20:5.1f} MiB")
+    for action in level["degraded"]:
+        print(f"  degraded: {action}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", default=os.path.join(os.path.dirname(__file__), "..", "examples"),
+                        help="Directory of sample PDFs (default: examples/)")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4], help="Jobs in flight per level")
+    parser.add_argument("--jobs", type=int, help="Jobs per level (default: 2 x max(concurrency, corpus size))")
+    parser.add_argument("--llm-latency", type=float, default=1.0, help="Mean seconds per LLM call")
+    parser.add_argument("--llm-jitter", type=float, default=0.2)
+    parser.add_argument("--llm-image-latency", type=float, default=0.05,
+                        help="Extra seconds per page image in an LLM request")
+    parser.add_argument("--tts-latency", type=float, default=0.3, help="Mean seconds per TTS request")
+    parser.add_argument("--tts-jitter", type=float, default=0.1)
+    parser.add_argument("--steps", type=int, default=3, help="Analysis steps per paper (workflow fan-out)")
+    parser.add_argument("--turns", type=int, default=8, help="Dialog lines per step")
+    parser.add_argument("--pages", type=int, nargs="+",
+                        help="Instead of the corpus, convert documents of these page counts built from it")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="Also report peak Python heap via tracemalloc (slows the run)")
+    parser.add_argument("--memory", action="store_true",
+                        help="Report memory charged to each stage (tracemalloc; slows the run)")
+    parser.add_argument("--memory-ceiling", type=float, default=0,
+                        help="Per-job memory ceiling in MiB enforced by degrading (implies --memory)")
+    parser.add_argument("--json", help="Write the results to this file")
+    parser.add_argument("--verbose", action="store_true", help="Show pipeline output")
+    args = parser.parse_args()
+
+    pdfs = sorted(glob.glob(os.path.join(args.corpus, "*.pdf")))
+    if not pdfs:
+        parser.error(f"no PDFs found in {args.corpus}")
+
+    llm = StandInLLM(args.llm_latency, args.llm_jitter, args.steps, args.turns, args.llm_image_latency)
+    tts = StandInTTS(args.tts_latency, args.tts_jitter)
+    set_llm_factory(lambda: llm)
+    register_backend("bench", lambda: tts)
+
+    print(f"{len(pdfs)} PDF(s) from {args.corpus}; LLM {args.llm_latency}s, TTS {args.tts_latency}s per call; "
+          f"{args.steps} steps x {args.turns} turns")
+    if args.trace_memory:
+        tracemalloc.start()
+
+    levels = []
+    with tempfile.TemporaryDirectory() as output_dir:
+        corpora = [(None, pdfs)]
+        if args.pages:
+            corpora = [(pages, [long_document(pdfs, pages, output_dir)]) for pages in args.pages]
+        for pages, corpus in corpora:
+            for concurrency in args.concurrency:
+                jobs = args.jobs or 2 * max(concurrency, len(corpus))
+                calls, images = llm.calls, llm.images
+                with redirect_stdout(sys.stdout if args.verbose else io.StringIO()):
+                    level = run_level(corpus, concurrency, jobs, output_dir, args.memory or args.memory_ceiling > 0,
+                                      int(args.memory_ceiling * 2 ** 20))
+                level.update(pages=pages, llm_calls=llm.calls - calls, llm_images=llm.images - images)
+                levels.append(level)
+                print_level(level)
+
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+    memory = {"peak_rss_bytes": peak_rss}
+    if args.trace_memory:
+        memory["peak_heap_bytes"] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    print(f"\npeak RSS {peak_rss / 2 ** 20:.0f} MiB"
+          + (f", peak Python heap {memory['peak_heap_bytes'] / 2 ** 20:.0f} MiB" if args.trace_memory else "")
+          + f"; {llm.calls} LLM calls, {tts.calls} TTS requests")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"config": vars(args), "levels": levels, "memory": memory}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,119 +3,129 @@ Main Streamlit application for Paper to Voice Assistant
 """
 
 import os
+import time
+import hashlib
+import tempfile
 import streamlit as st
-import traceback
 
-from src.paper_to_voice.utils.pdf_processor import process_pdf, encode_image_to_base64
-from src.paper_to_voice.workflow.orchestrator import create_podcast_workflow
-from src.paper_to_voice.audio.processor import store_voice, consolidate_voice
-from src.paper_to_voice.audio.tts import generate_podcast_audio
-from src.paper_to_voice.core.config import TEMP_DIR, VOICES_DIR
+from src.paper_to_voice.audio.encoder import CODECS
+from src.paper_to_voice.jobs.queue import get_default_queue, QUEUED
+from src.paper_to_voice.jobs.worker import ensure_workers
+from src.paper_to_voice.core.config import (
+    TEMP_DIR, PROGRESSIVE_UPDATE_EVERY, OUTPUT_CODEC, JOB_EMBEDDED_WORKERS, JOB_POLL_INTERVAL
+)
+
+
+@st.cache_resource
+def get_queue():
+    """Job queue shared by every session of this server process"""
+    queue = get_default_queue()
+    if JOB_EMBEDDED_WORKERS:
+        ensure_workers()
+    return queue
+
+
+@st.cache_data(show_spinner=False)
+def digest(data: bytes) -> str:
+    """Content hash of an upload, memoized so reruns do not rehash it"""
+    return hashlib.sha256(data).hexdigest()
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def load_podcast(output_path: str, mtime: float) -> bytes:
+    """Finished podcast bytes, memoized per file version"""
+    with open(output_path, "rb") as f:
+        return f.read()
+
+
+def submit_upload(uploaded_pdf, tone: str, language: str, length: str) -> str:
+    """
+    Queue an uploaded PDF unless the same paper was already submitted with
+    the same settings (by any session) and has not failed
+
+    Returns:
+        Job identifier
+    """
+    queue = get_queue()
+    data = uploaded_pdf.getvalue()
+    input_hash = digest(data)
+    job = queue.find(input_hash, tone=tone, language=language, length=length)
+    if job and (not job.done or os.path.exists(job.output_path or "")):
+        return job.id
+
+    os.makedirs(TEMP_DIR, exist_ok=True)
+    with tempfile.NamedTemporaryFile(dir=TEMP_DIR, suffix=".pdf", delete=False) as f:
+        f.write(data)
+    try:
+        return queue.submit(f.name, input_hash=input_hash, tone=tone, language=language, length=length)
+    finally:
+        os.remove(f.name)
 
 
 def main():
     """Main Streamlit application"""
     st.title("📄 Research Paper Podcast Generator 🎙️")
-    
+
+    queue = get_queue()
+
     # Sidebar for configuration
     st.sidebar.header("Configuration")
     tone = st.sidebar.selectbox("Podcast Tone", ["Formal", "Conversational"])
     language = st.sidebar.selectbox("Language", ["EN"])
+    length = st.sidebar.selectbox("Length", ["Short (1-2 min)", "Medium (3-5 min)"])
+    st.sidebar.caption("Queue: " + ", ".join(f"{count} {status}" for status, count in queue.counts().items()))
 
     # PDF Upload
     uploaded_pdf = st.file_uploader("Upload Research Paper (PDF)", type=['pdf'])
-    
+
     if uploaded_pdf is not None:
+        # The job runs in a background worker; this script run only polls it.
+        # Reruns with the same file and settings attach to the existing job;
+        # new settings for the same paper reuse its analysis.
+        job_id = submit_upload(uploaded_pdf, tone, language, length)
+
         # Progress tracking
         progress_bar = st.progress(0)
         status_text = st.empty()
+        audio_placeholder = st.empty()
 
-        try:
-            # Ensure temp directory exists
-            os.makedirs(TEMP_DIR, exist_ok=True)
-            
-            # Save uploaded PDF
-            pdf_path = os.path.join(TEMP_DIR, uploaded_pdf.name)
-            with open(pdf_path, "wb") as f:
-                f.write(uploaded_pdf.getbuffer())
-
-            # Process PDF into images
-            status_text.text("Processing PDF pages...")
-            progress_bar.progress(10)
-            image_paths = process_pdf(pdf_path)
-            
-            # Encode images
-            encoded_images = [
-                encode_image_to_base64(os.path.join(TEMP_DIR, f"Photo_{i:03d}.jpg")) 
-                for i in range(len(image_paths))
-            ]
-
-            # Create workflow
-            status_text.text("Generating podcast workflow...")
-            progress_bar.progress(30)
-            workflow_app, _ = create_podcast_workflow()
-
-            # Run workflow
-            status_text.text("Analyzing research paper...")
-            progress_bar.progress(50)
-            output = list(workflow_app.stream({'image_path': encoded_images}))
-
-            # Extract dialog
-            status_text.text("Generating podcast dialog...")
-            progress_bar.progress(70)
-            dialog_planner = {}
-            
-            # Extract dialogs from workflow output
-            for responses in output[10:17]:
-                if 'generate_dialog' in responses:
-                    dialog = responses['generate_dialog']['Dialog'][0]
-                    dialog = dialog.strip().split('## Podcast Script')[-1].strip()
-                    dialog = dialog.replace('[Guest name]', 'Dr. Sharma')
-                    dialog = dialog.replace('**Guest:**', '**Dr. Sharma**')
-                    dialog_planner[len(dialog_planner)] = dialog
-            
-            print("Dialog planner:", dialog_planner)
-
-            # Generate audio
-            status_text.text("Synthesizing podcast audio...")
-            progress_bar.progress(90)
-            
-            # Temporary directory for voice generation
-            voice_dir = os.path.join(TEMP_DIR, VOICES_DIR)
-            os.makedirs(voice_dir, exist_ok=True)
-
-            # Generate voice for each dialog part
-            audio_paths = []
-            for _, dialog in dialog_planner.items():
-                dialog_parts = dialog.split('\n')
-                for part in dialog_parts:
-                    if len(part.strip()) > 0:
-                        try:
-                            audio_file = generate_podcast_audio(part.strip(), language)
-                            if audio_file != 'Empty Text':
-                                audio_paths.append(audio_file)
-                        except Exception as e:
-                            st.warning(f"Could not generate voice for part: {e}")
-
-            # Consolidate voice tracks
-            print("Audio paths:", audio_paths)
-            final_audio_path = consolidate_voice(audio_paths, voice_dir)
-            print("Final audio path:", final_audio_path)
-
-            # Final display
-            progress_bar.progress(100)
-            status_text.text("Podcast generation complete!")
-
-            # Play audio
-            if final_audio_path:
-                st.audio(final_audio_path, format="audio/mpeg")
-                st.success("🎉 Podcast generated successfully!")
+        shown_segments = 0
+        job = queue.get(job_id)
+        while not job.done:
+            if job.status == QUEUED:
+                status_text.text(f"Waiting for a worker ({queue.position(job_id)} job(s) ahead)...")
             else:
-                st.warning("No audio was generated. Please check your PDF and try again.")
-
-        except Exception as e:
-            st.error(f"An error occurred: {traceback.format_exc()}")
+                status_text.text(job.message or "Working...")
+            progress_bar.progress(job.progress)
+            # Re-render the player so the episode so far can be played
+            # (the partial file lives in the job's workspace until it finishes)
+            if (job.partial_path and job.partial_segments >= shown_segments + PROGRESSIVE_UPDATE_EVERY
+                    and os.path.exists(job.partial_path)):
+                audio_placeholder.audio(job.partial_path, format=CODECS[OUTPUT_CODEC].mime)
+                shown_segments = job.partial_segments
+            time.sleep(JOB_POLL_INTERVAL)
+            job = queue.get(job_id)
+
+        progress_bar.progress(job.progress)
+        status_text.text(job.message or "")
+        result = job.result or {}
+        for warning in result.get("warnings", []):
+            st.warning(warning)
+
+        if job.error:
+            st.error(f"An error occurred: {job.error}")
             st.error("Please check your PDF and try again.")
+        elif job.output_path and os.path.exists(job.output_path):
+            # Play audio
+            podcast = load_podcast(job.output_path, os.path.getmtime(job.output_path))
+            audio_placeholder.audio(podcast, format=CODECS[OUTPUT_CODEC].mime)
+            st.success("🎉 Podcast generated successfully!")
+            reused = result.get("stats", {}).get("reused")
+            if reused and (reused["stages"] or reused["dialogs"]):
+                st.caption(f"Reused from an earlier run: {', '.join(reused['stages']) or 'nothing'} "
+                           f"({reused['dialogs']} of {result['stats']['dialogs']} dialogs)")
+        else:
+            st.warning("No audio was generated. Please check your PDF and try again.")
 
 
 if __name__ == "__main__":
@@ -44,7 +44,7 @@ setup(
     },
     entry_points={
         "console_scripts": [
-            "paper-to-voice=paper_to_voice.main:main",
+            "paper-to-voice=paper_to_voice.cli:main",
         ],
     },
 )
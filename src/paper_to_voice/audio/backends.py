@@ -0,0 +1,150 @@
+"""
+Pluggable text-to-speech backends
+"""
+
+import os
+import threading
+from abc import ABC, abstractmethod
+from tempfile import NamedTemporaryFile
+
+from ..core.config import TTS_MODEL, TTS_BACKEND, TTS_LOCAL_DEVICE, TEMP_DIR
+
+
+class TTSBackend(ABC):
+    """
+    Interface for a speech synthesizer.
+
+    ``model`` identifies the voice model and is part of the utterance cache
+    key, so two backends never share cached audio.
+    """
+
+    name = "base"
+    model = ""
+
+    @abstractmethod
+    def synthesize(self, text: str, speed: float, accent: str, language: str) -> str:
+        """
+        Synthesize one utterance
+
+        Args:
+            text: Text to convert to speech
+            speed: Speaking speed
+            accent: Voice accent
+            language: Language code
+
+        Returns:
+            Path to the generated audio file
+        """
+
+
+class RemoteSpaceBackend(TTSBackend):
+    """MeloTTS hosted on a Hugging Face Space, called through gradio_client"""
+
+    name = "remote"
+
+    def __init__(self, space: str = TTS_MODEL):
+        self.model = space
+        self._local = threading.local()
+
+    def _client(self):
+        # gradio clients hold a websocket session, so keep one per thread
+        if getattr(self._local, "client", None) is None:
+            from gradio_client import Client
+            self._local.client = Client(self.model)
+        return self._local.client
+
+    def synthesize(self, text: str, speed: float, accent: str, language: str) -> str:
+        return self._client().predict(
+            text=text,
+            language=language,
+            speaker=accent,
+            speed=speed,
+            api_name="/synthesize",
+        )
+
+
+class LocalMeloBackend(TTSBackend):
+    """
+    MeloTTS running in-process on this machine.
+
+    Requires the ``melotts`` package. One model is loaded per language on first
+    use; inference on a model is serialized, so scale out with processes.
+    """
+
+    name = "local"
+
+    def __init__(self, device: str = TTS_LOCAL_DEVICE, output_dir: str = None):
+        self.device = device
+        self.model = f"melotts-local:{device}"
+        self.output_dir = output_dir or os.path.join(TEMP_DIR, "tts_local")
+        self._models = {}
+        self._lock = threading.Lock()
+
+    def _load(self, language: str):
+        with self._lock:
+            if language not in self._models:
+                try:
+                    from melo.api import TTS
+                except ImportError as e:
+                    raise ImportError(
+                        "The local TTS backend requires MeloTTS: pip install melotts"
+                    ) from e
+                self._models[language] = (TTS(language=language, device=self.device), threading.Lock())
+            return self._models[language]
+
+    def synthesize(self, text: str, speed: float, accent: str, language: str) -> str:
+        tts, model_lock = self._load(language)
+        speaker_ids = tts.hps.data.spk2id
+        if accent not in speaker_ids:
+            raise ValueError(f"Unknown accent {accent!r} for language {language}")
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        with NamedTemporaryFile(dir=self.output_dir, delete=False, suffix=".wav") as temp_file:
+            output_path = temp_file.name
+        with model_lock:
+            tts.tts_to_file(text, speaker_ids[accent], output_path, speed=speed, quiet=True)
+        return output_path
+
+
+_REGISTRY = {}
+_INSTANCES = {}
+_INSTANCES_LOCK = threading.Lock()
+
+
+def register_backend(name: str, factory) -> None:
+    """
+    Register a TTS backend under a name selectable through ``TTS_BACKEND``
+
+    Args:
+        name: Backend name
+        factory: Zero-argument callable returning a TTSBackend
+    """
+    _REGISTRY[name] = factory
+    _INSTANCES.pop(name, None)
+
+
+def available_backends() -> list[str]:
+    return sorted(_REGISTRY)
+
+
+def get_backend(name: str = None) -> TTSBackend:
+    """
+    Return the shared instance of a registered backend
+
+    Args:
+        name: Backend name (default: the ``TTS_BACKEND`` setting)
+
+    Returns:
+        TTSBackend instance
+    """
+    name = name or TTS_BACKEND
+    if name not in _REGISTRY:
+        raise ValueError(f"Unknown TTS backend {name!r}; available: {available_backends()}")
+    with _INSTANCES_LOCK:
+        if name not in _INSTANCES:
+            _INSTANCES[name] = _REGISTRY[name]()
+        return _INSTANCES[name]
+
+
+register_backend(RemoteSpaceBackend.name, RemoteSpaceBackend)
+register_backend(LocalMeloBackend.name, LocalMeloBackend)
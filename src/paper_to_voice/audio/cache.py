@@ -0,0 +1,174 @@
+"""
+Content-addressed on-disk cache for synthesized utterances
+"""
+
+import os
+import re
+import shutil
+import hashlib
+import threading
+
+from ..core.config import TTS_CACHE_DIR, TTS_CACHE_MAX_BYTES
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normalize utterance text so trivially different lines share a cache entry
+
+    Args:
+        text: Raw utterance text
+
+    Returns:
+        Text with collapsed whitespace and no surrounding blanks
+    """
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def make_cache_key(text: str, accent: str, speed: float, language: str, model: str) -> str:
+    """
+    Build the cache key for one utterance
+
+    Args:
+        text: Utterance text
+        accent: Voice accent
+        speed: Speaking speed
+        language: Language code
+        model: TTS model identifier
+
+    Returns:
+        Hex digest identifying the synthesized audio
+    """
+    material = "\x1f".join([normalize_text(text), accent, f"{speed:.3f}", language, model])
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class TTSCache:
+    """
+    Size-capped LRU cache of audio files.
+
+    Entries live at ``<cache_dir>/<key[:2]>/<key><ext>``. Recency is stored in
+    the file modification time, so the LRU order survives restarts without a
+    separate index.
+    """
+
+    def __init__(self, cache_dir: str = TTS_CACHE_DIR, max_bytes: int = TTS_CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+        self._size = sum(size for _, _, size in self._entries())
+
+    def _entries(self):
+        # Other processes sharing the directory may remove files mid-walk
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if name.startswith("."):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    info = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                yield path, info.st_mtime, info.st_size
+
+    def _find(self, key: str) -> str | None:
+        shard = os.path.join(self.cache_dir, key[:2])
+        if not os.path.isdir(shard):
+            return None
+        for name in os.listdir(shard):
+            if name.startswith(key):
+                return os.path.join(shard, name)
+        return None
+
+    def get(self, key: str) -> str | None:
+        """
+        Look up a cached audio file and mark it as recently used
+
+        Args:
+            key: Cache key from ``make_cache_key``
+
+        Returns:
+            Path to the cached file, or None on a miss
+        """
+        with self._lock:
+            path = self._find(key)
+            try:
+                if path is None:
+                    raise FileNotFoundError(key)
+                os.utime(path)
+            except FileNotFoundError:
+                # Missing, or evicted by another process since it was found
+                self.misses += 1
+                return None
+            self.hits += 1
+            return path
+
+    def put(self, key: str, source_path: str, move: bool = False) -> str:
+        """
+        Copy a freshly synthesized file into the cache
+
+        Args:
+            key: Cache key from ``make_cache_key``
+            source_path: Path to the synthesized audio file
+            move: Remove ``source_path`` once it is cached
+
+        Returns:
+            Path to the cached copy
+        """
+        ext = os.path.splitext(source_path)[1] or ".wav"
+        shard = os.path.join(self.cache_dir, key[:2])
+        os.makedirs(shard, exist_ok=True)
+        target = os.path.join(shard, key + ext)
+        # Thread ids repeat across processes sharing the directory
+        staging = os.path.join(shard, f".{key}.{os.getpid()}.{threading.get_ident()}.tmp")
+        shutil.copyfile(source_path, staging)
+        if move:
+            os.remove(source_path)
+        with self._lock:
+            previous = self._find(key)
+            if previous:
+                try:
+                    self._size -= os.path.getsize(previous)
+                except FileNotFoundError:
+                    pass
+            os.replace(staging, target)
+            self._size += os.path.getsize(target)
+            self._evict(keep=target)
+        return target
+
+    def _evict(self, keep: str) -> None:
+        if self._size <= self.max_bytes:
+            return
+        # The running size only counts this process's writes; recount the
+        # directory before evicting anything
+        entries = list(self._entries())
+        self._size = sum(size for _, _, size in entries)
+        for path, _, size in sorted(entries, key=lambda entry: entry[1]):
+            if self._size <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass  # already evicted by another process
+            self._size -= size
+
+    @property
+    def size_bytes(self) -> int:
+        return self._size
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hit_rate, 3),
+            "size_bytes": self._size,
+        }
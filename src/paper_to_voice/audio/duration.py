@@ -0,0 +1,160 @@
+"""
+Speech duration estimates for scripts, calibrated from synthesized clips
+"""
+
+import os
+import json
+import wave
+import threading
+from dataclasses import dataclass
+
+from pydub import AudioSegment
+
+from ..core.config import SECONDS_PER_WORD, SPEECH_RATE_PATH
+from .script import Utterance
+
+
+def clip_seconds(audio_path: str) -> float | None:
+    """
+    Duration of an audio file, or None if it cannot be read
+
+    WAV headers are read directly; other formats are decoded.
+    """
+    try:
+        with wave.open(audio_path) as clip:
+            return clip.getnframes() / clip.getframerate()
+    except (wave.Error, EOFError, OSError):
+        pass
+    try:
+        return AudioSegment.from_file(audio_path).duration_seconds
+    except Exception:
+        return None
+
+
+class DurationEstimator:
+    """
+    Predicts how long a line takes to speak from its word count and voice speed.
+
+    The rate is seconds per word at speed 1.0, kept per language as an
+    exponentially weighted average of synthesized clips and persisted in a
+    small JSON file, so estimates follow the TTS backend actually in use.
+    """
+
+    def __init__(self, path: str = SPEECH_RATE_PATH, smoothing: float = 0.1):
+        self.path = path
+        self.smoothing = smoothing
+        self._lock = threading.Lock()
+        self._rates = {}
+        try:
+            with open(path, encoding="utf-8") as f:
+                self._rates = {language: float(rate) for language, rate in json.load(f).items()}
+        except (FileNotFoundError, ValueError, TypeError, AttributeError):
+            pass
+
+    def seconds_per_word(self, language: str) -> float:
+        """Calibrated rate at speed 1.0 (SECONDS_PER_WORD until a clip was measured)"""
+        with self._lock:
+            return self._rates.get(language.upper(), SECONDS_PER_WORD)
+
+    def estimate(self, utterance: Utterance, language: str) -> float:
+        """Seconds of speech for one utterance"""
+        words = len(utterance.text.split())
+        return words * self.seconds_per_word(language) / (utterance.voice.speed or 1.0)
+
+    def record(self, utterance: Utterance, language: str, seconds: float) -> None:
+        """
+        Fold the measured duration of a synthesized utterance into the rate
+
+        Clips of a word or two are skipped: their fixed lead-in and trailing
+        silence say little about the speaking rate.
+        """
+        words = len(utterance.text.split())
+        if words < 3 or not seconds or seconds <= 0:
+            return
+        observed = seconds * (utterance.voice.speed or 1.0) / words
+        with self._lock:
+            key = language.upper()
+            current = self._rates.get(key)
+            self._rates[key] = observed if current is None else \
+                (1 - self.smoothing) * current + self.smoothing * observed
+
+    def save(self) -> None:
+        """Persist the calibrated rates"""
+        with self._lock:
+            rates = dict(self._rates)
+        if not rates:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        staging = f"{self.path}.{threading.get_ident()}.tmp"
+        with open(staging, "w", encoding="utf-8") as f:
+            json.dump(rates, f, indent=2)
+        os.replace(staging, self.path)
+
+
+@dataclass
+class BudgetStats:
+    """Estimated speech time of one variant's script before and after budgeting"""
+    target_seconds: float = 0.0
+    estimated_seconds: float = 0.0
+    budgeted_seconds: float = 0.0
+    condensed: int = 0
+    trimmed_turns: int = 0
+
+    def as_dict(self) -> dict:
+        return {
+            "target_seconds": round(self.target_seconds, 1),
+            "estimated_seconds": round(self.estimated_seconds, 1),
+            "budgeted_seconds": round(self.budgeted_seconds, 1),
+            "condensed": self.condensed,
+            "trimmed_turns": self.trimmed_turns,
+        }
+
+
+def script_seconds(utterances: list[Utterance], language: str, estimator: DurationEstimator) -> float:
+    """Estimated speech time of a parsed script"""
+    return sum(estimator.estimate(utterance, language) for utterance in utterances)
+
+
+def fit_turns(utterances: list[Utterance], language: str, target_seconds: float,
+              estimator: DurationEstimator) -> list[Utterance]:
+    """
+    Drop speaker turns until a script fits its target duration
+
+    The opening turns are kept in order and the final turn, where the host
+    wraps up, is always kept; turns in between are dropped from the end of
+    the discussion.
+
+    Args:
+        utterances: Parsed utterances in dialog order
+        language: Language code
+        target_seconds: Speech time not to exceed
+        estimator: Duration estimator
+
+    Returns:
+        Utterances to synthesize, in dialog order
+    """
+    if len(utterances) < 2 or script_seconds(utterances, language, estimator) <= target_seconds:
+        return utterances
+    *body, closing = utterances
+    remaining = target_seconds - estimator.estimate(closing, language)
+    kept = []
+    for utterance in body:
+        seconds = estimator.estimate(utterance, language)
+        if seconds > remaining:
+            break
+        kept.append(utterance)
+        remaining -= seconds
+    return kept + [closing]
+
+
+_default_estimator = None
+_default_estimator_lock = threading.Lock()
+
+
+def get_duration_estimator() -> DurationEstimator:
+    """Return the process-wide duration estimator"""
+    global _default_estimator
+    with _default_estimator_lock:
+        if _default_estimator is None:
+            _default_estimator = DurationEstimator()
+        return _default_estimator
@@ -0,0 +1,260 @@
+"""
+Streaming audio sinks that accept raw PCM chunk by chunk
+"""
+
+import os
+import time
+import wave
+import tempfile
+import subprocess
+from dataclasses import dataclass
+from typing import NamedTuple
+
+from pydub.utils import get_encoder_name
+
+from ..core.config import (
+    AUDIO_FRAME_RATE, AUDIO_CHANNELS, AUDIO_SAMPLE_WIDTH,
+    OUTPUT_CODEC, OUTPUT_BITRATE, OUTPUT_VBR,
+)
+
+
+class PcmFormat(NamedTuple):
+    frame_rate: int = AUDIO_FRAME_RATE
+    channels: int = AUDIO_CHANNELS
+    sample_width: int = AUDIO_SAMPLE_WIDTH  # bytes per sample
+
+
+class Codec(NamedTuple):
+    encoder: str  # ffmpeg encoder name
+    container: str  # ffmpeg muxer; all of these can be played while still growing
+    extension: str
+    mime: str
+
+
+CODECS = {
+    "mp3": Codec("libmp3lame", "mp3", ".mp3", "audio/mpeg"),
+    "opus": Codec("libopus", "ogg", ".ogg", "audio/ogg"),
+    "aac": Codec("aac", "adts", ".aac", "audio/aac"),
+    "wav": Codec("pcm_s16le", "wav", ".wav", "audio/wav"),
+}
+
+# LAME VBR quality presets (-q:a) by approximate average bitrate in kbit/s
+MP3_VBR_QUALITY = {245: 0, 225: 1, 190: 2, 175: 3, 165: 4, 130: 5, 115: 6, 100: 7, 85: 8, 65: 9}
+
+
+class EncoderSettings(NamedTuple):
+    codec: str = OUTPUT_CODEC
+    bitrate: str = OUTPUT_BITRATE  # ffmpeg notation, e.g. "96k"
+    vbr: bool = OUTPUT_VBR
+
+
+@dataclass
+class EncodeStats:
+    """What an encode produced and how long the encoder kept us waiting"""
+    codec: str
+    bitrate: str
+    vbr: bool
+    pcm_bytes: int = 0
+    audio_seconds: float = 0.0
+    encode_seconds: float = 0.0
+    output_bytes: int = 0
+
+    def as_dict(self) -> dict:
+        return {
+            "codec": self.codec,
+            "bitrate": self.bitrate,
+            "vbr": self.vbr,
+            "audio_seconds": round(self.audio_seconds, 2),
+            "encode_seconds": round(self.encode_seconds, 3),
+            "output_bytes": self.output_bytes,
+            "realtime_factor": round(self.audio_seconds / self.encode_seconds, 1) if self.encode_seconds else None,
+        }
+
+
+def codec_arguments(settings: EncoderSettings) -> list[str]:
+    """
+    Build the ffmpeg output arguments for a codec, bitrate and VBR choice
+
+    Args:
+        settings: Encoder settings
+
+    Returns:
+        ffmpeg command-line arguments placed before the output path
+    """
+    if settings.codec not in CODECS:
+        raise ValueError(f"Unsupported codec {settings.codec!r}; choose from {sorted(CODECS)}")
+    codec = CODECS[settings.codec]
+    args = ["-c:a", codec.encoder]
+    if settings.codec == "mp3" and settings.vbr:
+        kbps = int(settings.bitrate.rstrip("kK"))
+        nearest = min(MP3_VBR_QUALITY, key=lambda rate: abs(rate - kbps))
+        args += ["-q:a", str(MP3_VBR_QUALITY[nearest])]
+    elif settings.codec == "opus":
+        args += ["-b:a", settings.bitrate, "-vbr", "on" if settings.vbr else "off"]
+    elif settings.codec != "wav":
+        # The native AAC encoder's VBR mode is experimental, so AAC is always CBR
+        args += ["-b:a", settings.bitrate]
+    return args + ["-f", codec.container]
+
+
+class _TimedSink:
+    """Accumulates wall time spent inside the sink and fills in EncodeStats"""
+
+    def __init__(self, output_path: str, fmt: PcmFormat, settings: EncoderSettings):
+        self.output_path = output_path
+        self.fmt = fmt
+        self.stats = EncodeStats(settings.codec, settings.bitrate, settings.vbr)
+
+    def write(self, pcm: bytes) -> None:
+        start = time.perf_counter()
+        self._write(pcm)
+        self.stats.encode_seconds += time.perf_counter() - start
+        self.stats.pcm_bytes += len(pcm)
+
+    def flush(self) -> None:
+        start = time.perf_counter()
+        self._flush()
+        self.stats.encode_seconds += time.perf_counter() - start
+
+    def close(self) -> None:
+        start = time.perf_counter()
+        try:
+            self._close()
+        finally:
+            self.stats.encode_seconds += time.perf_counter() - start
+            frame_bytes = self.fmt.sample_width * self.fmt.channels
+            self.stats.audio_seconds = self.stats.pcm_bytes / frame_bytes / self.fmt.frame_rate
+            if os.path.exists(self.output_path):
+                self.stats.output_bytes = os.path.getsize(self.output_path)
+
+    def abort(self) -> None:
+        """Close after a failed run without raising and remove the partial output"""
+        try:
+            self.close()
+        except Exception as e:
+            print(f"Discarding {self.output_path}: {e}")
+        try:
+            os.remove(self.output_path)
+        except FileNotFoundError:
+            pass
+
+
+class WavSink(_TimedSink):
+    """
+    Writes PCM straight into a WAV container.
+
+    The header is patched after every write, so the file is a valid WAV
+    whenever it is flushed.
+    """
+
+    def __init__(self, output_path: str, fmt: PcmFormat = PcmFormat()):
+        super().__init__(output_path, fmt, EncoderSettings("wav", "", False))
+        self._file = open(output_path, "wb")
+        self._wav = wave.open(self._file, "wb")
+        self._wav.setnchannels(fmt.channels)
+        self._wav.setsampwidth(fmt.sample_width)
+        self._wav.setframerate(fmt.frame_rate)
+
+    def _write(self, pcm: bytes) -> None:
+        self._wav.writeframes(pcm)
+
+    def _flush(self) -> None:
+        self._file.flush()
+
+    def _close(self) -> None:
+        self._wav.close()
+        self._file.close()
+
+
+class FfmpegSink(_TimedSink):
+    """Pipes PCM into an ffmpeg process that encodes incrementally"""
+
+    def __init__(self, output_path: str, fmt: PcmFormat = PcmFormat(),
+                 settings: EncoderSettings = EncoderSettings()):
+        super().__init__(output_path, fmt, settings)
+        command = [
+            get_encoder_name(), "-y", "-loglevel", "error",
+            "-f", f"s{fmt.sample_width * 8}le",
+            "-ar", str(fmt.frame_rate),
+            "-ac", str(fmt.channels),
+            "-i", "pipe:0",
+            "-flush_packets", "1",
+            *codec_arguments(settings),
+            output_path,
+        ]
+        # ffmpeg's messages go to a file: a pipe nobody reads until close()
+        # fills up on a chatty encoder and blocks it, and then our writes
+        self._stderr = tempfile.TemporaryFile()
+        try:
+            self._process = subprocess.Popen(command, stdin=subprocess.PIPE, stderr=self._stderr)
+        except BaseException:
+            self._stderr.close()  # e.g. ffmpeg is not installed
+            raise
+
+    def _failure(self) -> RuntimeError:
+        self._process.wait()
+        self._stderr.seek(0)
+        stderr = self._stderr.read().decode(errors="replace")
+        return RuntimeError(f"Encoding {self.output_path} failed: {stderr}")
+
+    def _write(self, pcm: bytes) -> None:
+        try:
+            self._process.stdin.write(pcm)
+        except BrokenPipeError:
+            raise self._failure() from None
+
+    def _flush(self) -> None:
+        # ffmpeg writes packets as soon as they are encoded (-flush_packets 1)
+        try:
+            self._process.stdin.flush()
+        except BrokenPipeError:
+            raise self._failure() from None
+
+    def _close(self) -> None:
+        try:
+            self._process.stdin.close()
+        except BrokenPipeError:
+            pass
+        try:
+            if self._process.wait() != 0:
+                raise self._failure()
+        finally:
+            self._stderr.close()
+
+
+def open_sink(output_path: str, fmt: PcmFormat = PcmFormat(), settings: EncoderSettings = EncoderSettings()):
+    """
+    Open a streaming sink for the requested codec
+
+    Args:
+        output_path: Destination file
+        fmt: PCM layout of the chunks that will be written
+        settings: Codec, bitrate and VBR choice ("wav" is written natively,
+            everything else is piped through ffmpeg)
+
+    Returns:
+        Sink with ``write(pcm)``, ``flush()``, ``close()`` and ``stats``
+    """
+    if settings.codec == "wav":
+        return WavSink(output_path, fmt)
+    return FfmpegSink(output_path, fmt, settings)
+
+
+class FileTail:
+    """
+    Reads the bytes appended to a growing output file since the last call.
+
+    Concatenating the chunks yields a playable stream for frame-based formats
+    such as MP3, so they can be forwarded to a client while encoding continues.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.offset = 0
+
+    def read(self) -> bytes:
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            chunk = f.read()
+        self.offset += len(chunk)
+        return chunk
@@ -0,0 +1,137 @@
+"""
+NumPy mixing engine: crossfades, per-speaker gain and a ducked music bed
+"""
+
+import numpy as np
+
+from .encoder import PcmFormat
+from ..core.config import (
+    LIGHT_GUITAR_FREQ, AMBIENT_GUITAR_FREQ,
+    MIX_CROSSFADE_MS, MIX_BED_GAIN_DB, MIX_DUCK_DB, MIX_DUCK_THRESHOLD_DB,
+    MIX_WINDOW_MS, MIX_SPEAKER_GAINS_DB,
+)
+
+
+def db_to_gain(db: float) -> float:
+    return float(10 ** (db / 20))
+
+
+def pcm_to_array(pcm: bytes, fmt: PcmFormat = PcmFormat()) -> np.ndarray:
+    """
+    Convert 16-bit interleaved PCM to float32 samples of shape (frames, channels)
+    """
+    samples = np.frombuffer(pcm, dtype=np.int16).astype(np.float32) / 32768.0
+    return samples.reshape(-1, fmt.channels)
+
+
+def array_to_pcm(samples: np.ndarray) -> bytes:
+    """
+    Convert float samples in [-1, 1] back to 16-bit interleaved PCM
+    """
+    return (np.clip(samples, -1.0, 1.0) * 32767.0).astype(np.int16).tobytes()
+
+
+def tone_bed(duration_ms: int, fmt: PcmFormat = PcmFormat(),
+             freqs: tuple = (LIGHT_GUITAR_FREQ, AMBIENT_GUITAR_FREQ)) -> np.ndarray:
+    """
+    Synthesize a loopable background bed from the configured guitar tones
+
+    Args:
+        duration_ms: Length of one loop
+        fmt: Output sample layout
+        freqs: Tone frequencies in Hz
+
+    Returns:
+        Float32 samples of shape (frames, channels)
+    """
+    t = np.arange(int(fmt.frame_rate * duration_ms / 1000), dtype=np.float32) / fmt.frame_rate
+    bed = sum(np.sin(2 * np.pi * f * t) for f in freqs) / len(freqs)
+    return np.repeat(bed.astype(np.float32)[:, None], fmt.channels, axis=1)
+
+
+class Mixer:
+    """
+    Streaming mixer operating on whole sample arrays.
+
+    Clips are added one at a time. Each call returns the samples that can no
+    longer change, holding back only the crossfade tail, so memory stays
+    bounded by the longest clip. Gain, crossfade ramps and ducking are
+    computed as array operations per clip.
+    """
+
+    def __init__(
+        self,
+        fmt: PcmFormat = PcmFormat(),
+        crossfade_ms: int = MIX_CROSSFADE_MS,
+        speaker_gains_db: dict = None,
+        bed: np.ndarray = None,
+        bed_gain_db: float = MIX_BED_GAIN_DB,
+        duck_db: float = MIX_DUCK_DB,
+        duck_threshold_db: float = MIX_DUCK_THRESHOLD_DB,
+        window_ms: int = MIX_WINDOW_MS,
+    ):
+        self.fmt = fmt
+        self.fade_len = int(fmt.frame_rate * crossfade_ms / 1000)
+        self.speaker_gains_db = MIX_SPEAKER_GAINS_DB if speaker_gains_db is None else speaker_gains_db
+        self.bed = bed
+        self.bed_gain = db_to_gain(bed_gain_db)
+        self.duck_gain = db_to_gain(duck_db)
+        self.duck_threshold = db_to_gain(duck_threshold_db)
+        self.window = max(1, int(fmt.frame_rate * window_ms / 1000))
+        self._tail = np.zeros((0, fmt.channels), dtype=np.float32)
+        self._bed_pos = 0
+        self._last_gain = 1.0
+
+    def add(self, samples: np.ndarray, speaker: str = None) -> np.ndarray:
+        """
+        Append a clip, crossfading it into the previous one
+
+        Args:
+            samples: Float32 samples of shape (frames, channels)
+            speaker: Speaker name used to look up a gain
+
+        Returns:
+            Finished samples ready for the encoder
+        """
+        samples = samples * db_to_gain(self.speaker_gains_db.get(speaker, 0.0))
+        tail_len = len(self._tail)
+        n_fade = min(self.fade_len, tail_len, len(samples))
+        if n_fade:
+            ramp = np.linspace(0.0, 1.0, n_fade, dtype=np.float32)[:, None]
+            overlap = self._tail[tail_len - n_fade:] * (1.0 - ramp) + samples[:n_fade] * ramp
+            merged = np.concatenate([self._tail[:tail_len - n_fade], overlap, samples[n_fade:]])
+        else:
+            merged = np.concatenate([self._tail, samples])
+
+        keep = min(self.fade_len, len(merged))
+        self._tail = merged[len(merged) - keep:]
+        return self._with_bed(merged[:len(merged) - keep])
+
+    def finish(self) -> np.ndarray:
+        """
+        Flush the held-back crossfade tail
+        """
+        tail, self._tail = self._tail, self._tail[:0]
+        return self._with_bed(tail)
+
+    def _with_bed(self, speech: np.ndarray) -> np.ndarray:
+        if self.bed is None or len(speech) == 0:
+            return speech
+        n = len(speech)
+        music = self.bed[(self._bed_pos + np.arange(n)) % len(self.bed)] * self.bed_gain
+        self._bed_pos = (self._bed_pos + n) % len(self.bed)
+        return np.clip(speech + music * self._duck_envelope(speech), -1.0, 1.0)
+
+    def _duck_envelope(self, speech: np.ndarray) -> np.ndarray:
+        # RMS per window decides whether speech is active
+        n = len(speech)
+        padded = np.pad(speech, ((0, -n % self.window), (0, 0)))
+        rms = np.sqrt(np.mean(padded.reshape(-1, self.window * speech.shape[1]) ** 2, axis=1))
+        targets = np.where(rms > self.duck_threshold, self.duck_gain, 1.0).astype(np.float32)
+
+        # Ramp linearly between window targets, continuing from the previous clip
+        anchors = np.concatenate([[self._last_gain], targets])
+        positions = np.arange(len(anchors), dtype=np.float32) * self.window
+        envelope = np.interp(np.arange(1, n + 1, dtype=np.float32), positions, anchors)
+        self._last_gain = float(targets[-1])
+        return envelope.astype(np.float32)[:, None]
@@ -0,0 +1,170 @@
+"""
+Adaptive pacing and retry policy for TTS requests
+"""
+
+import re
+import time
+import threading
+import random
+from dataclasses import dataclass
+
+from ..core.config import TTS_MAX_ATTEMPTS, TTS_BACKOFF_BASE, TTS_BACKOFF_MAX
+
+# Substrings that identify a throttled or overloaded backend in an error message
+THROTTLE_MARKERS = (
+    "429",
+    "503",
+    "too many requests",
+    "rate limit",
+    "quota",
+    "queue is full",
+    "overloaded",
+    "try again later",
+)
+
+RETRY_AFTER_PATTERN = re.compile(r"retry[- ]after[^0-9]*(\d+(?:\.\d+)?)", re.IGNORECASE)
+
+
+def is_throttle_error(error: Exception) -> bool:
+    """
+    Check whether an exception signals throttling rather than a hard failure
+
+    Args:
+        error: Exception raised by the TTS backend
+
+    Returns:
+        True if the error looks like a rate limit or overload response
+    """
+    message = str(error).lower()
+    return any(marker in message for marker in THROTTLE_MARKERS)
+
+
+def retry_after_hint(error: Exception) -> float | None:
+    """
+    Extract a server-provided retry delay from an exception message
+
+    Args:
+        error: Exception raised by the TTS backend
+
+    Returns:
+        Delay in seconds, or None if the error carries no hint
+    """
+    match = RETRY_AFTER_PATTERN.search(str(error))
+    return float(match.group(1)) if match else None
+
+
+@dataclass
+class PacingStats:
+    """Counters describing how time was spent in the TTS path"""
+    requests: int = 0
+    retries: int = 0
+    throttles: int = 0
+    failures: int = 0
+    wait_seconds: float = 0.0
+    synth_seconds: float = 0.0
+
+    def as_dict(self) -> dict:
+        total = self.wait_seconds + self.synth_seconds
+        return {
+            "requests": self.requests,
+            "retries": self.retries,
+            "throttles": self.throttles,
+            "failures": self.failures,
+            "wait_seconds": round(self.wait_seconds, 3),
+            "synth_seconds": round(self.synth_seconds, 3),
+            "wait_ratio": round(self.wait_seconds / total, 3) if total else 0.0,
+        }
+
+
+class PacingPolicy:
+    """
+    Exponential backoff with full jitter plus an adaptive inter-request gap.
+
+    The gap starts at zero, so a healthy backend is called back to back. Each
+    throttling signal doubles the gap (bounded by ``max_delay``) and each
+    success halves it until it drops back to zero. One policy may be shared
+    by threads issuing requests concurrently.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = TTS_MAX_ATTEMPTS,
+        base_delay: float = TTS_BACKOFF_BASE,
+        max_delay: float = TTS_BACKOFF_MAX,
+        sleep=time.sleep,
+        clock=time.monotonic,
+        rng=random.random,
+    ):
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.gap = 0.0
+        self.stats = PacingStats()
+        self._sleep = sleep
+        self._clock = clock
+        self._rng = rng
+        self._lock = threading.Lock()
+
+    def backoff(self, attempt: int) -> float:
+        """
+        Delay before retry number ``attempt`` (0-based), with full jitter
+        """
+        ceiling = min(self.max_delay, self.base_delay * (2 ** attempt))
+        return self._rng() * ceiling
+
+    def _wait(self, seconds: float) -> None:
+        if seconds <= 0:
+            return
+        self._count(wait_seconds=seconds)
+        self._sleep(seconds)
+
+    def _count(self, **increments) -> None:
+        with self._lock:
+            for name, value in increments.items():
+                setattr(self.stats, name, getattr(self.stats, name) + value)
+
+    def _on_success(self) -> None:
+        with self._lock:
+            self.gap = self.gap / 2 if self.gap > self.base_delay else 0.0
+
+    def _on_throttle(self, error: Exception) -> None:
+        hint = retry_after_hint(error)
+        with self._lock:
+            self.stats.throttles += 1
+            self.gap = min(self.max_delay, max(self.base_delay, self.gap * 2))
+            if hint is not None:
+                self.gap = min(self.max_delay, max(self.gap, hint))
+
+    def call(self, func, *args, **kwargs):
+        """
+        Call ``func`` under the pacing policy
+
+        Args:
+            func: Callable performing one TTS request
+            *args: Positional arguments for ``func``
+            **kwargs: Keyword arguments for ``func``
+
+        Returns:
+            Whatever ``func`` returns on its first successful attempt
+        """
+        self._wait(self.gap)
+        for attempt in range(self.max_attempts):
+            self._count(requests=1)
+            start = self._clock()
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                self._count(synth_seconds=self._clock() - start)
+                throttled = is_throttle_error(e)
+                if throttled:
+                    self._on_throttle(e)
+                if attempt == self.max_attempts - 1:
+                    self._count(failures=1)
+                    raise
+                self._count(retries=1)
+                delay = self.backoff(attempt)
+                self._wait(max(delay, self.gap) if throttled else delay)
+                continue
+            self._count(synth_seconds=self._clock() - start)
+            self._on_success()
+            return result
@@ -0,0 +1,173 @@
+"""
+Per-utterance clean-up: silence trimming, loudness normalization, resampling
+"""
+
+import os
+import wave
+from tempfile import NamedTemporaryFile
+
+import numpy as np
+from pydub import AudioSegment
+
+from .encoder import PcmFormat
+from .mixer import array_to_pcm, pcm_to_array, db_to_gain
+from ..core.config import POST_SILENCE_DB, POST_PAUSE_MS, POST_TARGET_DBFS, POST_PEAK_DBFS
+
+
+def lowpass_kernel(cutoff: float, half_width: int) -> np.ndarray:
+    """
+    Blackman-windowed sinc low-pass filter
+
+    Args:
+        cutoff: Cut-off frequency as a fraction of the sample rate (< 0.5)
+        half_width: Taps on each side of the centre tap
+
+    Returns:
+        Float64 taps with unit DC gain
+    """
+    n = np.arange(-half_width, half_width + 1, dtype=np.float64)
+    taps = 2 * cutoff * np.sinc(2 * cutoff * n) * np.blackman(len(n))
+    return taps / taps.sum()
+
+
+def resample(samples: np.ndarray, src_rate: int, dst_rate: int) -> np.ndarray:
+    """
+    Resample a (frames, channels) array
+
+    When downsampling, content above the new Nyquist frequency is removed
+    with a windowed-sinc low-pass first, so it does not fold back as
+    aliases; samples are then linearly interpolated.
+
+    Args:
+        samples: Input samples
+        src_rate: Input frame rate
+        dst_rate: Output frame rate
+
+    Returns:
+        Resampled float32 samples
+    """
+    if src_rate == dst_rate or len(samples) == 0:
+        return samples
+    if dst_rate < src_rate:
+        # Cut off a little below the new Nyquist frequency; the transition
+        # band narrows with more taps
+        ratio = dst_rate / src_rate
+        taps = lowpass_kernel(0.45 * ratio, int(np.ceil(16 / ratio)))
+        samples = np.stack(
+            [np.convolve(samples[:, c], taps, mode="same") for c in range(samples.shape[1])], axis=1
+        )
+    n_out = int(round(len(samples) * dst_rate / src_rate))
+    positions = np.arange(n_out, dtype=np.float64) * (src_rate / dst_rate)
+    source = np.arange(len(samples), dtype=np.float64)
+    return np.stack(
+        [np.interp(positions, source, samples[:, c]) for c in range(samples.shape[1])], axis=1
+    ).astype(np.float32)
+
+
+def match_channels(samples: np.ndarray, channels: int) -> np.ndarray:
+    """
+    Down-mix or duplicate channels to the requested count
+    """
+    if samples.shape[1] == channels:
+        return samples
+    mono = samples.mean(axis=1, keepdims=True)
+    return np.repeat(mono, channels, axis=1)
+
+
+def trim_silence(samples: np.ndarray, frame_rate: int,
+                 threshold_db: float = POST_SILENCE_DB, pause_ms: int = POST_PAUSE_MS) -> np.ndarray:
+    """
+    Cut leading and trailing silence, keeping half the pause on each side
+
+    Two trimmed clips played back to back are separated by ``pause_ms``.
+
+    Args:
+        samples: Input samples
+        frame_rate: Frame rate of ``samples``
+        threshold_db: Level below which a frame counts as silence
+        pause_ms: Total pause to keep between consecutive clips
+
+    Returns:
+        Trimmed samples (a view of the input)
+    """
+    loud = np.flatnonzero(np.abs(samples).max(axis=1) > db_to_gain(threshold_db))
+    if len(loud) == 0:
+        return samples[:0]
+    pad = int(frame_rate * pause_ms / 2000)
+    return samples[max(0, loud[0] - pad):loud[-1] + 1 + pad]
+
+
+def normalize_loudness(samples: np.ndarray, target_dbfs: float = POST_TARGET_DBFS,
+                       peak_dbfs: float = POST_PEAK_DBFS) -> np.ndarray:
+    """
+    Scale a clip to a target RMS level without pushing peaks past a ceiling
+
+    Args:
+        samples: Input samples
+        target_dbfs: Target RMS level in dBFS
+        peak_dbfs: Maximum allowed peak level in dBFS
+
+    Returns:
+        Normalized samples
+    """
+    if len(samples) == 0:
+        return samples
+    rms = float(np.sqrt(np.mean(np.square(samples))))
+    peak = float(np.abs(samples).max())
+    if rms == 0.0:
+        return samples
+    gain = min(db_to_gain(target_dbfs) / rms, db_to_gain(peak_dbfs) / peak)
+    return samples * np.float32(gain)
+
+
+def postprocess_clip(audio_path: str, output_dir: str, fmt: PcmFormat = PcmFormat()) -> str:
+    """
+    Clean up one synthesized clip and write it in the common output format
+
+    Args:
+        audio_path: Synthesized audio file
+        output_dir: Directory for the processed clip
+        fmt: Output PCM layout
+
+    Returns:
+        Path to the processed WAV file
+    """
+    segment = AudioSegment.from_file(audio_path).set_sample_width(2)
+    native = PcmFormat(segment.frame_rate, segment.channels, 2)
+    samples = pcm_to_array(segment.raw_data, native)
+
+    samples = trim_silence(samples, native.frame_rate)
+    samples = resample(samples, native.frame_rate, fmt.frame_rate)
+    samples = normalize_loudness(match_channels(samples, fmt.channels))
+
+    os.makedirs(output_dir, exist_ok=True)
+    with NamedTemporaryFile(dir=output_dir, delete=False, suffix=".wav") as temp_file:
+        with wave.open(temp_file, "wb") as out:
+            out.setnchannels(fmt.channels)
+            out.setsampwidth(fmt.sample_width)
+            out.setframerate(fmt.frame_rate)
+            out.writeframes(array_to_pcm(samples))
+        return temp_file.name
+
+
+def postprocess_clips(audio_paths, output_dir: str, fmt: PcmFormat = PcmFormat()):
+    """
+    Lazily post-process a stream of clips between synthesis and consolidation
+
+    Args:
+        audio_paths: Audio files, or ``(path, speaker)`` tuples, in order
+        output_dir: Directory for processed clips
+        fmt: Output PCM layout
+
+    Yields:
+        Processed items in the same shape as the input
+    """
+    for item in audio_paths:
+        audio_path, rest = (item[0], item[1:]) if isinstance(item, tuple) else (item, None)
+        try:
+            processed = postprocess_clip(audio_path, output_dir, fmt)
+        except Exception as e:
+            # Leave the clip untouched; consolidation reports undecodable files
+            print(f"Could not post-process {audio_path}: {e}")
+            processed = audio_path
+        yield processed if rest is None else (processed, *rest)
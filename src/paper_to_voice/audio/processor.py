@@ -3,103 +3,211 @@ Audio processing and consolidation functionality
 """
 
 import os
-import streamlit as st
-from time import sleep
+import itertools
+from collections import Counter
 from tqdm import tqdm
 from tempfile import NamedTemporaryFile
 from pydub import AudioSegment
 from pydub.generators import Sine
 
-from .tts import generate_podcast_audio
-from ..core.config import LIGHT_GUITAR_FREQ, AMBIENT_GUITAR_FREQ, GUITAR_DURATION
+from .tts import synthesize_utterance, get_default_cache
+from .pacing import PacingPolicy
+from .turns import CoalesceStats, coalesce_dialog
+from .encoder import CODECS, EncodeStats, EncoderSettings, PcmFormat, open_sink
+from .mixer import Mixer, array_to_pcm, pcm_to_array, tone_bed
+from ..core.events import EventBus
+from ..core.config import LIGHT_GUITAR_FREQ, AMBIENT_GUITAR_FREQ, GUITAR_DURATION, MIX_ENABLED
 
+# Intro and outro tones, generated once per assets directory and shared by jobs
+TONE_ASSETS = {"light-guitar.wav": LIGHT_GUITAR_FREQ, "ambient-guitar.wav": AMBIENT_GUITAR_FREQ}
 
-def store_voice(topic_dialog: dict) -> list[str]:
+
+def store_voice(topic_dialog: dict, pacing: PacingPolicy = None) -> list[str]:
     """
     Generate voice files for all dialog parts
     
     Args:
         topic_dialog: Dictionary containing dialog content
+        pacing: Retry and pacing policy (default: a fresh policy for this run)
         
     Returns:
         List of audio file paths
     """
+    pacing = pacing or PacingPolicy()
     audio_path = []
+    requests = CoalesceStats()
+    dropped = Counter()
     for topic, dialog in tqdm(topic_dialog.items()):
-        # Check if dialog is a string or already a list
-        if isinstance(dialog, str):
-            dialog_speaker = dialog.split("\n")
-        elif isinstance(dialog, list):
-            dialog_speaker = dialog  # If it's already a list, use it directly
-        else:
-            continue  # Skip if dialog is neither a string nor a list
-
-        for speaker in tqdm(dialog_speaker):
-            one_dialog = speaker.strip()
-            language_for_tts = "EN"
+        # Skip if dialog is neither a string nor a list
+        if not isinstance(dialog, (str, list)):
+            continue
 
-            if len(one_dialog) > 0:
-                # Generate the podcast audio for each dialog
-                audio_file_path = generate_podcast_audio(one_dialog, language_for_tts)
-                audio_path.append(audio_file_path)
+        # Parse into utterances and merge broken-up speaker turns so that
+        # non-speech lines never reach TTS and each request carries a full turn
+        utterances, stats, script_stats = coalesce_dialog(dialog)
+        requests.requests_before += stats.requests_before
+        requests.requests_after += stats.requests_after
+        dropped.update(script_stats.dropped)
 
-            sleep(5)
-        break  # This break will stop after processing the first topic
+        for utterance in tqdm(utterances):
+            language_for_tts = "EN"
+            audio_path.append(synthesize_utterance(utterance, language_for_tts, pacing))
+
+    print("TTS requests:", requests.as_dict())
+    print("Dropped script lines:", dict(dropped))
+    print("TTS pacing:", pacing.stats.as_dict())
+    if get_default_cache() is not None:
+        print("TTS cache:", get_default_cache().stats())
     return audio_path
 
 
-def consolidate_voice(audio_paths: list[str], voice_dir: str) -> str:
+def iter_pcm(audio_paths, fmt: PcmFormat = PcmFormat()):
+    """
+    Decode audio files one at a time into a common PCM layout
+
+    Args:
+        audio_paths: Audio files in playback order (any iterable). Items may
+            also be ``(path, speaker)`` tuples.
+        fmt: Target PCM layout
+
+    Yields:
+        Tuple of (speaker or None, raw PCM bytes) for each decodable file
+    """
+    for item in audio_paths:
+        audio_file_path, speaker = item if isinstance(item, tuple) else (item, None)
+        try:
+            segment = AudioSegment.from_file(audio_file_path)
+        except Exception as e:
+            print(f"Warning: could not process audio file {audio_file_path}: {e}")
+            continue
+        segment = segment.set_frame_rate(fmt.frame_rate).set_channels(fmt.channels)
+        yield speaker, segment.set_sample_width(fmt.sample_width).raw_data
+
+
+def stream_concat(audio_paths, output_path: str, settings: EncoderSettings = EncoderSettings(),
+                  fmt: PcmFormat = PcmFormat(), on_progress=None, mixer: Mixer = None) -> EncodeStats:
+    """
+    Concatenate audio files into one encoded output in a single pass
+
+    Only one decoded segment is held in memory at a time and each one is
+    written to the encoder as soon as it is decoded, so runtime is linear in
+    the number of segments and memory stays flat.
+
+    ``audio_paths`` may be a generator that yields files as they finish
+    synthesizing. With ``on_progress`` set, the output is flushed after every
+    segment so the partial file can be played while generation continues.
+
+    Args:
+        audio_paths: Audio files in playback order (any iterable)
+        output_path: Destination file
+        settings: Codec, bitrate and VBR for the output
+        fmt: PCM layout used between decoder and encoder
+        on_progress: Optional callback ``(output_path, segments_written)``
+        mixer: Optional Mixer applying crossfades, speaker gain and a music bed
+
+    Returns:
+        EncodeStats with PCM bytes written, encode time and output size
+    """
+    try:
+        sink = open_sink(output_path, fmt, settings)
+    except BaseException:
+        # The caller may have reserved the output file already
+        if os.path.exists(output_path):
+            os.remove(output_path)
+        raise
+    try:
+        for segments, (speaker, pcm) in enumerate(iter_pcm(audio_paths, fmt), start=1):
+            if mixer is not None:
+                pcm = array_to_pcm(mixer.add(pcm_to_array(pcm, fmt), speaker))
+            sink.write(pcm)
+            if on_progress is not None:
+                sink.flush()
+                on_progress(output_path, segments)
+        if mixer is not None:
+            sink.write(array_to_pcm(mixer.finish()))
+    except BaseException:
+        # Report the original failure, not one from closing the encoder
+        sink.abort()
+        raise
+    sink.close()
+    return sink.stats
+
+
+def _ensure_tone(path: str, freq: int) -> str:
+    # Export to a private name and rename, so a job never reads a tone file
+    # another job is still writing
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with NamedTemporaryFile(dir=os.path.dirname(path) or ".", delete=False, suffix=".wav") as temp_file:
+            staging = temp_file.name
+        Sine(freq).to_audio_segment(duration=GUITAR_DURATION).export(staging, format="wav")
+        os.replace(staging, path)
+    return path
+
+
+def consolidate_voice(audio_paths, voice_dir: str, on_progress=None, mixer: Mixer = None,
+                      settings: EncoderSettings = EncoderSettings(), assets_dir: str = None,
+                      events: EventBus = None, streaming: bool = False) -> str:
     """
     Consolidate multiple audio files into a single podcast file
     
     Args:
-        audio_paths: List of audio file paths
+        audio_paths: Audio file paths; a generator is consumed lazily, so
+            encoding overlaps with synthesis
         voice_dir: Directory to store voice files
+        on_progress: Optional callback ``(partial_path, segments_written)``
+            invoked after each segment is encoded and flushed
+        mixer: Mixer for crossfades and a ducked music bed (default: one
+            with a guitar bed when MIX_ENABLED is set, otherwise butt-joins)
+        settings: Output codec, bitrate and VBR (default: OUTPUT_* settings)
+        assets_dir: Directory for the intro/outro tones, which may be shared
+            between jobs (default: ``voice_dir``); the tones are left out
+            when the mixer lays a music bed
+        events: Optional bus that receives an ``audio`` event per encoded segment
+        streaming: Skip the default mixer so each clip is passed to the
+            encoder as decoded, without float copies (used to stay under a
+            memory ceiling)
         
     Returns:
         Path to the consolidated audio file
     """
-    audio_segments = []
-    voice_path = [paths for paths in audio_paths if paths != 'Empty Text']
+    voice_path = (paths for paths in audio_paths if paths != 'Empty Text')
 
-    # Create guitar audio paths
-    light_guitar_path = os.path.join(voice_dir, "light-guitar.wav")
-    ambient_guitar_path = os.path.join(voice_dir, "ambient-guitar.wav")
+    if mixer is None and MIX_ENABLED and not streaming:
+        mixer = Mixer(bed=tone_bed(GUITAR_DURATION))
 
-    # Ensure guitar audio exists
-    if not os.path.exists(light_guitar_path):
-        Sine(LIGHT_GUITAR_FREQ).to_audio_segment(duration=GUITAR_DURATION).export(
-            light_guitar_path, format="wav"
-        )
-    
-    if not os.path.exists(ambient_guitar_path):
-        Sine(AMBIENT_GUITAR_FREQ).to_audio_segment(duration=GUITAR_DURATION).export(
-            ambient_guitar_path, format="wav"
+    if mixer is not None and mixer.bed is not None:
+        # The guitar bed plays under the whole episode; the standalone tones
+        # would play it a second time before and after
+        segment_paths = voice_path
+    else:
+        # Ensure guitar audio exists
+        assets_dir = assets_dir or voice_dir
+        light_guitar_path, ambient_guitar_path = (
+            _ensure_tone(os.path.join(assets_dir, name), freq) for name, freq in TONE_ASSETS.items()
         )
 
-    # Add background guitar tracks
-    audio_segments.append(AudioSegment.from_file(light_guitar_path))
-    
-    # Add voice tracks
-    for audio_file_path in voice_path:
-        try:
-            audio_segment = AudioSegment.from_file(audio_file_path)
-            audio_segments.append(audio_segment)
-        except Exception as e:
-            st.warning(f"Could not process audio file {audio_file_path}: {e}")
+        # Background guitar tracks around the voice tracks
+        segment_paths = itertools.chain([light_guitar_path], voice_path, [ambient_guitar_path])
 
-    # Add ambient guitar track
-    audio_segments.append(AudioSegment.from_file(ambient_guitar_path))
+    os.makedirs(os.path.join(voice_dir, "tmp"), exist_ok=True)
+    with NamedTemporaryFile(dir=os.path.join(voice_dir, "tmp"),
+                            delete=False,
+                            suffix=CODECS[settings.codec].extension) as temp_file:
+        output_path = temp_file.name
 
-    # Combine audio
-    if audio_segments:
-        combined_audio = sum(audio_segments)
-        os.makedirs(os.path.join(voice_dir, "tmp"), exist_ok=True)
-        
-        with NamedTemporaryFile(dir=os.path.join(voice_dir, "tmp"), 
-                                 delete=False, 
-                                 suffix=".mp3") as temp_file:
-            combined_audio.export(temp_file.name, format="mp3")
-            return temp_file.name
-    
+    if events is not None:
+        notify = on_progress
+
+        def on_progress(partial_path, segments):
+            events.emit("audio", done=segments)
+            if notify is not None:
+                notify(partial_path, segments)
+
+    stats = stream_concat(segment_paths, output_path, settings, on_progress=on_progress, mixer=mixer)
+    print("Encode:", stats.as_dict())
+    if stats.pcm_bytes:
+        return output_path
+
+    os.remove(output_path)
     return None
@@ -0,0 +1,141 @@
+"""
+Single-pass parser turning a generated dialog into typed utterances
+"""
+
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import NamedTuple
+
+from ..core.config import SPEAKER_VOICES, SPEAKER_ALIASES
+
+
+class VoiceSettings(NamedTuple):
+    accent: str
+    speed: float
+
+
+class Utterance(NamedTuple):
+    speaker: str
+    text: str
+    voice: VoiceSettings
+
+
+@dataclass
+class ScriptStats:
+    """Line accounting for one parsed dialog"""
+    lines: int = 0
+    utterances: int = 0
+    dropped: Counter = field(default_factory=Counter)
+
+    def as_dict(self) -> dict:
+        return {"lines": self.lines, "utterances": self.utterances, "dropped": dict(self.dropped)}
+
+
+# Whole lines that are never spoken
+NON_SPEECH_PATTERNS = (
+    ("heading", re.compile(r"^#")),
+    ("rule", re.compile(r"^(-{3,}|\*{3,}|_{3,})$")),
+    ("stage_direction", re.compile(r"^(\[[^\]]*\]|\([^)]*\)|\*[^*]+\*|<[^>]*>)$")),
+)
+# Cues embedded in a spoken line, e.g. "[laughs]"
+INLINE_CUE = re.compile(r"\[[^\]]*\]")
+# Emphasis markers around spoken words ("*really*", "**big**", "__new__"):
+# only the markers are dropped, never the words
+EMPHASIS = re.compile(r"\*+|__")
+
+
+class ScriptParser:
+    """
+    Compiled parser for ``**Speaker:** text`` style podcast scripts.
+
+    Speaker labels are matched against a configurable speaker-to-voice map
+    plus aliases (``**Guest:**``, ``[Guest name]:``) in one regular
+    expression. Unmarked lines continue the previous speaker's turn;
+    headings, stage directions and anything before the first speaker are
+    dropped and counted.
+    """
+
+    def __init__(self, voices: dict = None, aliases: dict = None):
+        voices = SPEAKER_VOICES if voices is None else voices
+        aliases = SPEAKER_ALIASES if aliases is None else aliases
+        self.voices = {name: VoiceSettings(v["accent"], v["speed"]) for name, v in voices.items()}
+        self.aliases = {alias: name for alias, name in aliases.items() if name in self.voices}
+
+        labels = sorted([*self.voices, *self.aliases], key=len, reverse=True)
+        names = "|".join(re.escape(label) for label in labels)
+        self._speaker_line = re.compile(
+            rf"^(?:\*\*)?\s*\[?(?P<speaker>{names})\]?\s*(?::\s*\*\*|\*\*\s*:|:|\*\*)\s*(?P<text>.*)$",
+            re.IGNORECASE,
+        )
+        self._canonical = {label.lower(): self.aliases.get(label, label) for label in labels}
+
+    def _clean(self, text: str) -> str:
+        text = INLINE_CUE.sub(" ", text)
+        text = EMPHASIS.sub("", text)
+        return re.sub(r"\s+", " ", text).strip()
+
+    def parse(self, dialog) -> tuple[list[Utterance], ScriptStats]:
+        """
+        Parse a whole dialog
+
+        Args:
+            dialog: Dialog as a newline-separated string or a list of lines
+
+        Returns:
+            Tuple of (utterances in order, line statistics)
+        """
+        lines = dialog.split("\n") if isinstance(dialog, str) else dialog
+        stats = ScriptStats()
+        utterances = []
+        speaker = None
+        for raw in lines:
+            stats.lines += 1
+            line = raw.strip()
+            if not line:
+                stats.dropped["blank"] += 1
+                continue
+
+            reason = next((name for name, pattern in NON_SPEECH_PATTERNS if pattern.match(line)), None)
+            if reason:
+                stats.dropped[reason] += 1
+                continue
+
+            match = self._speaker_line.match(line)
+            if match:
+                speaker = self._canonical[match.group("speaker").lower()]
+                line = match.group("text")
+            elif speaker is None:
+                stats.dropped["no_speaker"] += 1
+                continue
+
+            text = self._clean(line)
+            if not text:
+                stats.dropped["stage_direction"] += 1
+                continue
+            utterances.append(Utterance(speaker, text, self.voices[speaker]))
+
+        stats.utterances = len(utterances)
+        return utterances, stats
+
+    def parse_line(self, line: str) -> Utterance | None:
+        """
+        Parse a single self-contained line; unmarked lines yield None
+        """
+        if not self._speaker_line.match(line.strip()):
+            return None
+        utterances, _ = self.parse([line])
+        return utterances[0] if utterances else None
+
+
+_default_parser = None
+
+
+def get_parser() -> ScriptParser:
+    """
+    Return the parser built from the configured speaker map
+    """
+    global _default_parser
+    if _default_parser is None:
+        _default_parser = ScriptParser()
+    return _default_parser
@@ -2,12 +2,30 @@
 Text-to-Speech functionality using MeloTTS
 """
 
-import time
-from gradio_client import Client
-from ..core.config import TTS_MODEL
+from ..core.config import TTS_CACHE_ENABLED
+from ..core.events import EventBus
+from .backends import get_backend
+from .pacing import PacingPolicy
+from .cache import TTSCache, make_cache_key
+from .script import Utterance, get_parser
 
+# Shared policy so pacing adapts across calls that don't bring their own
+default_pacing = PacingPolicy()
+_default_cache = None
 
-def get_text_to_voice(text: str, speed: float = 0.9, accent: str = "EN-US", language: str = "EN") -> str:
+
+def get_default_cache() -> TTSCache | None:
+    """
+    Return the process-wide utterance cache, or None when caching is disabled
+    """
+    global _default_cache
+    if TTS_CACHE_ENABLED and _default_cache is None:
+        _default_cache = TTSCache()
+    return _default_cache
+
+
+def get_text_to_voice(text: str, speed: float = 0.9, accent: str = "EN-US", language: str = "EN",
+                      backend: str = None) -> str:
     """
     Convert text to speech using MeloTTS
     
@@ -16,49 +34,77 @@ def get_text_to_voice(text: str, speed: float = 0.9, accent: str = "EN-US", lang
         speed: Speaking speed (default: 0.9)
         accent: Voice accent (default: "EN-US")
         language: Language code (default: "EN")
+        backend: Registered backend name (default: the TTS_BACKEND setting)
         
     Returns:
         Path to the generated audio file
     """
-    hf_client = Client(TTS_MODEL)
-    file_path = hf_client.predict(
-        text=text,
-        language=language,
-        speaker=accent,
-        speed=speed,
-        api_name="/synthesize",
-    )
-    return file_path
-
-
-def generate_podcast_audio(text: str, language: str) -> str:
+    return get_backend(backend).synthesize(text, speed, accent, language)
+
+
+def synthesize_clip(utterance: Utterance, language: str, pacing: PacingPolicy = None,
+                    cache: TTSCache = None, events: EventBus = None) -> tuple[str, bool]:
+    """
+    Synthesize one parsed utterance with its speaker's voice settings
+
+    Args:
+        utterance: Parsed utterance
+        language: Language code
+        pacing: Retry and pacing policy (default: shared module policy)
+        cache: Utterance cache (default: shared on-disk cache)
+        events: Optional bus that receives a ``tts`` event per finished line
+
+    Returns:
+        Path to the generated audio file, and whether the backend produced
+        it now (False for a cache hit)
+    """
+    text, (accent, speed) = utterance.text, utterance.voice
+
+    cache = cache or get_default_cache()
+    if cache is not None:
+        key = make_cache_key(text, accent, speed, language, get_backend().model)
+        cached_path = cache.get(key)
+        if cached_path:
+            if events is not None:
+                events.emit("tts", advance=1, message=f"{utterance.speaker}, cached")
+            return cached_path, False
+
+    pacing = pacing or default_pacing
+    file_path = pacing.call(get_text_to_voice, text, speed, accent, language)
+    if cache is not None:
+        # The backend's copy is a throwaway download or temp file
+        file_path = cache.put(key, file_path, move=True)
+    if events is not None:
+        events.emit("tts", advance=1, message=utterance.speaker)
+    return file_path, True
+
+
+def synthesize_utterance(utterance: Utterance, language: str, pacing: PacingPolicy = None,
+                         cache: TTSCache = None, events: EventBus = None) -> str:
+    """
+    Synthesize one parsed utterance; ``synthesize_clip`` without the origin
+
+    Returns:
+        Path to the generated audio file
+    """
+    return synthesize_clip(utterance, language, pacing, cache, events)[0]
+
+
+def generate_podcast_audio(text: str, language: str, pacing: PacingPolicy = None,
+                           cache: TTSCache = None) -> str:
     """
     Generate podcast audio with appropriate voice settings for different speakers
     
     Args:
-        text: Text to convert to speech
+        text: One dialog line, e.g. ``**Jane:** Welcome back``
         language: Language code
+        pacing: Retry and pacing policy (default: shared module policy)
+        cache: Utterance cache (default: shared on-disk cache)
         
     Returns:
         Path to generated audio file or 'Empty Text' if no valid text
     """
-    if "**Jane:**" in text:
-        text = text.replace("**Jane:**", '').strip()
-        accent = "EN-US"
-        speed = 0.9
-    elif "**Dr. Sharma:**" in text:
-        text = text.split("**")[-1].strip()
-        accent = "EN_INDIA"
-        speed = 0.9
-    else:
+    utterance = get_parser().parse_line(text)
+    if utterance is None:
         return 'Empty Text'
-    
-    # Retry logic for TTS generation
-    for attempt in range(3):
-        try:
-            file_path = get_text_to_voice(text, speed, accent, language)
-            return file_path
-        except Exception as e:
-            if attempt == 2:  # Last attempt
-                raise  # Re-raise the last exception if all attempts fail
-            time.sleep(1)  # Wait for 1 second before retrying
+    return synthesize_utterance(utterance, language, pacing, cache)
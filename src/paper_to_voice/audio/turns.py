@@ -0,0 +1,77 @@
+"""
+Speaker-turn coalescing to cut the number of TTS requests per dialog
+"""
+
+import re
+from dataclasses import dataclass
+
+from ..core.config import TTS_MAX_CHARS
+from .script import ScriptParser, ScriptStats, Utterance, get_parser
+
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+")
+
+
+@dataclass
+class CoalesceStats:
+    """Request counts before and after coalescing"""
+    requests_before: int = 0
+    requests_after: int = 0
+
+    def as_dict(self) -> dict:
+        return {"requests_before": self.requests_before, "requests_after": self.requests_after}
+
+
+def _split_long(text: str, max_chars: int) -> list[str]:
+    pieces = []
+    for sentence in SENTENCE_BOUNDARY.split(text):
+        # A single sentence longer than the budget falls back to word boundaries
+        while len(sentence) > max_chars:
+            cut = sentence.rfind(" ", 0, max_chars)
+            cut = cut if cut > 0 else max_chars
+            pieces.append(sentence[:cut].strip())
+            sentence = sentence[cut:].strip()
+        if sentence:
+            pieces.append(sentence)
+    return pieces
+
+
+def coalesce_turns(utterances: list[Utterance], max_chars: int = TTS_MAX_CHARS) -> list[Utterance]:
+    """
+    Merge consecutive same-speaker utterances up to a character budget
+
+    Args:
+        utterances: Utterances in dialog order
+        max_chars: Maximum characters per TTS request
+
+    Returns:
+        Coalesced utterances; overlong turns are split at sentence boundaries
+    """
+    merged = []
+    for utterance in utterances:
+        for piece in _split_long(utterance.text, max_chars):
+            previous = merged[-1] if merged else None
+            if previous and previous.speaker == utterance.speaker and previous.voice == utterance.voice \
+                    and len(previous.text) + 1 + len(piece) <= max_chars:
+                merged[-1] = previous._replace(text=f"{previous.text} {piece}")
+            else:
+                merged.append(utterance._replace(text=piece))
+    return merged
+
+
+def coalesce_dialog(dialog, max_chars: int = TTS_MAX_CHARS,
+                    parser: ScriptParser = None) -> tuple[list[Utterance], CoalesceStats, ScriptStats]:
+    """
+    Parse a dialog and reduce it to the minimal list of TTS requests
+
+    Args:
+        dialog: Dialog as a newline-separated string or a list of lines
+        max_chars: Maximum characters per TTS request
+        parser: Script parser (default: one built from the configured speakers)
+
+    Returns:
+        Tuple of (utterances to synthesize, request counts, parser line stats)
+    """
+    utterances, script_stats = (parser or get_parser()).parse(dialog)
+    coalesced = coalesce_turns(utterances, max_chars)
+    stats = CoalesceStats(requests_before=len(utterances), requests_after=len(coalesced))
+    return coalesced, stats, script_stats
@@ -0,0 +1,210 @@
+"""
+Headless batch command line: convert many PDFs into podcasts in parallel
+
+Usage:
+    paper-to-voice papers/ extra.pdf --output-dir podcasts --jobs 4
+    python -m src.paper_to_voice.cli papers/ -o podcasts -j 4
+    paper-to-voice paper.pdf --variant formal:short --variant conversational:medium:EN
+"""
+
+import os
+import sys
+import glob
+import json
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+
+from .core.config import OUTPUT_CODEC
+from .audio.encoder import CODECS
+from .pipeline import run_variants, variant_name
+
+TONES = ["Formal", "Conversational"]
+LENGTHS = ["Short (1-2 min)", "Medium (3-5 min)"]
+LANGUAGES = ["EN"]
+
+
+def collect_pdfs(inputs: list[str], recursive: bool = False) -> list[str]:
+    """
+    Expand files and directories into a sorted, de-duplicated list of PDFs
+
+    Args:
+        inputs: PDF files and/or directories
+        recursive: Also search subdirectories
+
+    Returns:
+        PDF paths
+    """
+    pdfs = []
+    for item in inputs:
+        if os.path.isdir(item):
+            pattern = os.path.join(item, "**", "*.pdf") if recursive else os.path.join(item, "*.pdf")
+            pdfs.extend(glob.glob(pattern, recursive=recursive))
+        elif item.lower().endswith(".pdf") and os.path.isfile(item):
+            pdfs.append(item)
+        else:
+            print(f"Skipping {item}: not a PDF file or directory", file=sys.stderr)
+    return sorted(set(os.path.abspath(pdf) for pdf in pdfs))
+
+
+def output_paths(pdfs: list[str], output_dir: str, extension: str) -> dict:
+    """
+    Map each PDF to a unique podcast path in ``output_dir``
+    """
+    paths, seen = {}, {}
+    for pdf in pdfs:
+        stem = os.path.splitext(os.path.basename(pdf))[0]
+        seen[stem] = seen.get(stem, 0) + 1
+        suffix = f"-{seen[stem]}" if seen[stem] > 1 else ""
+        paths[pdf] = os.path.join(output_dir, f"{stem}{suffix}{extension}")
+    return paths
+
+
+def parse_variant(spec: str, language: str = "EN") -> dict:
+    """
+    Parse a ``tone:length[:language]`` variant, e.g. ``conversational:medium:EN``
+
+    Tone and length may be abbreviated to any unambiguous prefix; the
+    language must be one of LANGUAGES.
+
+    Raises:
+        ValueError: If a part matches no option
+    """
+    parts = spec.split(":")
+    if len(parts) not in (2, 3):
+        raise ValueError(f"Variant {spec!r} must look like tone:length[:language]")
+
+    def choose(value, options, kind):
+        matches = [option for option in options if option.lower().startswith(value.strip().lower())]
+        if not value.strip() or len(matches) != 1:
+            raise ValueError(f"Unknown {kind} {value!r}; choose from {options}")
+        return matches[0]
+
+    chosen_language = ((parts[2].strip() if len(parts) == 3 else "") or language).upper()
+    if chosen_language not in LANGUAGES:
+        raise ValueError(f"Unsupported language {chosen_language!r}; choose from {LANGUAGES}")
+    return {
+        "tone": choose(parts[0], TONES, "tone"),
+        "length": choose(parts[1], LENGTHS, "length"),
+        "language": chosen_language,
+    }
+
+
+def _run_job(pdf_path: str, output_path: str, variants: list[dict],
+             show_progress: bool = False) -> list[dict]:
+    on_status = None
+    if show_progress:
+        name = os.path.basename(pdf_path)
+        last = {"bucket": -1}
+
+        def on_status(message, percent):
+            # One line per 10% keeps parallel jobs readable
+            if percent // 10 != last["bucket"]:
+                last["bucket"] = percent // 10
+                print(f"  {name}: {percent:3d}% {message}", flush=True)
+
+    # Several variants of one paper are written next to each other as <stem>-<variant>
+    stem, extension = os.path.splitext(output_path)
+    targets = [output_path] if len(variants) == 1 else [
+        f"{stem}-{variant_name(variant)}{extension}" for variant in variants
+    ]
+    return [result.as_dict() for result in run_variants(pdf_path, variants, targets, on_status=on_status)]
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="paper-to-voice",
+        description="Convert research paper PDFs into podcast audio.",
+    )
+    parser.add_argument("inputs", nargs="+", help="PDF files and/or directories containing PDFs")
+    parser.add_argument("-o", "--output-dir", default="podcasts", help="Directory for the podcasts (default: podcasts)")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1,
+                        help="Number of papers processed in parallel (default: CPU count)")
+    parser.add_argument("--executor", choices=["thread", "process"], default="thread",
+                        help="Run jobs in threads (shared TTS cache and pacing) or separate processes")
+    parser.add_argument("-r", "--recursive", action="store_true", help="Search directories recursively")
+    parser.add_argument("--tone", default="Formal", choices=TONES)
+    parser.add_argument("--language", default="EN", choices=LANGUAGES)
+    parser.add_argument("--length", default="Short (1-2 min)", choices=LENGTHS)
+    parser.add_argument("--variant", action="append", metavar="TONE:LENGTH[:LANGUAGE]",
+                        help="Produce this edition of every paper; repeat for several editions from one "
+                             "analysis (default: --tone, --length and --language)")
+    parser.add_argument("--progress", action="store_true", help="Print progress and ETA while papers convert")
+    parser.add_argument("--summary", help="Where to write the JSON job summary (default: <output-dir>/summary.json)")
+    return parser
+
+
+def main(argv: list[str] = None) -> int:
+    """
+    Command line entry point
+
+    Returns:
+        Process exit code: 0 if every paper converted, 1 otherwise
+    """
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    try:
+        variants = [parse_variant(spec, args.language) for spec in args.variant or []] or [
+            {"tone": args.tone, "length": args.length, "language": args.language}
+        ]
+    except ValueError as e:
+        parser.error(str(e))
+    pdfs = collect_pdfs(args.inputs, args.recursive)
+    if not pdfs:
+        print("No PDF files found.", file=sys.stderr)
+        return 1
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    targets = output_paths(pdfs, args.output_dir, CODECS[OUTPUT_CODEC].extension)
+    jobs = max(1, min(args.jobs, len(pdfs)))
+    executor_class = ProcessPoolExecutor if args.executor == "process" else ThreadPoolExecutor
+    print(f"Converting {len(pdfs)} paper(s) into {len(variants)} variant(s) "
+          f"with {jobs} {args.executor} worker(s)")
+
+    start = time.perf_counter()
+    results = []
+    with executor_class(max_workers=jobs) as executor:
+        futures = {
+            executor.submit(_run_job, pdf, targets[pdf], variants, args.progress): pdf
+            for pdf in pdfs
+        }
+        for done, future in enumerate(as_completed(futures), 1):
+            try:
+                job_results = future.result()
+            except Exception as e:
+                job_results = [{"pdf_path": futures[future], "ok": False, "error": repr(e), "timings": {}}]
+            for result in job_results:
+                results.append(result)
+                state = "ok" if result["ok"] else "FAILED"
+                total = result["timings"].get("total", 0.0)
+                name = os.path.basename(result["pdf_path"])
+                if len(variants) > 1 and "variant" in result.get("stats", {}):
+                    name += f" [{variant_name(result['stats']['variant'])}]"
+                print(f"[{done}/{len(pdfs)}] {state:6} {total:7.1f}s  {name}")
+
+    wall_seconds = time.perf_counter() - start
+    failed = [r for r in results if not r["ok"]]
+    summary = {
+        "papers": len(pdfs),
+        "variants": len(variants),
+        "succeeded": len(results) - len(failed),
+        "failed": len(failed),
+        "jobs": jobs,
+        "executor": args.executor,
+        "wall_seconds": round(wall_seconds, 3),
+        "results": sorted(results, key=lambda r: r["pdf_path"]),
+    }
+    summary_path = args.summary or os.path.join(args.output_dir, "summary.json")
+    with open(summary_path, "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2)
+
+    print(f"Done in {wall_seconds:.1f}s: {summary['succeeded']} succeeded, {len(failed)} failed. "
+          f"Summary written to {summary_path}")
+    for result in failed:
+        print(f"  {result['pdf_path']}: {(result['error'] or 'no audio produced').strip().splitlines()[-1]}",
+              file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,40 +3,190 @@ Configuration module for Paper to Voice Assistant
 """
 
 import os
+import threading
 from dotenv import load_dotenv
-import google.generativeai as genai
-from langchain_google_genai import ChatGoogleGenerativeAI
 
 load_dotenv()
 
-# Set up Google API Key
+# Google API key; checked when the LLM is first needed rather than at import,
+# so the queue, CLI and audio modules work without it
 GOOGLE_API_KEY = os.getenv('GOOGLE_API_KEY')
-if not GOOGLE_API_KEY:
-    raise ValueError("GOOGLE_API_KEY environment variable is not set")
-
-os.environ['GOOGLE_API_KEY'] = GOOGLE_API_KEY
-genai.configure(api_key=GOOGLE_API_KEY)
 
 # Model configuration
 GOOGLE_MODEL_NAME = os.getenv('GOOGLE_MODEL_NAME', 'gemini-1.5-flash')
 
+_llm = None
+_llm_factory = None
+_llm_lock = threading.Lock()
+
+
+def get_google_api_key() -> str:
+    """
+    Resolve the Google API key from the environment
+
+    Raises:
+        ValueError: If GOOGLE_API_KEY is not set
+    """
+    api_key = os.getenv('GOOGLE_API_KEY')
+    if not api_key:
+        raise ValueError("GOOGLE_API_KEY environment variable is not set")
+    return api_key
+
+
+def set_llm_factory(factory=None) -> None:
+    """
+    Replace how ``get_llm`` builds the chat model
+
+    Args:
+        factory: Zero-argument callable returning an object with an
+            ``invoke(messages)`` method, e.g. a latency-injecting stand-in for
+            benchmarks; None restores the Gemini client
+    """
+    global _llm, _llm_factory
+    with _llm_lock:
+        _llm_factory = factory
+        _llm = None
+
+
 # Create LLM instance
 def get_llm():
-    return ChatGoogleGenerativeAI(
-        model=GOOGLE_MODEL_NAME,
-        temperature=0,
-        max_tokens=None,
-        max_retries=2
-    )
+    """
+    Return the process-wide chat model, created on first use
+
+    The client and its connection pool are reused by every workflow node,
+    job and Streamlit rerun instead of being rebuilt per call. The Google
+    SDKs are imported here, not at module import, because loading them
+    dominates start-up time.
+    """
+    global _llm
+    with _llm_lock:
+        if _llm is None and _llm_factory is not None:
+            _llm = _llm_factory()
+        if _llm is None:
+            import google.generativeai as genai
+            from langchain_google_genai import ChatGoogleGenerativeAI
+
+            api_key = get_google_api_key()
+            os.environ['GOOGLE_API_KEY'] = api_key
+            genai.configure(api_key=api_key)
+            _llm = ChatGoogleGenerativeAI(
+                model=GOOGLE_MODEL_NAME,
+                temperature=0,
+                max_tokens=None,
+                max_retries=2
+            )
+        return _llm
+
 
 # TTS Configuration
 TTS_MODEL = "myshell-ai/MeloTTS-English"
+TTS_BACKEND = os.getenv('TTS_BACKEND', 'remote')  # "remote" (HF Space) or "local" (in-process MeloTTS)
+TTS_LOCAL_DEVICE = os.getenv('TTS_LOCAL_DEVICE', 'cpu')
+TTS_MAX_ATTEMPTS = int(os.getenv('TTS_MAX_ATTEMPTS', '3'))
+TTS_BACKOFF_BASE = float(os.getenv('TTS_BACKOFF_BASE', '0.5'))  # seconds
+TTS_BACKOFF_MAX = float(os.getenv('TTS_BACKOFF_MAX', '30'))  # seconds
+TTS_MAX_CHARS = int(os.getenv('TTS_MAX_CHARS', '500'))  # per coalesced request
+
+# Podcast speakers and the voice each one is synthesized with
+SPEAKER_VOICES = {
+    "Jane": {"accent": "EN-US", "speed": 0.9},
+    "Dr. Sharma": {"accent": "EN_INDIA", "speed": 0.9},
+}
+# Labels the model sometimes emits instead of the speaker's name
+SPEAKER_ALIASES = {
+    "Host": "Jane",
+    "Guest": "Dr. Sharma",
+    "Guest name": "Dr. Sharma",
+}
 
 # Audio Configuration
 LIGHT_GUITAR_FREQ = 440
 AMBIENT_GUITAR_FREQ = 220
 GUITAR_DURATION = 1000  # milliseconds
+AUDIO_FRAME_RATE = 44100
+AUDIO_CHANNELS = 1
+AUDIO_SAMPLE_WIDTH = 2  # bytes
+OUTPUT_CODEC = os.getenv('OUTPUT_CODEC', 'mp3')  # mp3, opus, aac or wav
+OUTPUT_BITRATE = os.getenv('OUTPUT_BITRATE', '128k')
+OUTPUT_VBR = os.getenv('OUTPUT_VBR', '0') == '1'
+PROGRESSIVE_UPDATE_EVERY = 5  # refresh the partial player once N more segments are encoded
+
+# Per-utterance post-processing
+POST_ENABLED = os.getenv('POST_ENABLED', '1') != '0'
+POST_SILENCE_DB = -50.0  # frames quieter than this are silence
+POST_PAUSE_MS = 300  # pause kept between consecutive utterances
+POST_TARGET_DBFS = -20.0  # RMS loudness target
+POST_PEAK_DBFS = -1.0  # peak ceiling applied after normalization
+
+# Mixing (NumPy engine, used when MIX_ENABLED is set)
+MIX_ENABLED = os.getenv('MIX_ENABLED', '0') == '1'
+MIX_CROSSFADE_MS = 40
+MIX_BED_GAIN_DB = -24.0  # music bed level relative to full scale
+MIX_DUCK_DB = -12.0  # extra attenuation of the bed under speech
+MIX_DUCK_THRESHOLD_DB = -45.0  # window RMS above this counts as speech
+MIX_WINDOW_MS = 50
+MIX_SPEAKER_GAINS_DB = {"Jane": 0.0, "Dr. Sharma": 0.0}
+
+# Page rendering
+RENDER_SCALE = float(os.getenv('RENDER_SCALE', '4'))  # pixels per PDF point
+RENDER_MIN_SCALE = float(os.getenv('RENDER_MIN_SCALE', '1'))  # lowest scale the memory budget may choose
+
+# Memory budget
+MEMORY_ACCOUNTING = os.getenv('MEMORY_ACCOUNTING', '0') == '1'  # attribute traced memory to stages (slower)
+MEMORY_CEILING_BYTES = int(os.getenv('MEMORY_CEILING_BYTES', '0'))  # per job; 0 = no ceiling, implies accounting
+MEMORY_IMAGE_COPIES = 3  # page images alive at once in the workflow: graph state plus in-flight requests
+SPEECH_CHARS_PER_SECOND = 15.0  # rough speaking rate used to size audio buffers
 
 # File paths
 TEMP_DIR = "temp"
 VOICES_DIR = "voices"
+WORKSPACE_DIR = os.path.join(TEMP_DIR, "jobs")  # one private subdirectory per running job
+
+# TTS cache
+TTS_CACHE_ENABLED = os.getenv('TTS_CACHE_ENABLED', '1') != '0'
+TTS_CACHE_DIR = os.getenv('TTS_CACHE_DIR', os.path.join(TEMP_DIR, "tts_cache"))
+TTS_CACHE_MAX_BYTES = int(os.getenv('TTS_CACHE_MAX_BYTES', str(512 * 1024 * 1024)))
+
+# Long documents: analyse sections in parallel, then merge them into one plan
+MAP_REDUCE_MIN_PAGES = int(os.getenv('MAP_REDUCE_MIN_PAGES', '24'))  # 0 = always one request
+SECTION_PAGES = int(os.getenv('SECTION_PAGES', '8'))  # pages per map-phase request
+
+# Workflow stage memoization: analysis per paper, dialog per step and podcast settings
+STAGE_CACHE_ENABLED = os.getenv('STAGE_CACHE_ENABLED', '1') != '0'
+STAGE_CACHE_DIR = os.getenv('STAGE_CACHE_DIR', os.path.join(TEMP_DIR, "stage_cache"))  # small JSON, never evicted
+
+# Paper store: analysis, scripts, utterance audio and podcasts indexed by paper hash and parameters
+PAPER_STORE_ENABLED = os.getenv('PAPER_STORE_ENABLED', '1') != '0'
+PAPER_STORE_DIR = os.getenv('PAPER_STORE_DIR', os.path.join(TEMP_DIR, "store"))  # never evicted by the artifact quota
+PAPER_STORE_MAX_BYTES = int(os.getenv('PAPER_STORE_MAX_BYTES', '0'))  # 0 = unlimited; else least recently used audio goes
+
+# Artifact lifecycle
+ARTIFACT_QUOTA_BYTES = int(os.getenv('ARTIFACT_QUOTA_BYTES', str(2 * 1024 * 1024 * 1024)))
+ARTIFACT_LEASE_SECONDS = float(os.getenv('ARTIFACT_LEASE_SECONDS', '120'))  # protection of a job whose process died lapses after this
+
+# Background job queue
+JOB_QUEUE_DIR = os.getenv('JOB_QUEUE_DIR', os.path.join(TEMP_DIR, "queue"))  # persistent job state, never evicted
+JOB_DB_PATH = os.path.join(JOB_QUEUE_DIR, "jobs.sqlite3")
+JOB_UPLOAD_DIR = os.path.join(JOB_QUEUE_DIR, "uploads")
+JOB_OUTPUT_DIR = os.getenv('JOB_OUTPUT_DIR', os.path.join(TEMP_DIR, "podcasts"))
+JOB_WORKERS = int(os.getenv('JOB_WORKERS', '2'))
+JOB_EMBEDDED_WORKERS = os.getenv('JOB_EMBEDDED_WORKERS', '1') != '0'  # run workers inside the Streamlit process
+JOB_POLL_INTERVAL = float(os.getenv('JOB_POLL_INTERVAL', '1.0'))
+
+# Progress reporting
+STAGE_HISTORY_PATH = os.path.join(JOB_QUEUE_DIR, "stage_rates.json")  # measured per-stage rates for ETAs
+
+# Script duration budget: estimated speech time is fitted to the length option before TTS
+DURATION_BUDGET_ENABLED = os.getenv('DURATION_BUDGET_ENABLED', '1') != '0'
+DURATION_TOLERANCE = float(os.getenv('DURATION_TOLERANCE', '1.1'))  # overshoot allowed before shortening
+DURATION_CONDENSE = os.getenv('DURATION_CONDENSE', '1') != '0'  # ask the LLM to condense before dropping turns
+SECONDS_PER_WORD = 0.4  # at speed 1.0, until calibrated from synthesized clips
+SPEECH_RATE_PATH = os.path.join(JOB_QUEUE_DIR, "speech_rates.json")  # calibrated seconds per word by language
+
+# Work distribution for solve_substeps branches and TTS requests
+WORK_BROKER = os.getenv('WORK_BROKER', 'inline')  # "inline", "thread", "process" or "remote"
+WORK_BROKER_WORKERS = int(os.getenv('WORK_BROKER_WORKERS', str(os.cpu_count() or 1)))
+WORK_BROKER_ADDRESS = os.getenv('WORK_BROKER_ADDRESS', '127.0.0.1:50000')  # where the remote broker listens
+WORK_BROKER_TASK_TIMEOUT = float(os.getenv('WORK_BROKER_TASK_TIMEOUT', '300'))  # seconds before a remote task is resent
+WORK_BROKER_TASK_ATTEMPTS = int(os.getenv('WORK_BROKER_TASK_ATTEMPTS', '2'))  # sends before the task fails
+WORK_BROKER_AUTHKEY = os.getenv('WORK_BROKER_AUTHKEY')  # shared secret for remote workers
@@ -0,0 +1,241 @@
+"""
+Progress events emitted while a paper is converted, and ETAs computed from them
+"""
+
+import os
+import json
+import time
+import threading
+from typing import NamedTuple
+from dataclasses import dataclass
+
+from .config import STAGE_HISTORY_PATH
+
+
+class ProgressEvent(NamedTuple):
+    """
+    Work completed in one stage.
+
+    Emitters that know absolute counts set ``done`` and/or ``total``;
+    emitters that only see their own piece of work set ``advance`` instead.
+    """
+    stage: str
+    done: int = None
+    total: int = None
+    advance: int = 0
+    message: str = None
+
+
+class EventBus:
+    """Thread-safe fan-out of progress events to subscribers"""
+
+    def __init__(self):
+        self._subscribers = []
+        self._lock = threading.Lock()
+
+    def subscribe(self, callback):
+        """
+        Register ``callback(event)``
+
+        Returns:
+            Zero-argument function that unsubscribes the callback
+        """
+        with self._lock:
+            self._subscribers.append(callback)
+
+        def unsubscribe():
+            with self._lock:
+                if callback in self._subscribers:
+                    self._subscribers.remove(callback)
+        return unsubscribe
+
+    def emit(self, stage: str, done: int = None, total: int = None, advance: int = 0,
+             message: str = None) -> None:
+        """Publish a ProgressEvent; subscriber errors are reported, not raised"""
+        event = ProgressEvent(stage, done, total, advance, message)
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for callback in subscribers:
+            try:
+                callback(event)
+            except Exception as e:
+                print(f"Warning: progress subscriber failed: {e}")
+
+
+# Stages that take wall-clock time in order, with the unit each one counts.
+# Audio encoding overlaps synthesis, so "audio" events are reported but do
+# not add to the ETA.
+STAGES = ("render", "workflow", "tts")
+STAGE_UNITS = {"render": "pages", "workflow": "branches", "tts": "lines", "audio": "segments"}
+STAGE_LABELS = {
+    "render": "Rendering pages",
+    "workflow": "Analyzing paper",
+    "tts": "Synthesizing speech",
+    "audio": "Encoding audio",
+}
+
+# Used until a stage has been measured on this host
+DEFAULT_RATES = {
+    "render": {"seconds_per_unit": 0.5, "units": 10},
+    "workflow": {"seconds_per_unit": 8.0, "units": 9},
+    "tts": {"seconds_per_unit": 2.0, "units": 40},
+}
+
+
+class StageHistory:
+    """
+    Historical seconds-per-unit and units-per-job for each stage, kept as an
+    exponentially weighted average in a small JSON file
+    """
+
+    def __init__(self, path: str = STAGE_HISTORY_PATH, smoothing: float = 0.3):
+        self.path = path
+        self.smoothing = smoothing
+        self._lock = threading.Lock()
+        self._rates = {stage: dict(values) for stage, values in DEFAULT_RATES.items()}
+        try:
+            with open(path, encoding="utf-8") as f:
+                for stage, values in json.load(f).items():
+                    self._rates.setdefault(stage, {}).update(values)
+        except (FileNotFoundError, ValueError):
+            pass
+
+    def rate(self, stage: str) -> dict:
+        """``{"seconds_per_unit": ..., "units": ...}`` for a stage"""
+        with self._lock:
+            return dict(self._rates.get(stage, {"seconds_per_unit": 0.0, "units": 0}))
+
+    def record(self, measurements: dict) -> None:
+        """
+        Fold one job's measurements into the history and persist it
+
+        Args:
+            measurements: ``{stage: (seconds, units)}``
+        """
+        with self._lock:
+            for stage, (seconds, units) in measurements.items():
+                if units <= 0:
+                    continue
+                current = self._rates.setdefault(stage, {"seconds_per_unit": seconds / units, "units": units})
+                for key, value in (("seconds_per_unit", seconds / units), ("units", units)):
+                    current[key] = (1 - self.smoothing) * current[key] + self.smoothing * value
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            staging = f"{self.path}.{threading.get_ident()}.tmp"
+            with open(staging, "w", encoding="utf-8") as f:
+                json.dump(self._rates, f, indent=2)
+            os.replace(staging, self.path)
+
+
+@dataclass
+class Progress:
+    """What a UI needs to render one progress update"""
+    stage: str
+    message: str
+    percent: int
+    eta_seconds: float
+    elapsed_seconds: float
+
+
+def format_eta(seconds: float) -> str:
+    """Human-friendly remaining time, e.g. ``about 2m 10s left``"""
+    seconds = int(round(seconds))
+    if seconds < 60:
+        return f"about {max(seconds, 1)}s left"
+    return f"about {seconds // 60}m {seconds % 60:02d}s left"
+
+
+class ProgressTracker:
+    """
+    Turns raw events into percentages and ETAs.
+
+    The remaining time of each stage is its remaining units times the
+    historical seconds per unit. Until a stage announces its total, the
+    historical units per job are assumed. Percent is elapsed time over
+    elapsed plus remaining time, so it advances with the work actually done
+    rather than jumping between fixed milestones.
+    """
+
+    def __init__(self, history: StageHistory = None, on_progress=None, clock=time.monotonic):
+        self.history = history or get_stage_history()
+        self.on_progress = on_progress
+        self.clock = clock
+        self.started = clock()
+        self.done = {}
+        self.totals = {}
+        self.first_seen = {}
+        self.last_seen = {}
+        self._lock = threading.Lock()
+
+    def handle(self, event: ProgressEvent) -> None:
+        """EventBus subscriber"""
+        with self._lock:
+            now = self.clock()
+            stage = event.stage
+            self.first_seen.setdefault(stage, now)
+            self.last_seen[stage] = now
+            if event.total is not None:
+                self.totals[stage] = event.total
+            if event.done is not None:
+                self.done[stage] = event.done
+            else:
+                self.done[stage] = self.done.get(stage, 0) + event.advance
+            progress = self._progress(stage, event.message, now)
+        if self.on_progress is not None:
+            self.on_progress(progress)
+
+    def remaining_seconds(self, now: float = None) -> float:
+        now = self.clock() if now is None else now
+        remaining = 0.0
+        for stage in STAGES:
+            rate = self.history.rate(stage)
+            total = self.totals.get(stage, rate["units"])
+            left = max(total - self.done.get(stage, 0), 0)
+            remaining += left * rate["seconds_per_unit"]
+            # The unit in flight has partly elapsed already
+            if left and stage in self.last_seen:
+                remaining -= min(now - self.last_seen[stage], rate["seconds_per_unit"])
+        return max(remaining, 0.0)
+
+    def _progress(self, stage: str, message: str, now: float) -> Progress:
+        elapsed = now - self.started
+        eta = self.remaining_seconds(now)
+        percent = int(100 * elapsed / (elapsed + eta)) if elapsed + eta > 0 else 0
+        done = self.done.get(stage, 0)
+        total = self.totals.get(stage)
+        count = f"{done}/{total}" if total is not None else f"{done}"
+        text = f"{STAGE_LABELS.get(stage, stage)}: {count} {STAGE_UNITS.get(stage, 'steps')}"
+        if message:
+            text += f" ({message})"
+        return Progress(stage, f"{text} - {format_eta(eta)}", min(percent, 99), eta, elapsed)
+
+    def measurements(self) -> dict:
+        """``{stage: (seconds, units)}`` observed so far for the timed stages"""
+        with self._lock:
+            return {
+                stage: (self.last_seen[stage] - self.first_seen[stage], self.done.get(stage, 0))
+                for stage in STAGES if stage in self.first_seen
+            }
+
+    def finish(self, success: bool = True) -> None:
+        """Fold this job's rates into the history when it succeeded"""
+        if not success:
+            return
+        try:
+            self.history.record(self.measurements())
+        except OSError as e:
+            print(f"Warning: could not save stage history: {e}")
+
+
+_default_history = None
+_default_history_lock = threading.Lock()
+
+
+def get_stage_history() -> StageHistory:
+    """
+    Return the process-wide stage history at STAGE_HISTORY_PATH
+    """
+    global _default_history
+    with _default_history_lock:
+        if _default_history is None:
+            _default_history = StageHistory()
+        return _default_history
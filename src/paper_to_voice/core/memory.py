@@ -0,0 +1,243 @@
+"""
+Per-stage memory accounting and a per-job memory ceiling
+"""
+
+import math
+import threading
+import tracemalloc
+
+from .config import (
+    MEMORY_ACCOUNTING, MEMORY_CEILING_BYTES, MEMORY_IMAGE_COPIES, RENDER_MIN_SCALE,
+    SPEECH_CHARS_PER_SECOND, AUDIO_FRAME_RATE, AUDIO_CHANNELS, AUDIO_SAMPLE_WIDTH,
+)
+
+# PDFium renders a BGRA bitmap and PIL keeps an RGB copy while saving
+BITMAP_BYTES_PER_PIXEL = 4 + 3
+# Working copies of one clip's PCM: decoding, resampling and sample-width
+# conversion; the mixer adds float32 copies for gain, crossfade and the bed
+AUDIO_DECODE_COPIES = 3
+AUDIO_MIX_COPIES = 8
+
+# Labels for events of stages that are not split further
+EVENT_LABELS = {"render": "render", "tts": "synthesize", "audio": "consolidate"}
+
+_lock = threading.Lock()
+_active = []
+_started_tracing = False
+
+
+def _sample() -> int:
+    """Read and reset the traced peak, handing it to every running accountant"""
+    with _lock:
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        accountants = list(_active)
+    for accountant in accountants:
+        accountant._observe(peak)
+    return current
+
+
+class MemoryAccountant:
+    """
+    Attributes one job's memory to the stages that allocated it.
+
+    Python allocations, including NumPy buffers, are traced with tracemalloc
+    relative to the traced total when the job started. Each checkpoint
+    charges the peak since the previous checkpoint to the work that just
+    finished: pages rendered, images encoded, each workflow node, each
+    synthesized line and each encoded segment. Memory allocated outside
+    Python, such as PDFium's page bitmaps, is added as an estimate.
+
+    tracemalloc is process-wide, so with several jobs in flight each job also
+    sees the others' allocations: the figures are exact for one job at a
+    time and conservative otherwise.
+    """
+
+    def __init__(self, ceiling_bytes: int = MEMORY_CEILING_BYTES, enabled: bool = None):
+        self.ceiling_bytes = ceiling_bytes or None
+        self.enabled = (MEMORY_ACCOUNTING or self.ceiling_bytes is not None) if enabled is None else enabled
+        self.baseline = 0
+        self.peak_bytes = 0
+        self.stages = {}
+        self.degraded = []
+        self._native = {}
+        self._window_peak = 0
+        self._running = False
+        self._lock = threading.Lock()
+
+    def start(self) -> "MemoryAccountant":
+        """Begin tracing, if enabled; returns self"""
+        global _started_tracing
+        if not self.enabled or self._running:
+            return self
+        with _lock:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                _started_tracing = True
+            _active.append(self)
+            self.baseline = tracemalloc.get_traced_memory()[0]
+        self._running = True
+        return self
+
+    def _observe(self, peak: int) -> None:
+        with self._lock:
+            self._window_peak = max(self._window_peak, peak)
+
+    def usage(self) -> int:
+        """Bytes traced since the job started"""
+        if not self._running:
+            return 0
+        return max(tracemalloc.get_traced_memory()[0] - self.baseline, 0)
+
+    def headroom(self) -> float:
+        """Bytes left under the ceiling (infinite without one)"""
+        if self.ceiling_bytes is None:
+            return math.inf
+        return self.ceiling_bytes - self.usage()
+
+    def fits(self, nbytes: float) -> bool:
+        """Whether allocating ``nbytes`` more stays under the ceiling"""
+        return nbytes <= self.headroom()
+
+    def set_native(self, label: str, nbytes: int) -> None:
+        """Estimate of untraced memory held during every checkpoint of ``label``"""
+        self._native[label] = nbytes
+
+    def checkpoint(self, label: str = None) -> None:
+        """
+        Charge the peak since the previous checkpoint to ``label``
+
+        Args:
+            label: Work that just finished; None only folds the peak into the
+                job total (e.g. at the start of a stage)
+        """
+        if not self._running:
+            return
+        current = _sample()
+        native = self._native.get(label, 0)
+        with self._lock:
+            peak = max(self._window_peak - self.baseline, 0) + native
+            self._window_peak = 0
+            self.peak_bytes = max(self.peak_bytes, peak)
+            if label is None:
+                return
+            entry = self.stages.setdefault(label, {"peak_bytes": 0, "held_bytes": 0, "checkpoints": 0})
+            entry["peak_bytes"] = max(entry["peak_bytes"], peak)
+            entry["held_bytes"] = max(current - self.baseline, 0)
+            entry["checkpoints"] += 1
+            if native:
+                entry["native_bytes"] = native
+
+    def handle(self, event) -> None:
+        """EventBus subscriber that checkpoints on every progress event"""
+        if event.stage == "workflow":
+            label = f"workflow:{event.message}" if event.done and event.message else None
+        elif event.done == 0 and not event.advance:
+            label = None  # a stage announcing its start
+        else:
+            label = EVENT_LABELS.get(event.stage, event.stage)
+        self.checkpoint(label)
+
+    def degrade(self, stage: str, action: str) -> None:
+        """Record a step taken to stay under the ceiling"""
+        self.degraded.append({"stage": stage, "action": action})
+        print(f"Memory budget: {stage}: {action}")
+
+    def report(self) -> dict:
+        """Ceiling, job peak, per-stage figures and degradations, in bytes"""
+        with self._lock:
+            return {
+                "ceiling_bytes": self.ceiling_bytes,
+                "peak_bytes": self.peak_bytes,
+                "stages": {label: dict(entry) for label, entry in self.stages.items()},
+                "degraded": list(self.degraded),
+            }
+
+    def finish(self) -> None:
+        """Stop accounting; tracing stops when no job needs it any more"""
+        global _started_tracing
+        if not self._running:
+            return
+        self.checkpoint()
+        self._running = False
+        with _lock:
+            _active.remove(self)
+            if not _active and _started_tracing:
+                tracemalloc.stop()
+                _started_tracing = False
+
+
+def _round_scale(scale: float) -> float:
+    return math.floor(scale * 4) / 4
+
+
+def fit_render_scale(page_sizes: list[tuple[float, float]], scale: float, headroom: float,
+                     min_scale: float = RENDER_MIN_SCALE) -> float:
+    """
+    Largest render scale up to ``scale`` whose biggest page bitmap fits
+
+    Args:
+        page_sizes: ``(width, height)`` of each page in PDF points
+        scale: Preferred scale
+        headroom: Bytes available
+        min_scale: Scale never rendered below
+
+    Returns:
+        Scale to render at (a multiple of 0.25)
+    """
+    if not page_sizes or math.isinf(headroom):
+        return scale
+    area = max(width * height for width, height in page_sizes)
+    fitting = math.sqrt(max(headroom, 0) / (area * BITMAP_BYTES_PER_PIXEL))
+    return max(min_scale, min(scale, _round_scale(fitting)))
+
+
+def render_bytes(page_sizes: list[tuple[float, float]], scale: float) -> int:
+    """Estimated untraced memory while rendering the biggest page"""
+    if not page_sizes:
+        return 0
+    return int(max(width * height for width, height in page_sizes) * scale ** 2 * BITMAP_BYTES_PER_PIXEL)
+
+
+def fit_image_scale(encoded_bytes: int, scale: float, headroom: float,
+                    copies: int = MEMORY_IMAGE_COPIES, min_scale: float = RENDER_MIN_SCALE) -> float:
+    """
+    Render scale at which the workflow's copies of the page images fit
+
+    The base64 images stay in the graph state for the whole run and every
+    concurrent LLM request serializes them again. Encoded size grows with
+    the pixel count, i.e. with the square of the scale.
+
+    Args:
+        encoded_bytes: Size of the images encoded at ``scale``, which are
+            already allocated
+        scale: Scale the pages were rendered at
+        headroom: Bytes available on top of the encoded images
+        copies: Copies of the images alive at once during the workflow
+
+    Returns:
+        ``scale`` if the images fit, otherwise a smaller scale
+    """
+    needed = encoded_bytes * copies
+    available = headroom + encoded_bytes
+    if not encoded_bytes or needed <= available:
+        return scale
+    return max(min_scale, min(scale, _round_scale(scale * math.sqrt(max(available, 0) / needed))))
+
+
+def audio_working_set(longest_chars: int, clips_in_flight: int, mixing: bool) -> int:
+    """
+    Estimated memory for synthesizing and consolidating the audio
+
+    Args:
+        longest_chars: Length of the longest utterance
+        clips_in_flight: Clips synthesized ahead of the encoder
+        mixing: Whether the mixer runs
+
+    Returns:
+        Bytes needed for the clips in flight plus the one being consolidated
+    """
+    seconds = longest_chars / SPEECH_CHARS_PER_SECOND
+    pcm = seconds * AUDIO_FRAME_RATE * AUDIO_CHANNELS * AUDIO_SAMPLE_WIDTH
+    copies = AUDIO_DECODE_COPIES + (AUDIO_MIX_COPIES if mixing else 0)
+    return int(pcm * (clips_in_flight + copies))
@@ -17,6 +17,31 @@ class State(TypedDict):
     plan: str
     Dialog: Annotated[list, operator.add]
 
+    # Podcast settings forwarded to generate_dialog
+    tone: str
+    length: str
+    language: str
+
+    # Map-reduce analysis of long documents: page ranges and their outlines
+    section_ranges: list
+    sections: Annotated[list, operator.add]
+
+
+class SectionState(TypedDict):
+    """One map-phase request: the pages of a single section"""
+    section: dict
+    total: int
+    image_path: list
+
+
+class DialogState(TypedDict):
+    """State of the dialog graph: one generate_dialog branch per requested script"""
+    requests: list
+    Request: Annotated[list, operator.add]
+    Step: Annotated[list, operator.add]
+    Finding: Annotated[list, operator.add]
+    Dialog: Annotated[list, operator.add]
+
 
 class Task(BaseModel):
     task: str
@@ -0,0 +1,388 @@
+"""
+Pluggable work brokers that fan independent tasks out to threads, processes
+or other hosts
+
+Tasks are referred to by name so they can be shipped to another process. The
+built-in tasks are one ``solve_substeps`` analysis branch, one map-phase
+section outline and one utterance synthesis. Results come back as futures;
+``imap`` yields them in submission order, so callers merge them into
+workflow state and the audio stream in the order they were issued.
+
+Remote worker hosts connect to the broker of a running app or CLI:
+
+    python -m src.paper_to_voice.jobs.broker coordinator-host:50000 --workers 4
+"""
+
+import os
+import sys
+import time
+import uuid
+import queue
+import argparse
+import threading
+import traceback
+from abc import ABC, abstractmethod
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, ProcessPoolExecutor
+from multiprocessing.managers import BaseManager
+
+from ..core.config import (
+    WORK_BROKER, WORK_BROKER_WORKERS, WORK_BROKER_ADDRESS, WORK_BROKER_AUTHKEY,
+    WORK_BROKER_TASK_TIMEOUT, WORK_BROKER_TASK_ATTEMPTS,
+)
+
+
+def _solve_substeps(state: dict) -> dict:
+    from ..workflow.steps import solve_substeps
+    return solve_substeps(state)
+
+
+def _summarize_section(state: dict) -> dict:
+    from ..workflow.steps import summarize_section
+    return summarize_section(state)
+
+
+def _synthesize(utterance, language: str, pacing=None, cache=None, events=None) -> tuple[str, bool]:
+    from ..audio.tts import synthesize_clip
+    return synthesize_clip(utterance, language, pacing, cache, events)
+
+
+def _synthesize_bytes(utterance, language: str) -> tuple[str, bytes, bool]:
+    # Paths are meaningless on another host, so the audio itself is returned
+    path, fresh = _synthesize(utterance, language)
+    with open(path, "rb") as f:
+        return os.path.splitext(path)[1] or ".wav", f.read(), fresh
+
+
+_TASKS = {
+    "solve_substeps": _solve_substeps,
+    "summarize_section": _summarize_section,
+    "synthesize": _synthesize,
+    "synthesize_bytes": _synthesize_bytes,
+}
+
+
+def register_task(name: str, func) -> None:
+    """
+    Make a module-level function callable through brokers
+
+    Remote and process workers resolve tasks by name, so the registration
+    must also happen in the worker (e.g. at import of the defining module).
+    """
+    _TASKS[name] = func
+
+
+def run_task(name: str, args: tuple = (), kwargs: dict = None):
+    """Execute a registered task in the current process"""
+    if name not in _TASKS:
+        raise ValueError(f"Unknown task {name!r}; available: {sorted(_TASKS)}")
+    return _TASKS[name](*args, **(kwargs or {}))
+
+
+class Broker(ABC):
+    """
+    Interface for running named tasks somewhere and returning futures.
+
+    ``in_process`` brokers run tasks in this interpreter, so arguments may be
+    live objects (pacing policies, event buses) and returned file paths are
+    valid here. Other brokers pickle arguments and results.
+    """
+
+    name = "base"
+    in_process = True
+    workers = 1
+
+    @abstractmethod
+    def submit(self, task: str, *args, **kwargs) -> Future:
+        """Run one named task; the future resolves to its result"""
+
+    def imap(self, task: str, arg_tuples, window: int = None):
+        """
+        Submit one task per argument tuple, keeping ``window`` in flight
+
+        Yields:
+            Futures in submission order
+        """
+        window = window or 2 * self.workers
+        pending = deque()
+        for args in arg_tuples:
+            pending.append(self.submit(task, *args))
+            if len(pending) >= window:
+                yield pending.popleft()
+        while pending:
+            yield pending.popleft()
+
+    def close(self) -> None:
+        pass
+
+
+class InlineBroker(Broker):
+    """Runs each task immediately in the calling thread (no distribution)"""
+
+    name = "inline"
+
+    def submit(self, task: str, *args, **kwargs) -> Future:
+        future = Future()
+        try:
+            future.set_result(run_task(task, args, kwargs))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+
+class ThreadBroker(Broker):
+    """Runs tasks on a thread pool in this process"""
+
+    name = "thread"
+
+    def __init__(self, workers: int = WORK_BROKER_WORKERS):
+        self.workers = workers
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="broker")
+
+    def submit(self, task: str, *args, **kwargs) -> Future:
+        return self._executor.submit(run_task, task, args, kwargs)
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+
+
+class ProcessBroker(Broker):
+    """Runs tasks in a pool of worker processes on this host, bypassing the GIL"""
+
+    name = "process"
+    in_process = False
+
+    def __init__(self, workers: int = WORK_BROKER_WORKERS):
+        self.workers = workers
+        self._executor = ProcessPoolExecutor(max_workers=workers)
+
+    def submit(self, task: str, *args, **kwargs) -> Future:
+        return self._executor.submit(run_task, task, args, kwargs)
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+
+
+# Queues served by the manager process of a RemoteBroker
+_task_queue = queue.Queue()
+_result_queue = queue.Queue()
+
+
+def _get_task_queue():
+    return _task_queue
+
+
+def _get_result_queue():
+    return _result_queue
+
+
+class _QueueManager(BaseManager):
+    pass
+
+
+_QueueManager.register("tasks", callable=_get_task_queue)
+_QueueManager.register("results", callable=_get_result_queue)
+
+
+def _parse_address(address) -> tuple[str, int]:
+    if isinstance(address, str):
+        host, _, port = address.rpartition(":")
+        return host or "127.0.0.1", int(port)
+    return address
+
+
+def _authkey(authkey) -> bytes:
+    authkey = authkey or WORK_BROKER_AUTHKEY
+    if not authkey:
+        raise ValueError("WORK_BROKER_AUTHKEY must be set to use the remote broker")
+    return authkey.encode() if isinstance(authkey, str) else authkey
+
+
+class RemoteBroker(Broker):
+    """
+    Serves a task queue over the network for workers on any host.
+
+    A ``multiprocessing`` manager process listens on ``address`` and holds a
+    task queue and a result queue. Workers started with
+    ``python -m src.paper_to_voice.jobs.broker`` pull tasks, run them and push
+    results; a collector thread here resolves the matching futures.
+
+    Each send of a task is a lease of ``task_timeout`` seconds. A task with
+    no result by then (no worker connected, or its worker died) is sent
+    again, and fails with TimeoutError after ``attempts`` sends; whichever
+    result arrives first wins.
+    """
+
+    name = "remote"
+    in_process = False
+
+    def __init__(self, address=WORK_BROKER_ADDRESS, authkey=None, workers: int = WORK_BROKER_WORKERS,
+                 task_timeout: float = WORK_BROKER_TASK_TIMEOUT, attempts: int = WORK_BROKER_TASK_ATTEMPTS):
+        self.workers = workers
+        self.task_timeout = task_timeout
+        self.attempts = max(1, attempts)
+        self._manager = _QueueManager(address=_parse_address(address), authkey=_authkey(authkey))
+        self._manager.start()
+        self.address = self._manager.address
+        self._tasks = self._manager.tasks()
+        self._pending = {}  # task_id -> [future, message, deadline, sends]
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+        self._collector = threading.Thread(target=self._collect, name="broker-collector", daemon=True)
+        self._collector.start()
+
+    def submit(self, task: str, *args, **kwargs) -> Future:
+        future = Future()
+        task_id = uuid.uuid4().hex
+        message = (task_id, task, args, kwargs)
+        with self._lock:
+            if self._closed.is_set():
+                raise RuntimeError("Remote broker is closed")
+            self._pending[task_id] = [future, message, time.monotonic() + self.task_timeout, 1]
+            self._tasks.put(message)
+        return future
+
+    def _expire(self) -> None:
+        now = time.monotonic()
+        expired, resend = [], []
+        with self._lock:
+            for task_id, entry in list(self._pending.items()):
+                future, message, deadline, sends = entry
+                if deadline > now:
+                    continue
+                if sends >= self.attempts:
+                    del self._pending[task_id]
+                    expired.append((future, message[1], sends))
+                else:
+                    entry[2], entry[3] = now + self.task_timeout, sends + 1
+                    resend.append(message)
+            for message in resend:
+                self._tasks.put(message)
+        for future, task, sends in expired:
+            future.set_exception(TimeoutError(
+                f"Remote task {task!r} got no result after {sends} send(s) of {self.task_timeout:g}s"))
+
+    def _collect(self) -> None:
+        results = self._manager.results()
+        while not self._closed.is_set():
+            try:
+                task_id, ok, value = results.get(timeout=0.5)
+            except queue.Empty:
+                self._expire()
+                continue
+            except (EOFError, OSError):
+                self._fail_pending("Remote broker lost its task queue")
+                break
+            with self._lock:
+                entry = self._pending.pop(task_id, None)
+            if entry is not None:
+                future = entry[0]
+                if ok:
+                    future.set_result(value)
+                else:
+                    future.set_exception(RuntimeError(f"Remote task failed:\n{value}"))
+            self._expire()
+
+    def _fail_pending(self, reason: str) -> None:
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        for future, *_ in pending.values():
+            future.set_exception(RuntimeError(reason))
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed.set()
+        self._collector.join()
+        self._fail_pending("Remote broker closed before the task finished")
+        self._manager.shutdown()
+
+
+def serve_worker(address, authkey=None, workers: int = 1, stop: threading.Event = None) -> None:
+    """
+    Pull tasks from a RemoteBroker and push back results until ``stop`` is set
+
+    Args:
+        address: ``host:port`` of the broker
+        authkey: Shared secret (default: WORK_BROKER_AUTHKEY)
+        workers: Tasks run concurrently by this host
+        stop: Optional event that ends the loop
+    """
+    manager = _QueueManager(address=_parse_address(address), authkey=_authkey(authkey))
+    manager.connect()
+    stop = stop or threading.Event()
+
+    def loop():
+        tasks, results = manager.tasks(), manager.results()
+        while not stop.is_set():
+            try:
+                task_id, task, args, kwargs = tasks.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            try:
+                results.put((task_id, True, run_task(task, args, kwargs)))
+            except Exception:
+                results.put((task_id, False, traceback.format_exc()))
+
+    threads = [threading.Thread(target=loop, name=f"broker-worker-{i}", daemon=True) for i in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+_REGISTRY = {
+    InlineBroker.name: InlineBroker,
+    ThreadBroker.name: ThreadBroker,
+    ProcessBroker.name: ProcessBroker,
+    RemoteBroker.name: RemoteBroker,
+}
+_INSTANCES = {}
+_INSTANCES_LOCK = threading.Lock()
+
+
+def register_broker(name: str, factory) -> None:
+    """
+    Register a broker under a name selectable through ``WORK_BROKER``
+
+    Args:
+        name: Broker name
+        factory: Zero-argument callable returning a Broker
+    """
+    _REGISTRY[name] = factory
+    _INSTANCES.pop(name, None)
+
+
+def get_broker(name: str = None) -> Broker:
+    """
+    Return the shared instance of a registered broker
+
+    Args:
+        name: Broker name (default: the ``WORK_BROKER`` setting)
+    """
+    name = name or WORK_BROKER
+    if name not in _REGISTRY:
+        raise ValueError(f"Unknown work broker {name!r}; available: {sorted(_REGISTRY)}")
+    with _INSTANCES_LOCK:
+        if name not in _INSTANCES:
+            _INSTANCES[name] = _REGISTRY[name]()
+        return _INSTANCES[name]
+
+
+def main(argv: list[str] = None) -> int:
+    """Run a remote worker host until interrupted"""
+    parser = argparse.ArgumentParser(description="Run analysis and TTS tasks for a remote broker.")
+    parser.add_argument("address", help="host:port of the broker (WORK_BROKER_ADDRESS on the coordinator)")
+    parser.add_argument("-w", "--workers", type=int, default=WORK_BROKER_WORKERS)
+    parser.add_argument("--authkey", help="Shared secret (default: WORK_BROKER_AUTHKEY)")
+    args = parser.parse_args(argv)
+
+    print(f"{args.workers} worker(s) serving {args.address}")
+    try:
+        serve_worker(args.address, args.authkey, args.workers)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,302 @@
+"""
+Durable SQLite-backed queue of paper-to-podcast jobs
+"""
+
+import os
+import json
+import time
+import uuid
+import shutil
+import sqlite3
+import hashlib
+import threading
+from dataclasses import dataclass, field
+
+from ..core.config import JOB_DB_PATH, JOB_UPLOAD_DIR
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+FINISHED = (SUCCEEDED, FAILED)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    pdf_path TEXT NOT NULL,
+    input_hash TEXT,
+    params TEXT NOT NULL,
+    progress INTEGER NOT NULL DEFAULT 0,
+    message TEXT,
+    partial_path TEXT,
+    partial_segments INTEGER NOT NULL DEFAULT 0,
+    result TEXT,
+    error TEXT,
+    worker TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_status_created ON jobs (status, created_at);
+"""
+_INPUT_INDEX = "CREATE INDEX IF NOT EXISTS jobs_input ON jobs (input_hash, params)"
+
+
+def file_digest(path: str) -> str:
+    """
+    SHA-256 of a file's contents, used to recognise re-submitted papers
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+@dataclass
+class Job:
+    """Snapshot of one queued job"""
+    id: str
+    status: str
+    pdf_path: str
+    input_hash: str = None
+    params: dict = field(default_factory=dict)
+    progress: int = 0
+    message: str = None
+    partial_path: str = None
+    partial_segments: int = 0
+    result: dict = None
+    error: str = None
+    worker: str = None
+    attempts: int = 0
+    created_at: float = None
+    started_at: float = None
+    finished_at: float = None
+
+    @property
+    def done(self) -> bool:
+        return self.status in FINISHED
+
+    @property
+    def output_path(self) -> str | None:
+        return (self.result or {}).get("output_path")
+
+    @classmethod
+    def from_row(cls, row: sqlite3.Row) -> "Job":
+        data = dict(row)
+        data["params"] = json.loads(data["params"])
+        data["result"] = json.loads(data["result"]) if data["result"] else None
+        return cls(**data)
+
+
+class JobQueue:
+    """
+    Job queue persisted in a SQLite database.
+
+    Any number of processes may submit to and claim from the same database
+    file: claiming is a single ``BEGIN IMMEDIATE`` transaction, so each job is
+    handed to exactly one worker. Jobs left ``running`` by a crashed worker
+    are put back in the queue with ``requeue``.
+    """
+
+    def __init__(self, db_path: str = JOB_DB_PATH, upload_dir: str = JOB_UPLOAD_DIR):
+        self.db_path = db_path
+        self.upload_dir = upload_dir
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        os.makedirs(upload_dir, exist_ok=True)
+        conn = self._connect()
+        conn.executescript(_SCHEMA)
+        # Databases created by earlier versions lack the newer columns
+        columns = [row["name"] for row in conn.execute("PRAGMA table_info(jobs)")]
+        for column, definition in (("input_hash", "TEXT"), ("partial_segments", "INTEGER NOT NULL DEFAULT 0")):
+            if column not in columns:
+                conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {definition}")
+        conn.execute(_INPUT_INDEX)
+
+    def _connect(self) -> sqlite3.Connection:
+        # sqlite3 connections must not be shared between threads
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _update(self, job_id: str, **columns) -> None:
+        assignments = ", ".join(f"{name} = ?" for name in columns)
+        self._connect().execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*columns.values(), job_id))
+
+    def submit(self, pdf_path: str, copy: bool = True, input_hash: str = None, **params) -> str:
+        """
+        Add a paper to the queue
+
+        Args:
+            pdf_path: Research paper to convert
+            copy: Copy the PDF into the queue's upload directory so the caller
+                may delete its file right away; the copy is removed once the
+                job finishes
+            input_hash: Content hash of the PDF (computed when omitted)
+            **params: Keyword arguments forwarded to ``run_pipeline``
+                (tone, language, length)
+
+        Returns:
+            Job identifier
+        """
+        job_id = uuid.uuid4().hex
+        input_hash = input_hash or file_digest(pdf_path)
+        if copy:
+            target = os.path.join(self.upload_dir, f"{job_id}-{os.path.basename(pdf_path)}")
+            pdf_path = shutil.copyfile(pdf_path, target)
+        self._connect().execute(
+            "INSERT INTO jobs (id, status, pdf_path, input_hash, params, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+            (job_id, QUEUED, os.path.abspath(pdf_path), input_hash, json.dumps(params, sort_keys=True),
+             time.time()),
+        )
+        return job_id
+
+    def claim(self, worker: str) -> Job | None:
+        """
+        Atomically take the oldest queued job
+
+        Args:
+            worker: Name recorded against the job for diagnostics
+
+        Returns:
+            The claimed job, or None when the queue is empty
+        """
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT id FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1", (QUEUED,)
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = ?, worker = ?, started_at = ?, attempts = attempts + 1, "
+                "message = ?, progress = 0 WHERE id = ?",
+                (RUNNING, worker, time.time(), "Starting...", row["id"]),
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return self.get(row["id"])
+
+    def set_progress(self, job_id: str, message: str, percent: int) -> None:
+        """Record a status message and percentage for a running job"""
+        self._update(job_id, message=message, progress=int(percent))
+
+    def set_partial(self, job_id: str, partial_path: str, segments: int = 0) -> None:
+        """Record the growing output file and how many segments it holds, for progressive playback"""
+        self._update(job_id, partial_path=partial_path, partial_segments=int(segments))
+
+    def complete(self, job_id: str, result: dict) -> None:
+        """
+        Mark a job finished with the pipeline's result dictionary
+
+        The job succeeds if ``result["ok"]`` is true, otherwise it fails with
+        ``result["error"]``.
+        """
+        columns = {"status": FAILED, "result": json.dumps(result), "error": result.get("error"),
+                   "finished_at": time.time()}
+        if result.get("ok"):
+            columns.update(status=SUCCEEDED, progress=100)
+        self._update(job_id, **columns)
+        self._discard_upload(job_id)
+
+    def fail(self, job_id: str, error: str) -> None:
+        """Mark a job failed without a pipeline result"""
+        self._update(job_id, status=FAILED, error=error, finished_at=time.time())
+        self._discard_upload(job_id)
+
+    def _discard_upload(self, job_id: str) -> None:
+        job = self.get(job_id)
+        if job and os.path.dirname(job.pdf_path) == os.path.abspath(self.upload_dir):
+            try:
+                os.remove(job.pdf_path)
+            except FileNotFoundError:
+                pass
+
+    def requeue(self, job_ids: list[str]) -> int:
+        """
+        Return ``running`` jobs to the queue, e.g. after their worker crashed
+
+        Returns:
+            Number of jobs requeued
+        """
+        conn = self._connect()
+        requeued = 0
+        for job_id in job_ids:
+            requeued += conn.execute(
+                "UPDATE jobs SET status = ?, worker = NULL, message = ? WHERE id = ? AND status = ?",
+                (QUEUED, "Requeued after interruption", job_id, RUNNING),
+            ).rowcount
+        return requeued
+
+    def get(self, job_id: str) -> Job | None:
+        """Fetch the current state of a job"""
+        row = self._connect().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return Job.from_row(row) if row else None
+
+    def find(self, input_hash: str, **params) -> Job | None:
+        """
+        Latest job for the same paper and parameters that has not failed
+
+        Args:
+            input_hash: Content hash from ``file_digest``
+            **params: Parameters the job was submitted with
+
+        Returns:
+            A queued, running or succeeded job, or None
+        """
+        row = self._connect().execute(
+            "SELECT * FROM jobs WHERE input_hash = ? AND params = ? AND status != ? "
+            "ORDER BY created_at DESC LIMIT 1",
+            (input_hash, json.dumps(params, sort_keys=True), FAILED),
+        ).fetchone()
+        return Job.from_row(row) if row else None
+
+    def list(self, status: str = None, limit: int = 100) -> list[Job]:
+        """Most recent jobs first, optionally filtered by status (``limit=-1`` for all)"""
+        if status:
+            rows = self._connect().execute(
+                "SELECT * FROM jobs WHERE status = ? ORDER BY created_at DESC LIMIT ?", (status, limit))
+        else:
+            rows = self._connect().execute("SELECT * FROM jobs ORDER BY created_at DESC LIMIT ?", (limit,))
+        return [Job.from_row(row) for row in rows]
+
+    def position(self, job_id: str) -> int:
+        """Number of queued jobs ahead of ``job_id`` (0 once it is running)"""
+        row = self._connect().execute(
+            "SELECT COUNT(*) FROM jobs WHERE status = ? AND created_at < "
+            "(SELECT created_at FROM jobs WHERE id = ? AND status = ?)",
+            (QUEUED, job_id, QUEUED),
+        ).fetchone()
+        return row[0]
+
+    def counts(self) -> dict:
+        """Number of jobs in each status"""
+        rows = self._connect().execute("SELECT status, COUNT(*) FROM jobs GROUP BY status")
+        return {status: count for status, count in rows}
+
+
+_default_queue = None
+_default_queue_lock = threading.Lock()
+
+
+def get_default_queue() -> JobQueue:
+    """
+    Return the process-wide job queue at JOB_DB_PATH
+    """
+    global _default_queue
+    with _default_queue_lock:
+        if _default_queue is None:
+            _default_queue = JobQueue()
+        return _default_queue
@@ -0,0 +1,287 @@
+"""
+Persistent store of everything generated for a paper, indexed in SQLite
+
+Records are keyed by the paper's content hash, a kind (``analysis``,
+``script``, ``utterance``, ``podcast``) and the generation parameters that
+produced them. Small JSON results live in the index itself; audio is kept in
+content-addressed blob files, so a clip shared by several podcasts is stored
+once.
+
+    python -m src.paper_to_voice.jobs.store              # papers and their records
+    python -m src.paper_to_voice.jobs.store --forget HASH
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import sqlite3
+import argparse
+import threading
+from dataclasses import dataclass, field
+
+from ..core.config import PAPER_STORE_ENABLED, PAPER_STORE_DIR, PAPER_STORE_MAX_BYTES
+from .queue import file_digest
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    digest TEXT PRIMARY KEY,
+    path TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS records (
+    paper_hash TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    params TEXT NOT NULL,
+    value TEXT,
+    digest TEXT REFERENCES blobs (digest),
+    created_at REAL NOT NULL,
+    used_at REAL NOT NULL,
+    PRIMARY KEY (paper_hash, kind, params)
+);
+CREATE INDEX IF NOT EXISTS records_used ON records (used_at);
+CREATE INDEX IF NOT EXISTS records_digest ON records (digest);
+"""
+
+
+@dataclass
+class Record:
+    """One stored result; ``value`` for JSON results, ``path`` for files"""
+    paper_hash: str
+    kind: str
+    params: dict = field(default_factory=dict)
+    value: object = None
+    path: str = None
+    size: int = 0
+    created_at: float = None
+
+
+class PaperStore:
+    """
+    Generated results of every paper, looked up by paper and parameters.
+
+    The index is a SQLite database at ``<root>/index.sqlite3``; blobs live at
+    ``<root>/blobs/<digest[:2]>/<digest><ext>``; clips are hard-linked from
+    the TTS cache where the filesystem allows it. Like the job queue, any
+    number of threads and processes may share a store.
+    """
+
+    def __init__(self, root: str = PAPER_STORE_DIR):
+        self.root = root
+        self.db_path = os.path.join(root, "index.sqlite3")
+        self.hits = {}
+        self.misses = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        os.makedirs(os.path.join(root, "blobs"), exist_ok=True)
+        self._connect().executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        # sqlite3 connections must not be shared between threads
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _count(self, counts: dict, kind: str) -> None:
+        with self._lock:
+            counts[kind] = counts.get(kind, 0) + 1
+
+    def _record(self, row: sqlite3.Row) -> Record:
+        return Record(
+            paper_hash=row["paper_hash"],
+            kind=row["kind"],
+            params=json.loads(row["params"]),
+            value=json.loads(row["value"]) if row["value"] is not None else None,
+            path=os.path.join(self.root, row["path"]) if row["path"] else None,
+            size=row["size"] or 0,
+            created_at=row["created_at"],
+        )
+
+    def get(self, paper_hash: str, kind: str, params: dict) -> Record | None:
+        """
+        Look up a result and mark it as recently used
+
+        Args:
+            paper_hash: Content hash from ``file_digest``
+            kind: Result kind
+            params: Parameters the result was generated with
+
+        Returns:
+            The record, or None on a miss (including a blob deleted from disk)
+        """
+        conn = self._connect()
+        key = (paper_hash, kind, json.dumps(params, sort_keys=True))
+        row = conn.execute(
+            "SELECT records.*, blobs.path, blobs.size FROM records LEFT JOIN blobs USING (digest) "
+            "WHERE paper_hash = ? AND kind = ? AND params = ?",
+            key,
+        ).fetchone()
+        record = self._record(row) if row else None
+        if record is not None and row["digest"] and not os.path.exists(record.path):
+            conn.execute("DELETE FROM records WHERE paper_hash = ? AND kind = ? AND params = ?", key)
+            record = None
+        if record is None:
+            self._count(self.misses, kind)
+            return None
+        conn.execute("UPDATE records SET used_at = ? WHERE paper_hash = ? AND kind = ? AND params = ?",
+                     (time.time(), *key))
+        self._count(self.hits, kind)
+        return record
+
+    def _upsert(self, paper_hash: str, kind: str, params: dict, value: str = None, digest: str = None) -> None:
+        now = time.time()
+        self._connect().execute(
+            "INSERT OR REPLACE INTO records (paper_hash, kind, params, value, digest, created_at, used_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (paper_hash, kind, json.dumps(params, sort_keys=True), value, digest, now, now),
+        )
+
+    def put_json(self, paper_hash: str, kind: str, params: dict, value) -> None:
+        """Store a JSON-serializable result"""
+        self._upsert(paper_hash, kind, params, value=json.dumps(value))
+
+    def put_file(self, paper_hash: str, kind: str, params: dict, source_path: str, link: bool = True) -> str:
+        """
+        Store a file result; the source file is left in place
+
+        Args:
+            paper_hash: Content hash from ``file_digest``
+            kind: Result kind
+            params: Parameters the result was generated with
+            source_path: File to store
+            link: Hard-link rather than copy when possible; only for sources
+                that are replaced, never rewritten in place
+
+        Returns:
+            Path to the stored blob
+        """
+        digest = file_digest(source_path)
+        relative = os.path.join("blobs", digest[:2], digest + (os.path.splitext(source_path)[1] or ".bin"))
+        target = os.path.join(self.root, relative)
+        if not os.path.exists(target):
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            staging = f"{target}.{threading.get_ident()}.tmp"
+            if link:
+                try:
+                    os.link(source_path, staging)
+                except OSError:
+                    link = False  # e.g. another filesystem
+            if not link:
+                shutil.copyfile(source_path, staging)
+            os.replace(staging, target)
+        self._connect().execute(
+            "INSERT OR REPLACE INTO blobs (digest, path, size, created_at) VALUES (?, ?, ?, ?)",
+            (digest, relative, os.path.getsize(target), time.time()),
+        )
+        self._upsert(paper_hash, kind, params, digest=digest)
+        return target
+
+    def records(self, paper_hash: str = None) -> list[Record]:
+        """Records of one paper (or all papers), most recently used first"""
+        query = "SELECT records.*, blobs.path, blobs.size FROM records LEFT JOIN blobs USING (digest)"
+        args = ()
+        if paper_hash:
+            query, args = query + " WHERE paper_hash = ?", (paper_hash,)
+        return [self._record(row) for row in self._connect().execute(query + " ORDER BY used_at DESC", args)]
+
+    def _collect_blobs(self) -> int:
+        conn = self._connect()
+        rows = conn.execute(
+            "SELECT digest, path, size FROM blobs WHERE digest NOT IN "
+            "(SELECT digest FROM records WHERE digest IS NOT NULL)"
+        ).fetchall()
+        for row in rows:
+            try:
+                os.remove(os.path.join(self.root, row["path"]))
+            except FileNotFoundError:
+                pass
+            conn.execute("DELETE FROM blobs WHERE digest = ?", (row["digest"],))
+        return sum(row["size"] for row in rows)
+
+    def forget(self, paper_hash: str) -> int:
+        """
+        Remove every record of a paper
+
+        Returns:
+            Bytes of blobs freed
+        """
+        self._connect().execute("DELETE FROM records WHERE paper_hash = ?", (paper_hash,))
+        return self._collect_blobs()
+
+    def size_bytes(self) -> int:
+        """Total size of the stored blobs"""
+        return self._connect().execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+
+    def prune(self, max_bytes: int = PAPER_STORE_MAX_BYTES) -> int:
+        """
+        Drop least recently used file records until blobs fit in ``max_bytes``
+
+        Args:
+            max_bytes: Size cap; 0 keeps everything
+
+        Returns:
+            Bytes of blobs freed
+        """
+        if not max_bytes:
+            return 0
+        conn = self._connect()
+        freed = 0
+        while self.size_bytes() > max_bytes:
+            row = conn.execute(
+                "SELECT paper_hash, kind, params FROM records WHERE digest IS NOT NULL ORDER BY used_at LIMIT 1"
+            ).fetchone()
+            if row is None:
+                break
+            conn.execute("DELETE FROM records WHERE paper_hash = ? AND kind = ? AND params = ?", tuple(row))
+            freed += self._collect_blobs()
+        return freed
+
+    def stats(self) -> dict:
+        """Hits and misses per kind"""
+        with self._lock:
+            return {"hits": dict(self.hits), "misses": dict(self.misses)}
+
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+
+def get_paper_store() -> PaperStore | None:
+    """
+    Return the process-wide paper store, or None when it is disabled
+    """
+    global _default_store
+    with _default_store_lock:
+        if PAPER_STORE_ENABLED and _default_store is None:
+            _default_store = PaperStore()
+        return _default_store
+
+
+def main(argv: list[str] = None) -> int:
+    """List or forget stored papers"""
+    parser = argparse.ArgumentParser(description="Inspect the store of generated podcasts.")
+    parser.add_argument("paper", nargs="?", help="Show the records of one paper hash")
+    parser.add_argument("--forget", metavar="HASH", help="Remove every record of a paper")
+    parser.add_argument("--root", default=PAPER_STORE_DIR)
+    args = parser.parse_args(argv)
+
+    store = PaperStore(args.root)
+    if args.forget:
+        print(f"Freed {store.forget(args.forget)} bytes")
+        return 0
+    for record in store.records(args.paper):
+        detail = record.path or f"{len(json.dumps(record.value))} bytes of JSON"
+        print(f"{record.paper_hash[:12]}  {record.kind:9}  {json.dumps(record.params, sort_keys=True)}  {detail}")
+    print(f"{store.size_bytes()} bytes of blobs in {store.root}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
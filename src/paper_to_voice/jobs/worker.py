@@ -0,0 +1,182 @@
+"""
+Background workers that drain the job queue
+
+Workers run inside the Streamlit process by default (``JOB_EMBEDDED_WORKERS``)
+or standalone, sharing the same queue database:
+
+    python -m src.paper_to_voice.jobs.worker --workers 4
+"""
+
+import os
+import sys
+import time
+import socket
+import argparse
+import itertools
+import threading
+import traceback
+
+from ..core.config import JOB_WORKERS, JOB_POLL_INTERVAL, JOB_OUTPUT_DIR, OUTPUT_CODEC
+from ..audio.encoder import CODECS
+from .queue import JobQueue, RUNNING, get_default_queue
+
+
+# Names of the worker threads alive in this process, across all pools
+_live_workers = set()
+_live_workers_lock = threading.Lock()
+_pool_ids = itertools.count()
+
+
+def _is_orphaned(worker: str) -> bool:
+    """True if a job's worker ran on this host in a process that has exited"""
+    host, _, pid = (worker or "").split("/")[0].rpartition(":")
+    if host != socket.gethostname() or not pid.isdigit():
+        return False
+    if int(pid) == os.getpid():
+        # Our own pid: either another pool of this process is still running
+        # the job, or an earlier process that had the same pid claimed it
+        with _live_workers_lock:
+            return worker not in _live_workers
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return True
+    except PermissionError:
+        return False
+    return False
+
+
+def _default_runner(*args, **kwargs):
+    # The pipeline pulls in the LLM and TTS stacks; processes that only
+    # submit or poll never pay for that import
+    from ..pipeline import run_pipeline
+    return run_pipeline(*args, **kwargs)
+
+
+class WorkerPool:
+    """
+    Fixed pool of threads that claim jobs and run them through the pipeline.
+
+    Throughput is bounded by ``workers`` regardless of how many sessions
+    submit. Runs survive Streamlit reruns and browser disconnects because
+    they are not tied to a script run.
+    """
+
+    def __init__(self, queue: JobQueue = None, workers: int = JOB_WORKERS,
+                 poll_interval: float = JOB_POLL_INTERVAL, output_dir: str = JOB_OUTPUT_DIR,
+                 runner=None):
+        self.queue = queue or get_default_queue()
+        self.workers = max(1, workers)
+        self.poll_interval = poll_interval
+        self.output_dir = output_dir
+        self.runner = runner or _default_runner
+        self.name = f"{socket.gethostname()}:{os.getpid()}"
+        self.pool_id = next(_pool_ids)
+        self._stop = threading.Event()
+        self._threads = []
+
+    @property
+    def running(self) -> bool:
+        return any(thread.is_alive() for thread in self._threads)
+
+    def start(self) -> "WorkerPool":
+        """
+        Requeue jobs orphaned by a previous run of this host and start the threads
+        """
+        if self.running:
+            return self
+        os.makedirs(self.output_dir, exist_ok=True)
+        orphaned = [job.id for job in self.queue.list(RUNNING, limit=-1) if _is_orphaned(job.worker)]
+        requeued = self.queue.requeue(orphaned)
+        if requeued:
+            print(f"Requeued {requeued} interrupted job(s)")
+        self._stop.clear()
+        # Registered before any claim, so a pool started concurrently in this
+        # process never mistakes these workers' jobs for orphans
+        names = [f"{self.name}/{self.pool_id}.{i}" for i in range(self.workers)]
+        with _live_workers_lock:
+            _live_workers.update(names)
+        self._threads = [
+            threading.Thread(target=self._loop, args=(name,), name=f"job-worker-{i}", daemon=True)
+            for i, name in enumerate(names)
+        ]
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def stop(self, timeout: float = None) -> None:
+        """
+        Ask workers to exit once their current job is done and wait for them
+        """
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def _loop(self, worker: str) -> None:
+        try:
+            while not self._stop.is_set():
+                try:
+                    job = self.queue.claim(worker)
+                except Exception as e:
+                    print(f"Worker {worker}: could not claim a job: {e}")
+                    job = None
+                if job is None:
+                    self._stop.wait(self.poll_interval)
+                    continue
+                self.run_job(job)
+        finally:
+            with _live_workers_lock:
+                _live_workers.discard(worker)
+
+    def run_job(self, job) -> None:
+        """
+        Run one claimed job and record its outcome in the queue
+        """
+        output_path = os.path.join(self.output_dir, job.id + CODECS[OUTPUT_CODEC].extension)
+        try:
+            result = self.runner(
+                job.pdf_path, output_path,
+                on_status=lambda message, percent: self.queue.set_progress(job.id, message, percent),
+                on_partial=lambda partial_path, segments: self.queue.set_partial(job.id, partial_path, segments),
+                **job.params,
+            )
+            self.queue.complete(job.id, result.as_dict())
+        except Exception:
+            self.queue.fail(job.id, traceback.format_exc())
+
+
+_default_pool = None
+_default_pool_lock = threading.Lock()
+
+
+def ensure_workers() -> WorkerPool:
+    """
+    Start the process-wide worker pool on first use and return it
+    """
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = WorkerPool()
+        return _default_pool.start()
+
+
+def main(argv: list[str] = None) -> int:
+    """Run a standalone worker pool until interrupted"""
+    parser = argparse.ArgumentParser(description="Process queued paper-to-podcast jobs.")
+    parser.add_argument("-w", "--workers", type=int, default=JOB_WORKERS)
+    parser.add_argument("--poll-interval", type=float, default=JOB_POLL_INTERVAL)
+    args = parser.parse_args(argv)
+
+    pool = WorkerPool(workers=args.workers, poll_interval=args.poll_interval).start()
+    print(f"{pool.workers} worker(s) polling {pool.queue.db_path}")
+    try:
+        while pool.running:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        print("Stopping after current jobs finish...")
+        pool.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
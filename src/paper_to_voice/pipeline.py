@@ -0,0 +1,602 @@
+"""
+End-to-end paper-to-podcast pipeline shared by the Streamlit app and the CLI
+"""
+
+import os
+import time
+import shutil
+import itertools
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+from .core.config import (
+    TEMP_DIR, VOICES_DIR, POST_ENABLED, MIX_ENABLED, RENDER_SCALE, GOOGLE_MODEL_NAME,
+    DURATION_BUDGET_ENABLED, DURATION_TOLERANCE, DURATION_CONDENSE, WORK_BROKER_WORKERS,
+)
+from .core.events import EventBus, ProgressTracker
+from .core.memory import MemoryAccountant, fit_render_scale, render_bytes, fit_image_scale, audio_working_set
+from .utils.pdf_processor import process_pdf, encode_image_to_base64, page_sizes
+from .utils.artifacts import get_artifact_manager
+from .utils.workspace import Workspace
+from .jobs.broker import get_broker
+from .jobs.queue import file_digest
+from .jobs.store import PaperStore, get_paper_store
+from .workflow.cache import get_stage_cache, analysis_key, stage_key
+from .workflow.dialog import LENGTH_SECONDS
+from .audio.processor import TONE_ASSETS, consolidate_voice
+from .audio.encoder import CODECS, EncoderSettings
+from .audio.tts import get_default_cache
+from .audio.cache import make_cache_key
+from .audio.backends import get_backend
+from .audio.pacing import PacingPolicy
+from .audio.script import Utterance, VoiceSettings, get_parser
+from .audio.turns import CoalesceStats, coalesce_turns
+from .audio.duration import BudgetStats, clip_seconds, fit_turns, get_duration_estimator, script_seconds
+from .audio.postprocess import postprocess_clips
+
+
+@dataclass
+class PipelineResult:
+    """Outcome of one paper-to-podcast run"""
+    pdf_path: str
+    output_path: str = None
+    error: str = None
+    timings: dict = field(default_factory=dict)
+    stats: dict = field(default_factory=dict)
+    warnings: list = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and self.output_path is not None
+
+    def as_dict(self) -> dict:
+        return {
+            "pdf_path": self.pdf_path,
+            "output_path": self.output_path,
+            "ok": self.ok,
+            "error": self.error,
+            "timings": {stage: round(seconds, 3) for stage, seconds in self.timings.items()},
+            "stats": self.stats,
+            "warnings": self.warnings,
+        }
+
+
+@contextmanager
+def _timed(result: PipelineResult, stage: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        result.timings[stage] = result.timings.get(stage, 0.0) + time.perf_counter() - start
+
+
+def _render_pages(local_pdf: str, workspace: Workspace, artifacts, memory: MemoryAccountant,
+                  events: EventBus, result: PipelineResult) -> list[str]:
+    """
+    Render and base64-encode every page, within the memory budget
+
+    Returns:
+        Encoded page images in page order
+    """
+    sizes = page_sizes(local_pdf)
+
+    def render(scale, on_page=None):
+        memory.set_native("render", render_bytes(sizes, scale))
+        with _timed(result, "render"):
+            image_files = process_pdf(local_pdf, workspace.pages_dir, on_page=on_page, scale=scale)
+        image_paths = [artifacts.track(os.path.join(workspace.pages_dir, name)) for name in image_files]
+        with _timed(result, "encode"):
+            encoded = [encode_image_to_base64(path) for path in image_paths]
+        memory.checkpoint("encode")
+        return encoded
+
+    # The biggest page bitmap must fit under the memory ceiling
+    scale = fit_render_scale(sizes, RENDER_SCALE, memory.headroom())
+    if scale < RENDER_SCALE:
+        memory.degrade("render", f"render scale {RENDER_SCALE:g} -> {scale:g}")
+    events.emit("render", done=0)
+    encoded_images = render(scale, on_page=lambda done, total: events.emit("render", done=done, total=total))
+    result.stats["pages"] = len(encoded_images)
+    if not encoded_images:
+        raise ValueError(f"No pages could be rendered from {os.path.basename(local_pdf)}")
+
+    # So must the copies of the images the workflow holds at once
+    encoded_bytes = sum(len(image) for image in encoded_images)
+    smaller = fit_image_scale(encoded_bytes, scale, memory.headroom())
+    if smaller < scale:
+        memory.degrade("encode", f"render scale {scale:g} -> {smaller:g} for {encoded_bytes} bytes of images")
+        scale, encoded_images = smaller, None  # released before re-rendering
+        encoded_images = render(scale)
+    result.stats["render_scale"] = scale
+    return encoded_images
+
+
+def variant_name(variant: dict) -> str:
+    """Short file-name friendly label of a variant, e.g. ``formal-short-en``"""
+    return "-".join([variant["tone"], variant["length"].split()[0], variant["language"]]).lower()
+
+
+def _budget_scripts(scripts: list[list[str]], variants: list[dict], results: list[PipelineResult],
+                    stage_cache=None) -> list[list[list]]:
+    """
+    Parse every dialog and fit each variant's episode to its length option
+
+    Speech time is estimated from word counts, voice speeds and the
+    calibrated speaking rate. When an episode is estimated to overrun its
+    length by more than DURATION_TOLERANCE, the length is shared among its
+    dialogs in proportion to their estimates. Each dialog is condensed by
+    the LLM to its share (all at once, and memoized), and turns are dropped
+    from the dialogs if the episode still overruns, so no audio beyond the
+    target is synthesized.
+
+    Returns:
+        Parsed utterances of each dialog of each variant
+    """
+    parser = get_parser()
+    estimator = get_duration_estimator()
+    parsed = [[parser.parse(dialog)[0] for dialog in dialogs] for dialogs in scripts]
+    budgets = [
+        LENGTH_SECONDS.get(variant["length"]) if DURATION_BUDGET_ENABLED else None
+        for variant in variants
+    ]
+
+    def seconds(v, i):
+        return script_seconds(parsed[v][i], variants[v]["language"], estimator)
+
+    def episode_seconds(v):
+        return sum(seconds(v, i) for i in range(len(parsed[v])))
+
+    def overrun(v):
+        return budgets[v] and episode_seconds(v) > budgets[v] * DURATION_TOLERANCE
+
+    def shares(v):
+        total = episode_seconds(v)
+        return [budgets[v] * seconds(v, i) / total for i in range(len(parsed[v]))]
+
+    stats = [BudgetStats(target_seconds=budget or 0, estimated_seconds=episode_seconds(v))
+             for v, budget in enumerate(budgets)]
+    over = {v: shares(v) for v in range(len(variants)) if overrun(v)}
+
+    def condense(slot):
+        # Imported on first use: the LLM SDKs load with it
+        from .workflow.dialog import condense_dialog
+        v, i = slot
+        estimate, target = seconds(v, i), round(over[v][i])
+        key = stage_key("condense", scripts[v][i], target, variants[v]["language"], GOOGLE_MODEL_NAME)
+        dialog = stage_cache.get("condense", key) if stage_cache is not None else None
+        if dialog is None:
+            words = sum(len(utterance.text.split()) for utterance in parsed[v][i])
+            dialog = condense_dialog(scripts[v][i], estimate, target, int(words * target / estimate))
+            if stage_cache is not None:
+                stage_cache.put("condense", key, dialog)
+        return dialog
+
+    slots = [(v, i) for v in over for i in range(len(parsed[v])) if parsed[v][i]]
+    if slots and DURATION_CONDENSE:
+        with ThreadPoolExecutor(max_workers=min(len(slots), WORK_BROKER_WORKERS),
+                                thread_name_prefix="condense") as executor:
+            futures = {slot: executor.submit(condense, slot) for slot in slots}
+        for (v, i), future in futures.items():
+            try:
+                utterances = parser.parse(future.result())[0]
+            except Exception as e:
+                results[v].warnings.append(f"Could not condense dialog {i + 1}: {e}")
+                continue
+            if utterances:
+                parsed[v][i] = utterances
+                stats[v].condensed += 1
+
+    for v in over:
+        if not overrun(v):
+            continue
+        for i, share in enumerate(shares(v)):
+            kept = fit_turns(parsed[v][i], variants[v]["language"], share, estimator)
+            stats[v].trimmed_turns += len(parsed[v][i]) - len(kept)
+            parsed[v][i] = kept
+
+    for v, result in enumerate(results):
+        stats[v].budgeted_seconds = episode_seconds(v)
+        if budgets[v]:
+            result.stats["duration"] = stats[v].as_dict()
+    return parsed
+
+
+def _produce(result: PipelineResult, variant: dict, utterances: list, output_path: str, tag: str,
+             workspace: Workspace, artifacts, events: EventBus, pacing: PacingPolicy,
+             window: int, streaming: bool, on_partial=None, store: PaperStore = None,
+             paper_hash: str = None) -> None:
+    """
+    Synthesize and encode one variant's podcast into ``result``
+
+    Clips already in the paper store are used as they are; new clips and the
+    finished podcast are added to it.
+    """
+    shared_voice_dir = os.path.join(TEMP_DIR, VOICES_DIR)
+    estimator = get_duration_estimator()
+    language = variant["language"]
+
+    stored = {}
+    if store is not None:
+        model = get_backend().model
+        keys = [make_cache_key(u.text, u.voice.accent, u.voice.speed, language, model) for u in utterances]
+        for index, key in enumerate(keys):
+            record = store.get(paper_hash, "utterance", {"key": key})
+            if record is not None:
+                stored[index] = record.path
+        result.stats["reused"]["utterances"] = len(stored)
+    missing = [utterance for index, utterance in enumerate(utterances) if index not in stored]
+
+    # Requests are fanned out on the work broker; results come back in
+    # script order so the encoder still receives the episode in sequence
+    broker = get_broker()
+    if broker.in_process:
+        futures = broker.imap("synthesize", ((u, language, pacing, None, events) for u in missing), window)
+    else:
+        futures = broker.imap("synthesize_bytes", ((u, language) for u in missing), window)
+
+    def synthesize_parts():
+        for index, utterance in enumerate(utterances):
+            if index in stored:
+                events.emit("tts", advance=1, message=f"{utterance.speaker}, stored")
+                yield stored[index], utterance, False
+                continue
+            try:
+                outcome = next(futures).result()
+            except Exception as e:
+                result.warnings.append(f"Could not generate voice for part: {e}")
+                events.emit("tts", advance=1, message="failed")
+                continue
+            if broker.in_process:
+                audio_file, fresh = outcome
+            else:
+                extension, data, fresh = outcome
+                audio_file = workspace.path("tts", tag, f"{index:05d}{extension}")
+                with open(audio_file, "wb") as f:
+                    f.write(data)
+                events.emit("tts", advance=1, message=utterance.speaker)
+            if get_default_cache() is None or not broker.in_process:
+                artifacts.track(audio_file)
+            if store is not None:
+                store.put_file(paper_hash, "utterance", {"key": keys[index]}, audio_file)
+            yield audio_file, utterance, fresh
+
+    def calibrate(clips):
+        # Every newly synthesized clip refines the speaking rate the next
+        # script is budgeted with, measured as it will be heard: after
+        # silence trimming. Reused clips were counted when they were made.
+        for path, utterance, fresh in clips:
+            if fresh:
+                estimator.record(utterance, language, clip_seconds(path))
+            yield path, utterance.speaker
+
+    # Trim, level and resample each clip before it is consolidated
+    clips = synthesize_parts()
+    if POST_ENABLED:
+        clips = (
+            (artifacts.track(path), utterance, fresh)
+            for path, utterance, fresh in postprocess_clips(clips, workspace.clips_dir)
+        )
+    clips = calibrate(clips)
+
+    # Synthesis feeds the encoder directly, so this stage covers both
+    with _timed(result, "audio"):
+        final_audio_path = consolidate_voice(clips, workspace.voices_dir, on_progress=on_partial,
+                                             assets_dir=shared_voice_dir, events=events,
+                                             streaming=streaming)
+
+    if final_audio_path:
+        # The workspace is removed at the end of the job, so the podcast is moved out of it
+        output_path = output_path or os.path.join(
+            shared_voice_dir, artifacts.job_id + tag + CODECS[EncoderSettings().codec].extension)
+        os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+        artifacts.protect(output_path)
+        final_audio_path = shutil.move(final_audio_path, output_path)
+        artifacts.keep(final_audio_path)
+        if store is not None and not result.warnings:
+            # Copied: callers own the output file and may overwrite it; a
+            # podcast missing lines is not kept for replay
+            store.put_file(paper_hash, "podcast", _podcast_params(variant), final_audio_path, link=False)
+    result.output_path = final_audio_path
+
+
+def _script_params(variant: dict) -> dict:
+    """Everything a stored script depends on"""
+    return {**variant, "model": GOOGLE_MODEL_NAME,
+            "budget": DURATION_TOLERANCE if DURATION_BUDGET_ENABLED else None}
+
+
+def _podcast_params(variant: dict) -> dict:
+    """Everything a stored podcast depends on"""
+    return {**_script_params(variant), "tts": get_backend().model, "encoder": list(EncoderSettings()),
+            "post": POST_ENABLED, "mix": MIX_ENABLED}
+
+
+def _replay(store: PaperStore, paper_hash: str, pdf_path: str, variant: dict,
+            output_path: str = None) -> PipelineResult | None:
+    """
+    Result for a podcast already in the paper store, or None if there is none
+
+    The stored file is copied to ``output_path``; without one, the store's
+    own copy is returned and must not be modified.
+    """
+    start = time.perf_counter()
+    record = store.get(paper_hash, "podcast", _podcast_params(variant))
+    if record is None:
+        return None
+    path = record.path
+    if output_path:
+        os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+        path = shutil.copyfile(record.path, output_path)
+    script = store.get(paper_hash, "script", _script_params(variant))
+    dialogs = len(script.value["dialogs"]) if script is not None else 0
+    stats = {"variant": variant, "dialogs": dialogs,
+             "reused": {"stages": ["podcast"], "dialogs": dialogs}}
+    return PipelineResult(pdf_path, output_path=path, timings={"total": time.perf_counter() - start}, stats=stats)
+
+
+def run_variants(pdf_path: str, variants: list[dict], output_paths: list[str] = None,
+                 on_status=None, on_partial=None, events: EventBus = None,
+                 memory: MemoryAccountant = None) -> list[PipelineResult]:
+    """
+    Turn one PDF into several editions of a podcast
+
+    The paper is rendered and analysed once. The dialogs of every variant
+    are generated as parallel branches of one graph run, then each variant
+    is synthesized and encoded concurrently. Lines shared between variants
+    are synthesized once through the utterance cache.
+
+    With the paper store enabled, a podcast generated before for the same
+    paper and settings is returned straight from the store. Otherwise the
+    stored analysis, scripts and clips of earlier runs are reused and only
+    what is missing is generated.
+
+    Args:
+        pdf_path: Research paper to convert
+        variants: Podcast settings, each with ``tone``, ``length`` (an option
+            understood by ``generate_dialog``) and ``language``
+        output_paths: Where to move each finished podcast (default:
+            ``TEMP_DIR/voices/<job_id>-<variant>``, subject to the artifact quota)
+        on_status: Optional callback ``(message, percent)`` for the whole job;
+            percent and the ETA in the message come from measured per-stage rates
+        on_partial: Optional callback ``(partial_path, segments)`` for
+            progressive playback of the first variant
+        events: Optional bus to observe raw ProgressEvents (pages rendered,
+            workflow branches finished, lines synthesized, segments encoded)
+        memory: Optional memory accountant (default: one configured by
+            MEMORY_ACCOUNTING and MEMORY_CEILING_BYTES). Under a ceiling,
+            pages are rendered at a lower scale and audio is streamed
+            without the mixer when the estimates would not fit.
+
+    Returns:
+        One PipelineResult per variant, in order. Timings and stats of the
+        shared stages are repeated in each.
+    """
+    variants = [dict(variant) for variant in variants]
+    output_paths = list(output_paths or [None] * len(variants))
+    store = get_paper_store()
+    if store is None:
+        return _generate(pdf_path, variants, output_paths, on_status, on_partial, events, memory)
+
+    paper_hash = file_digest(pdf_path)
+    results = [
+        _replay(store, paper_hash, pdf_path, variant, output_path)
+        for variant, output_path in zip(variants, output_paths)
+    ]
+    pending = [index for index, result in enumerate(results) if result is None]
+    if not pending:
+        if on_status:
+            on_status("Podcast generation complete!", 100)
+        return results
+    generated = _generate(pdf_path, [variants[index] for index in pending],
+                          [output_paths[index] for index in pending], on_status,
+                          on_partial if pending[0] == 0 else None, events, memory, store, paper_hash)
+    for index, result in zip(pending, generated):
+        results[index] = result
+    return results
+
+
+def _encode_script(parsed: list[list[Utterance]]) -> list:
+    return [[[u.speaker, u.text, list(u.voice)] for u in dialog] for dialog in parsed]
+
+
+def _decode_script(dialogs: list) -> list[list[Utterance]]:
+    return [[Utterance(speaker, text, VoiceSettings(*voice)) for speaker, text, voice in dialog]
+            for dialog in dialogs]
+
+
+def _generate(pdf_path: str, variants: list[dict], output_paths: list[str], on_status=None, on_partial=None,
+              events: EventBus = None, memory: MemoryAccountant = None, store: PaperStore = None,
+              paper_hash: str = None) -> list[PipelineResult]:
+    """
+    Generate the podcasts of ``run_variants``, reusing stored stages
+
+    Returns:
+        One PipelineResult per variant, in order
+    """
+    results = [PipelineResult(pdf_path, stats={"variant": variant}) for variant in variants]
+    shared = PipelineResult(pdf_path)
+    status = on_status or (lambda message, percent: None)
+    events = events or EventBus()
+    tracker = ProgressTracker(on_progress=lambda progress: status(progress.message, progress.percent))
+    events.subscribe(tracker.handle)
+    memory = (memory or MemoryAccountant()).start()
+    events.subscribe(memory.handle)
+    manager = get_artifact_manager()
+    artifacts = manager.start()
+    # Every intermediate file lives in the job's own workspace; neither it
+    # nor the shared tones may be evicted by another job's quota pass
+    workspace = Workspace(artifacts.job_id).create()
+    artifacts.protect(workspace.root)
+    for name in TONE_ASSETS:
+        artifacts.protect(os.path.join(TEMP_DIR, VOICES_DIR, name))
+    start = time.perf_counter()
+
+    try:
+        local_pdf = artifacts.track(workspace.add_input(pdf_path))
+        paper_hash = paper_hash or file_digest(local_pdf)
+
+        # Imported on first run: the graph pulls in LangGraph and the LLM SDKs
+        from .workflow.orchestrator import run_analysis, run_dialogs
+
+        # Scripts stored by an earlier run need neither the analysis nor the LLM
+        parsed = [None] * len(variants)
+        if store is not None:
+            for index, variant in enumerate(variants):
+                record = store.get(paper_hash, "script", _script_params(variant))
+                if record is not None:
+                    parsed[index] = _decode_script(record.value["dialogs"])
+                    if record.value.get("duration"):
+                        results[index].stats["duration"] = record.value["duration"]
+        todo = [index for index, script in enumerate(parsed) if script is None]
+
+        # The analysis depends only on the paper, so a new tone, length or
+        # language reuses it and skips rendering as well
+        stage_cache = get_stage_cache()
+        paper_key = analysis_key(paper_hash)
+        analysis_params = {"model": GOOGLE_MODEL_NAME}
+        analysis, reused, done = None, [], 0
+        if todo:
+            record = store.get(paper_hash, "analysis", analysis_params) if store is not None else None
+            analysis = record.value if record is not None else None
+            if analysis is None and stage_cache is not None:
+                analysis = stage_cache.get("analysis", paper_key)
+        if todo and analysis is None:
+            encoded_images = _render_pages(local_pdf, workspace, artifacts, memory, events, shared)
+
+            with _timed(shared, "workflow"):
+                analysis, done = run_analysis({'image_path': encoded_images}, events)
+            encoded_images = None  # only the analysis needs the page images
+            if analysis["steps"]:
+                if stage_cache is not None:
+                    stage_cache.put("analysis", paper_key, analysis)
+                if store is not None:
+                    store.put_json(paper_hash, "analysis", analysis_params, analysis)
+        else:
+            reused += ["render", "encode", "analysis"]
+            events.emit("render", done=0, total=0)
+
+        reused_dialogs = [0] * len(variants)
+        if todo:
+            with _timed(shared, "workflow"):
+                scripts, todo_reused = run_dialogs(analysis, [variants[index] for index in todo],
+                                                   events, done, stage_cache, paper_key)
+
+            # Only spoken lines are scheduled; stage directions are dropped here.
+            # Parsing is cheap, so every dialog is parsed and fitted to its length
+            # up front, before any audio is synthesized.
+            budgeted = _budget_scripts(scripts, [variants[index] for index in todo],
+                                       [results[index] for index in todo], stage_cache)
+            for index, script, reused_count in zip(todo, budgeted, todo_reused):
+                parsed[index], reused_dialogs[index] = script, reused_count
+                if store is not None:
+                    store.put_json(paper_hash, "script", _script_params(variants[index]), {
+                        "dialogs": _encode_script(script), "duration": results[index].stats.get("duration"),
+                    })
+        else:
+            events.emit("workflow", done=0, total=0)
+
+        utterances = []
+        for index, (result, variant_parsed) in enumerate(zip(results, parsed)):
+            requests = {"requests_before": 0, "requests_after": 0}
+            variant_utterances = []
+            for dialog_parsed in variant_parsed:
+                dialog_utterances = coalesce_turns(dialog_parsed)
+                variant_utterances.extend(dialog_utterances)
+                coalesce_stats = CoalesceStats(len(dialog_parsed), len(dialog_utterances))
+                for key, value in coalesce_stats.as_dict().items():
+                    requests[key] += value
+            utterances.append(variant_utterances)
+            dialogs = len(variant_parsed)
+            result.stats["dialogs"] = dialogs
+            result.stats["tts_requests"] = requests
+            if index in todo:
+                stages = reused + (["dialog"] if dialogs and reused_dialogs[index] == dialogs else [])
+                result.stats["reused"] = {"stages": stages, "dialogs": reused_dialogs[index]}
+            else:
+                result.stats["reused"] = {"stages": ["render", "encode", "analysis", "dialog"], "dialogs": dialogs}
+        events.emit("tts", done=0, total=sum(len(u) for u in utterances))
+
+        # Every variant is encoded at once, so the audio budget covers them all
+        window, streaming = 2 * get_broker().workers, False
+        longest = max((len(u.text) for u in itertools.chain(*utterances)), default=0)
+        if not memory.fits(len(variants) * audio_working_set(longest, window, MIX_ENABLED)):
+            window = 1
+            memory.degrade("tts", "synthesizing one clip ahead of the encoder")
+            if MIX_ENABLED and not memory.fits(len(variants) * audio_working_set(longest, window, MIX_ENABLED)):
+                streaming = True
+                memory.degrade("audio", "streaming clips to the encoder without the mixer")
+
+        pacing = PacingPolicy()
+        tags = [""] if len(variants) == 1 else [f"-{variant_name(variant)}" for variant in variants]
+
+        def produce(index):
+            result = results[index]
+            try:
+                _produce(result, variants[index], utterances[index], output_paths[index], tags[index],
+                         workspace, artifacts, events, pacing, window, streaming,
+                         on_partial if index == 0 else None, store, paper_hash)
+            except Exception:
+                result.error = traceback.format_exc()
+
+        with ThreadPoolExecutor(max_workers=len(variants), thread_name_prefix="variant") as executor:
+            list(executor.map(produce, range(len(variants))))
+        get_duration_estimator().save()
+        shared.timings["tts"] = pacing.stats.synth_seconds + pacing.stats.wait_seconds
+        shared.stats["tts_pacing"] = pacing.stats.as_dict()
+        if get_default_cache() is not None:
+            shared.stats["tts_cache"] = get_default_cache().stats()
+        if store is not None:
+            store.prune()
+            shared.stats["store"] = store.stats()
+        status("Podcast generation complete!", 100)
+    except Exception:
+        error = traceback.format_exc()
+        for result in results:
+            result.error = result.error or error
+    finally:
+        success = all(result.ok for result in results)
+        tracker.finish(success=success)
+        memory.finish()
+        if memory.enabled:
+            shared.stats["memory"] = memory.report()
+        # Podcasts of the variants that succeeded are kept even if another failed
+        manager.finish(artifacts.job_id, success=any(result.ok for result in results))
+        workspace.cleanup()
+        shared.timings["total"] = time.perf_counter() - start
+        shared.stats["disk"] = manager.usage()
+        for result in results:
+            result.timings = {**shared.timings, **result.timings}
+            result.stats = {**shared.stats, **result.stats}
+    return results
+
+
+def run_pipeline(pdf_path: str, output_path: str = None, tone: str = "Formal",
+                 language: str = "EN", length: str = "Short (1-2 min)",
+                 on_status=None, on_partial=None, events: EventBus = None,
+                 memory: MemoryAccountant = None) -> PipelineResult:
+    """
+    Turn one PDF into a podcast
+
+    Args:
+        pdf_path: Research paper to convert
+        output_path: Where to move the finished podcast (default:
+            ``TEMP_DIR/voices/<job_id>``, subject to the artifact quota)
+        tone: Podcast tone
+        language: Output language code
+        length: Length option understood by ``generate_dialog``
+        on_status: Optional callback ``(message, percent)``; percent and the
+            ETA in the message come from measured per-stage rates
+        on_partial: Optional callback ``(partial_path, segments)`` for
+            progressive playback
+        events: Optional bus to observe raw ProgressEvents (pages rendered,
+            workflow branches finished, lines synthesized, segments encoded)
+        memory: Optional memory accountant (see ``run_variants``)
+
+    Returns:
+        PipelineResult with the output path, per-stage timings and stats
+    """
+    variant = {"tone": tone, "length": length, "language": language}
+    result, = run_variants(pdf_path, [variant], [output_path], on_status, on_partial, events, memory)
+    return result
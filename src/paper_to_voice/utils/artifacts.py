@@ -0,0 +1,310 @@
+"""
+Per-job artifact tracking, clean-up and disk quota enforcement
+"""
+
+import os
+import time
+import uuid
+import threading
+from contextlib import contextmanager
+
+from ..core.config import (
+    TEMP_DIR, ARTIFACT_QUOTA_BYTES, ARTIFACT_LEASE_SECONDS,
+    TTS_CACHE_DIR, JOB_QUEUE_DIR, STAGE_CACHE_DIR, PAPER_STORE_DIR,
+)
+
+
+class JobArtifacts:
+    """Files created by one job; ``keep`` marks results that outlive the job"""
+
+    def __init__(self, manager: "ArtifactManager", job_id: str):
+        self.manager = manager
+        self.job_id = job_id
+        self.paths = set()
+        self.kept = set()
+        self.protected = set()
+        self.leases = []
+
+    def track(self, path: str) -> str:
+        """
+        Register a file produced by this job and return its path unchanged
+        """
+        return self.manager.track(self.job_id, path)
+
+    def keep(self, path: str) -> str:
+        """
+        Register a job result that must survive clean-up (still quota-evictable)
+        """
+        self.track(path)
+        self.kept.add(os.path.abspath(path))
+        return path
+
+    def protect(self, path: str) -> str:
+        """
+        Shield a file or directory tree from eviction while the job runs,
+        without taking ownership: it is not removed when the job finishes.
+        Used for the job's workspace, shared assets and output paths the
+        job is about to write.
+
+        The protection is leased on disk, so quota passes of other processes
+        sharing the artifact root skip the path as well.
+        """
+        path = os.path.abspath(path)
+        with self.manager._lock:
+            if path not in self.protected:
+                self.protected.add(path)
+                self.manager._lease(self, path)
+        return path
+
+
+class ArtifactManager:
+    """
+    Tracks intermediate files per job and keeps the artifact root under quota.
+
+    Files of running jobs are not evicted: files a job tracks are spared by
+    this manager, and paths a job protects are leased in ``<root>/.leases``
+    so that every process enforcing a quota on the same root spares them.
+    A lease is a small file naming the path; its owner renews it every
+    ``lease_seconds / 3`` and leases older than ``lease_seconds`` are
+    treated as left behind by a process that died. Everything else under
+    ``root`` (finished job results, leftovers from earlier runs) is removed
+    least-recently-used first once usage exceeds ``quota_bytes``. The TTS
+    cache directory is excluded because it enforces its own cap, and the job
+    queue directory because pending uploads must survive until a worker runs.
+    Memoized workflow stages are small and expensive to recompute, so they
+    are kept too, as is the paper store, which applies its own cap.
+
+    Usage is kept as a running total of tracked and removed files; the root
+    is walked again only when the total exceeds the quota or is older than
+    ``rescan_seconds``, since other processes write there too.
+    """
+
+    def __init__(self, root: str = TEMP_DIR, quota_bytes: int = ARTIFACT_QUOTA_BYTES,
+                 exclude: tuple = (TTS_CACHE_DIR, JOB_QUEUE_DIR, STAGE_CACHE_DIR, PAPER_STORE_DIR),
+                 rescan_seconds: float = 60.0, lease_seconds: float = ARTIFACT_LEASE_SECONDS):
+        self.root = os.path.abspath(root)
+        self.quota_bytes = quota_bytes
+        self.rescan_seconds = rescan_seconds
+        self.lease_seconds = lease_seconds
+        self.lease_dir = os.path.join(self.root, ".leases")
+        self._scanned_at = None
+        self._renewer = None
+        self.exclude = tuple(os.path.join(os.path.abspath(path), "") for path in (*exclude, self.lease_dir))
+        self.jobs = {}
+        self.evicted_files = 0
+        self.evicted_bytes = 0
+        self.removed_bytes = 0
+        self._lock = threading.RLock()
+        self._usage = None
+
+    def _active_paths(self) -> set:
+        return set().union(*(job.paths for job in self.jobs.values()))
+
+    def _protected(self) -> tuple[set, tuple]:
+        # This process's jobs, plus the live leases of jobs in other processes
+        paths = set().union(*(job.protected for job in self.jobs.values()))
+        try:
+            names = os.listdir(self.lease_dir)
+        except FileNotFoundError:
+            names = []
+        now = time.time()
+        for name in names:
+            lease = os.path.join(self.lease_dir, name)
+            try:
+                if now - os.path.getmtime(lease) > self.lease_seconds:
+                    os.remove(lease)
+                    continue
+                with open(lease, encoding="utf-8") as f:
+                    paths.add(f.read())
+            except (FileNotFoundError, ValueError):
+                continue
+        paths.discard("")
+        return paths, tuple(os.path.join(path, "") for path in paths)
+
+    def _lease(self, job: JobArtifacts, path: str) -> None:
+        os.makedirs(self.lease_dir, exist_ok=True)
+        lease = os.path.join(self.lease_dir, f"{job.job_id}.{len(job.leases)}")
+        # Written under a dotted name and renamed, so readers never see it empty
+        staging = os.path.join(self.lease_dir, f".{job.job_id}.{len(job.leases)}.tmp")
+        with open(staging, "w", encoding="utf-8") as f:
+            f.write(path)
+        os.replace(staging, lease)
+        job.leases.append(lease)
+        if self._renewer is None:
+            self._renewer = threading.Thread(target=self._renew_leases, name="artifact-leases", daemon=True)
+            self._renewer.start()
+
+    def _renew_leases(self) -> None:
+        # A job can spend minutes in one LLM call without touching the
+        # manager, so leases are renewed on a timer rather than on use
+        while True:
+            time.sleep(self.lease_seconds / 3)
+            with self._lock:
+                leases = [lease for job in self.jobs.values() for lease in job.leases]
+            for lease in leases:
+                try:
+                    os.utime(lease)
+                except FileNotFoundError:
+                    pass
+
+    def _scan(self):
+        for dirpath, dirnames, filenames in os.walk(self.root):
+            dirnames[:] = [d for d in dirnames if not os.path.join(dirpath, d, "").startswith(self.exclude)]
+            for name in filenames:
+                path = os.path.join(dirpath, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                yield path, stat.st_size, max(stat.st_atime, stat.st_mtime)
+
+    def _remove(self, path: str) -> int:
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+        except FileNotFoundError:
+            return 0
+        if self._usage is not None:
+            self._usage -= size
+        return size
+
+    def track(self, job_id: str, path: str) -> str:
+        """
+        Register a file under a running job
+
+        Args:
+            job_id: Job identifier returned by ``start``
+            path: File created by the job
+
+        Returns:
+            The path, so calls can be chained
+        """
+        with self._lock:
+            job = self.jobs[job_id]
+            path = os.path.abspath(path)
+            if path not in job.paths and os.path.exists(path):
+                job.paths.add(path)
+                if self._usage is not None and path.startswith(os.path.join(self.root, "")):
+                    self._usage += os.path.getsize(path)
+            if self._usage is not None and self._usage > self.quota_bytes:
+                self.enforce_quota()
+        return path
+
+    def start(self, job_id: str = None) -> JobArtifacts:
+        """
+        Begin tracking a job, evicting old artifacts if the root is over quota
+        """
+        with self._lock:
+            job_id = job_id or uuid.uuid4().hex
+            self.jobs[job_id] = JobArtifacts(self, job_id)
+            self.enforce_quota()
+            return self.jobs[job_id]
+
+    def finish(self, job_id: str, success: bool = True) -> int:
+        """
+        Stop tracking a job and delete its intermediates
+
+        On success, files marked with ``keep`` remain on disk; on failure
+        everything the job created is removed.
+
+        Returns:
+            Bytes freed
+        """
+        with self._lock:
+            job = self.jobs.pop(job_id, None)
+            if job is None:
+                return 0
+            for lease in job.leases:
+                try:
+                    os.remove(lease)
+                except FileNotFoundError:
+                    pass
+            kept = job.kept if success else set()
+            freed = sum(self._remove(path) for path in job.paths - kept)
+            self.removed_bytes += freed
+            self.enforce_quota()
+            return freed
+
+    @contextmanager
+    def job(self, job_id: str = None):
+        """
+        Context manager that cleans up after a job whether it succeeds or fails
+
+        Yields:
+            JobArtifacts handle for tracking files
+        """
+        handle = self.start(job_id)
+        try:
+            yield handle
+        except BaseException:
+            self.finish(handle.job_id, success=False)
+            raise
+        self.finish(handle.job_id, success=True)
+
+    def enforce_quota(self, rescan: bool = False) -> int:
+        """
+        Evict least-recently-used files not owned or protected by a running job
+
+        Args:
+            rescan: Walk the root even if the running total is under quota
+                and recent
+
+        Returns:
+            Bytes evicted
+        """
+        with self._lock:
+            stale = self._scanned_at is None or time.monotonic() - self._scanned_at > self.rescan_seconds
+            if not (rescan or stale or self._usage is None or self._usage > self.quota_bytes):
+                return 0
+            entries = list(self._scan())
+            self._scanned_at = time.monotonic()
+            self._usage = sum(size for _, size, _ in entries)
+            if self._usage <= self.quota_bytes:
+                return 0
+            active = self._active_paths()
+            protected, protected_dirs = self._protected()
+            evicted = 0
+            for path, _, _ in sorted(entries, key=lambda entry: entry[2]):
+                if self._usage <= self.quota_bytes:
+                    break
+                if path in active or path in protected or path.startswith(protected_dirs):
+                    continue
+                freed = self._remove(path)
+                evicted += freed
+                self.evicted_files += 1
+            self.evicted_bytes += evicted
+            return evicted
+
+    def usage(self) -> dict:
+        """
+        Disk usage metrics for the artifact root
+        """
+        with self._lock:
+            if self._usage is None:
+                self.enforce_quota(rescan=True)
+            return {
+                "root": self.root,
+                "used_bytes": self._usage,
+                "quota_bytes": self.quota_bytes,
+                "active_jobs": len(self.jobs),
+                "active_job_bytes": {
+                    job_id: sum(os.path.getsize(p) for p in job.paths if os.path.exists(p))
+                    for job_id, job in self.jobs.items()
+                },
+                "evicted_files": self.evicted_files,
+                "evicted_bytes": self.evicted_bytes,
+                "cleaned_bytes": self.removed_bytes,
+            }
+
+
+_default_manager = None
+
+
+def get_artifact_manager() -> ArtifactManager:
+    """
+    Return the process-wide artifact manager for TEMP_DIR
+    """
+    global _default_manager
+    if _default_manager is None:
+        _default_manager = ArtifactManager()
+    return _default_manager
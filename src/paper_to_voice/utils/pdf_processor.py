@@ -4,9 +4,10 @@ Utility functions for PDF processing and image encoding
 
 import os
 import base64
-import streamlit as st
 import pypdfium2 as pdfium
 
+from ..core.config import RENDER_SCALE
+
 
 def encode_image_to_base64(file_path: str) -> str:
     """
@@ -22,34 +23,59 @@ def encode_image_to_base64(file_path: str) -> str:
         return f"data:image/jpeg;base64,{base64.b64encode(img_file.read()).decode()}"
 
 
-def process_pdf(pdf_path: str) -> list[str]:
+def page_sizes(pdf_path: str) -> list[tuple[float, float]]:
+    """
+    Read the page dimensions of a PDF without rendering it
+
+    Args:
+        pdf_path: Path to the PDF file
+
+    Returns:
+        ``(width, height)`` of each page in PDF points, or an empty list if
+        the file cannot be opened
+    """
+    try:
+        pdf = pdfium.PdfDocument(pdf_path)
+        return [pdf.get_page_size(i) for i in range(len(pdf))]
+    except Exception as e:
+        print(f"Error reading PDF: {e}")
+        return []
+
+
+def process_pdf(pdf_path: str, output_dir: str = None, on_page=None, scale: float = RENDER_SCALE) -> list[str]:
     """
     Convert PDF pages to individual image files
     
     Args:
         pdf_path: Path to the PDF file
+        output_dir: Directory for the page images (default: next to the PDF);
+            concurrent jobs must each pass their own directory
+        on_page: Optional callback ``(pages_rendered, total_pages)``
+        scale: Pixels per PDF point
         
     Returns:
-        List of image filenames created
+        List of image filenames created, relative to ``output_dir``
     """
     image_filenames = []
     try:
         pdf = pdfium.PdfDocument(pdf_path)
         num_pages = len(pdf)
 
-        output_dir = os.path.dirname(pdf_path)
+        output_dir = output_dir or os.path.dirname(pdf_path)
         os.makedirs(output_dir, exist_ok=True)
 
         for i in range(num_pages):
             page = pdf[i]
-            image = page.render(scale=4).to_pil()
+            image = page.render(scale=scale).to_pil()
 
             filename = f"Photo_{i:03d}.jpg"
             image_path = os.path.join(output_dir, filename)
             image.save(image_path)
             image_filenames.append(filename)
+            if on_page is not None:
+                on_page(i + 1, num_pages)
 
     except Exception as e:
-        st.error(f"Error processing PDF: {e}")
+        print(f"Error processing PDF: {e}")
 
     return image_filenames
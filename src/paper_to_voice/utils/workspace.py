@@ -0,0 +1,65 @@
+"""
+Per-job workspaces so concurrent jobs never share intermediate files
+"""
+
+import os
+import uuid
+import shutil
+
+from ..core.config import WORKSPACE_DIR
+
+
+class Workspace:
+    """
+    Private directory tree for one job.
+
+    Layout under ``<root>/<job_id>``::
+
+        input/    copy of the paper being converted
+        pages/    rendered page images
+        clips/    post-processed utterance clips
+        voices/   encoder output while the podcast is being written
+
+    Every path a job writes is inside its own tree, so any number of jobs can
+    run in parallel in one process or on one host without clobbering each
+    other's ``Photo_000.jpg`` or partial podcasts.
+    """
+
+    def __init__(self, job_id: str = None, root: str = WORKSPACE_DIR):
+        self.job_id = job_id or uuid.uuid4().hex
+        self.root = os.path.join(root, self.job_id)
+        self.input_dir = os.path.join(self.root, "input")
+        self.pages_dir = os.path.join(self.root, "pages")
+        self.clips_dir = os.path.join(self.root, "clips")
+        self.voices_dir = os.path.join(self.root, "voices")
+
+    def create(self) -> "Workspace":
+        """Create the directory tree and return the workspace"""
+        for directory in (self.input_dir, self.pages_dir, self.clips_dir, self.voices_dir):
+            os.makedirs(directory, exist_ok=True)
+        return self
+
+    def add_input(self, path: str) -> str:
+        """
+        Copy an input file into the workspace
+
+        Returns:
+            Path of the private copy
+        """
+        return shutil.copy(path, os.path.join(self.input_dir, os.path.basename(path)))
+
+    def path(self, *parts: str) -> str:
+        """Path inside the workspace (parent directories are created)"""
+        path = os.path.join(self.root, *parts)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        return path
+
+    def cleanup(self) -> None:
+        """Remove the workspace and everything in it"""
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def __enter__(self) -> "Workspace":
+        return self.create()
+
+    def __exit__(self, *exc_info) -> None:
+        self.cleanup()
@@ -0,0 +1,104 @@
+"""
+On-disk memoization of workflow stages, keyed by paper content
+"""
+
+import os
+import json
+import hashlib
+import threading
+
+from ..core.config import STAGE_CACHE_ENABLED, STAGE_CACHE_DIR, GOOGLE_MODEL_NAME
+
+
+def stage_key(*parts) -> str:
+    """
+    Build the cache key for one stage result
+
+    Args:
+        *parts: Everything the result depends on (paper hash, model, text,
+            podcast settings)
+
+    Returns:
+        Hex digest identifying the result
+    """
+    material = "\x1f".join(str(part) for part in parts)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def analysis_key(paper_hash: str, model: str = GOOGLE_MODEL_NAME) -> str:
+    """Key of the analysis (plan, steps and solutions) of one paper"""
+    return stage_key("analysis", paper_hash, model)
+
+
+def dialog_key(analysis: str, step: str, solution: str, tone: str, length: str, language: str) -> str:
+    """
+    Key of the dialog for one analysed step
+
+    The step and its solution are part of the key, so a new analysis of the
+    same paper never picks up dialogs written for the old one.
+    """
+    return stage_key("dialog", analysis, step, solution, tone, length, language)
+
+
+class StageCache:
+    """
+    JSON results of workflow stages.
+
+    Entries live at ``<cache_dir>/<stage>/<key[:2]>/<key>.json`` and are
+    written atomically, so concurrent jobs may share the directory.
+    """
+
+    def __init__(self, cache_dir: str = STAGE_CACHE_DIR):
+        self.cache_dir = cache_dir
+        self.hits = {}
+        self.misses = {}
+        self._lock = threading.Lock()
+
+    def _path(self, stage: str, key: str) -> str:
+        return os.path.join(self.cache_dir, stage, key[:2], key + ".json")
+
+    def get(self, stage: str, key: str):
+        """
+        Look up a stage result
+
+        Returns:
+            The stored value, or None on a miss
+        """
+        try:
+            with open(self._path(stage, key), encoding="utf-8") as f:
+                value = json.load(f)
+        except (FileNotFoundError, ValueError):
+            value = None
+        with self._lock:
+            counts = self.misses if value is None else self.hits
+            counts[stage] = counts.get(stage, 0) + 1
+        return value
+
+    def put(self, stage: str, key: str, value) -> None:
+        """Store a JSON-serializable stage result"""
+        path = self._path(stage, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        staging = f"{path}.{threading.get_ident()}.tmp"
+        with open(staging, "w", encoding="utf-8") as f:
+            json.dump(value, f)
+        os.replace(staging, path)
+
+    def stats(self) -> dict:
+        """Hits and misses per stage"""
+        with self._lock:
+            return {"hits": dict(self.hits), "misses": dict(self.misses)}
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_stage_cache() -> StageCache | None:
+    """
+    Return the process-wide stage cache, or None when memoization is disabled
+    """
+    global _default_cache
+    with _default_cache_lock:
+        if STAGE_CACHE_ENABLED and _default_cache is None:
+            _default_cache = StageCache()
+        return _default_cache
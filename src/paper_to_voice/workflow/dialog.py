@@ -55,6 +55,25 @@ You are a world-class podcast producer tasked with transforming the provided inp
    - End on a high note, perhaps with a thought-provoking question or a call-to-action for listeners
 """
 
+LENGTH_INSTRUCTIONS = {
+    "Short (1-2 min)": "Keep the podcast brief, around 1-2 minutes long.",
+    "Medium (3-5 min)": "Aim for a moderate length, about 3-5 minutes.",
+}
+# Longest speech time each length option allows, in seconds
+LENGTH_SECONDS = {
+    "Short (1-2 min)": 120,
+    "Medium (3-5 min)": 300,
+}
+
+CONDENSE_PROMPT = """
+The podcast script below would take about {seconds:.0f} seconds to read aloud, but it must fit in
+{target:.0f} seconds: no more than {words} spoken words in total.
+
+Condense it to that length. Keep the same speakers, the same "Speaker: line" format and the same
+language; keep Jane's opening and her closing summary, and shorten or merge the turns in between.
+Return only the condensed script.
+"""
+
 
 def generate_dialog(state: dict) -> dict:
     """
@@ -72,11 +91,7 @@ def generate_dialog(state: dict) -> dict:
     if tone:
         modified_system_prompt += f"\n\nTONE: The tone of the podcast should be {tone}."
     if length:
-        length_instructions = {
-            "Short (1-2 min)": "Keep the podcast brief, around 1-2 minutes long.",
-            "Medium (3-5 min)": "Aim for a moderate length, about 3-5 minutes.",
-        }
-        modified_system_prompt += f"\n\nLENGTH: {length_instructions[length]}"
+        modified_system_prompt += f"\n\nLENGTH: {LENGTH_INSTRUCTIONS[length]}"
     if language:
         modified_system_prompt += (
             f"\n\nOUTPUT LANGUAGE <IMPORTANT>: The the podcast should be {language}."
@@ -86,3 +101,21 @@ def generate_dialog(state: dict) -> dict:
     response = llm.invoke([messages])
     print(response)
     return {"Step": [state['step']], "Finding": [state['text']], 'Dialog': [response.content]}
+
+
+def condense_dialog(dialog: str, seconds: float, target_seconds: float, max_words: int) -> str:
+    """
+    Ask the LLM to shorten a script that would overrun its length
+
+    Args:
+        dialog: Generated script
+        seconds: Its estimated speech time
+        target_seconds: Speech time to fit in
+        max_words: Spoken words that fit in ``target_seconds``
+
+    Returns:
+        Condensed script
+    """
+    prompt = CONDENSE_PROMPT.format(seconds=seconds, target=target_seconds, words=max_words)
+    response = get_llm().invoke([prompt + "\nSCRIPT:\n" + dialog])
+    return response.content
@@ -2,13 +2,32 @@
 Main workflow orchestration using LangGraph
 """
 
+import threading
+
 from langgraph.graph import StateGraph, START, END
 from langgraph.constants import Send
-from langchain_google_genai import ChatGoogleGenerativeAI
 
-from ..core.models import State
-from .steps import generate_steps, markdown_to_json, parse_json, solve_substeps
+from ..core.events import EventBus
+from ..core.models import State, DialogState
+from ..jobs.broker import get_broker
+from .steps import generate_steps, markdown_to_json, parse_json, merge_sections
+from .sections import use_map_reduce, split_sections, step_images
 from .dialog import generate_dialog
+from .cache import StageCache, dialog_key
+
+
+def continue_to_sections(state: State):
+    """
+    Analyse each section of a long document in parallel (map phase)
+    """
+    sections = state['section_ranges']
+    return [
+        Send("summarize_section", {
+            "section": section,
+            "total": len(sections),
+            "image_path": state['image_path'][section['first']:section['last'] + 1],
+        }) for section in sections
+    ]
 
 
 def continue_to_substeps(state: State):
@@ -16,52 +35,209 @@ def continue_to_substeps(state: State):
     Managing the larger text in more manageable pieces of text
     """
     steps = state['plan']  # extracts list of text from state obj
-    return [Send("solve_substeps", {"step": s, 'image_path': state['image_path']}) for s in steps]
+    sections = state.get('section_ranges') or []
+    return [
+        Send("solve_substeps", {"step": s, 'image_path': step_images(s, sections, state['image_path'])})
+        for s in steps
+    ]
 
 
-def continue_to_substeps_voice(state: State):
+def solve_substeps_on_broker(state: dict) -> dict:
     """
-    Continue to voice generation for substeps
+    Run one ``solve_substeps`` branch on the configured work broker
+
+    LangGraph runs the Send branches concurrently and blocks each on its
+    future, so branches execute in parallel on the broker's processes or
+    hosts; their updates are then merged into the state by the graph's
+    reducers in branch order.
     """
-    print('voice substeps')
-    solutions = state['solutions']
-    steps = state['steps']
-    tone = 'Formal'  # ["Fun", "Formal"]
-    return [
-        Send("generate_dialog", {
-            "step": st,
-            "text": s,
-            'tone': tone,
-            'length': "Short (1-2 min)",
-            'language': "EN"
-        }) for st, s in zip(steps, solutions)
-    ]
+    return get_broker().submit("solve_substeps", dict(state)).result()
 
 
-def create_podcast_workflow():
+def summarize_section_on_broker(state: dict) -> dict:
+    """
+    Run one map-phase section on the work broker
     """
-    Create and return the podcast generation workflow
+    return get_broker().submit("summarize_section", dict(state)).result()
+
+
+def create_analysis_workflow(map_reduce: bool = False):
     """
-    llm = ChatGoogleGenerativeAI(
-        model='gemini-1.5-flash',
-        temperature=0,
-        max_tokens=None,
-        max_retries=2
-    )
+    Create the analysis half of the workflow: plan the paper and solve each step
 
+    Its result depends only on the paper, so it can be memoized per paper and
+    reused for any tone, length or language.
+
+    Args:
+        map_reduce: Plan from per-section outlines written in parallel and
+            merged into one plan, instead of one request with every page.
+            Each step is then solved from the pages of its own sections.
+    """
     graph = StateGraph(State)
-    graph.add_node("generate_steps", generate_steps)
-    graph.add_node("markdown_to_json", markdown_to_json)
     graph.add_node("parse_json", parse_json)
-    graph.add_node("solve_substeps", solve_substeps)
-    graph.add_node("generate_dialog", generate_dialog)
+    graph.add_node("solve_substeps", solve_substeps_on_broker)
 
-    graph.add_edge(START, "generate_steps")
-    graph.add_edge("generate_steps", "markdown_to_json")
-    graph.add_edge("markdown_to_json", "parse_json")
+    if map_reduce:
+        graph.add_node("summarize_section", summarize_section_on_broker)
+        graph.add_node("merge_sections", merge_sections)
+        graph.add_conditional_edges(START, continue_to_sections, ["summarize_section"])
+        graph.add_edge("summarize_section", "merge_sections")
+        graph.add_edge("merge_sections", "parse_json")
+    else:
+        graph.add_node("generate_steps", generate_steps)
+        graph.add_node("markdown_to_json", markdown_to_json)
+        graph.add_edge(START, "generate_steps")
+        graph.add_edge("generate_steps", "markdown_to_json")
+        graph.add_edge("markdown_to_json", "parse_json")
     graph.add_conditional_edges("parse_json", continue_to_substeps, ["solve_substeps"])
-    graph.add_conditional_edges("solve_substeps", continue_to_substeps_voice, ["generate_dialog"])
+    graph.add_edge("solve_substeps", END)
+    return graph.compile()
+
+
+def continue_to_dialogs(state: DialogState):
+    """
+    One dialog branch per requested script (variant and step)
+    """
+    return [Send("generate_dialog", request) for request in state['requests']]
+
+
+def generate_requested_dialog(state: dict) -> dict:
+    """
+    Run ``generate_dialog`` and tag the result with the request it answers
+    """
+    return {**generate_dialog(state), "Request": [state['request']]}
+
+
+def create_dialog_workflow():
+    """
+    Create the dialog half of the workflow: one script per analysed step and
+    podcast variant
+    """
+    graph = StateGraph(DialogState)
+    graph.add_node("generate_dialog", generate_requested_dialog)
+    graph.add_conditional_edges(START, continue_to_dialogs, ["generate_dialog"])
     graph.add_edge("generate_dialog", END)
-    
-    app = graph.compile()
-    return app, llm
+    return graph.compile()
+
+
+_workflows = {}
+_workflows_lock = threading.Lock()
+
+
+def _get_workflow(name: str, factory):
+    # Compiled graphs are stateless between invocations, so every job and
+    # rerun can share them
+    with _workflows_lock:
+        if name not in _workflows:
+            _workflows[name] = factory()
+        return _workflows[name]
+
+
+def podcast_script(dialog: str) -> str:
+    """Strip the scratchpad the model writes before the podcast script"""
+    return dialog.strip().split('## Podcast Script')[-1].strip()
+
+
+def run_analysis(inputs: dict, events: EventBus = None) -> tuple[dict, int]:
+    """
+    Stream the analysis graph, reporting each finished node
+
+    Documents of at least MAP_REDUCE_MIN_PAGES pages are analysed in
+    sections of SECTION_PAGES pages. The number of branches is unknown until
+    ``parse_json`` returns the plan; from then on ``workflow`` events carry
+    the total (the planning nodes plus one analysis and one dialog branch per
+    step).
+
+    Args:
+        inputs: Initial graph state (``image_path``)
+        events: Optional bus that receives a ``workflow`` event per node
+
+    Returns:
+        Tuple of the analysis (``plan`` and the ``steps`` with their
+        ``solutions``, in plan order) and the number of nodes run
+    """
+    events = events or EventBus()
+    if use_map_reduce(len(inputs['image_path'])):
+        inputs = {**inputs, 'section_ranges': split_sections(len(inputs['image_path']))}
+        app = _get_workflow("analysis-map-reduce", lambda: create_analysis_workflow(map_reduce=True))
+    else:
+        app = _get_workflow("analysis", create_analysis_workflow)
+    events.emit("workflow", done=0, message="planning")
+    analysis = {"plan": [], "steps": [], "solutions": []}
+    done, total = 0, None
+    for update in app.stream(inputs):
+        done += 1
+        node, values = next(iter(update.items()))
+        values = values or {}
+        if node == "parse_json":
+            analysis["plan"] = values.get("plan") or []
+            total = done + 2 * len(analysis["plan"])
+        elif node == "solve_substeps":
+            analysis["steps"] += values.get("steps", [])
+            analysis["solutions"] += values.get("solutions", [])
+        events.emit("workflow", done=done, total=total, message=node)
+
+    # Branches finish in any order; the episode follows the plan
+    order = {item["step"]: index for index, item in enumerate(analysis["plan"])}
+    pairs = sorted(zip(analysis["steps"], analysis["solutions"]), key=lambda pair: order.get(pair[0], len(order)))
+    analysis["steps"] = [step for step, _ in pairs]
+    analysis["solutions"] = [solution for _, solution in pairs]
+    return analysis, done
+
+
+def run_dialogs(analysis: dict, variants: list[dict], events: EventBus = None, done: int = 0,
+                cache: StageCache = None, key: str = None) -> tuple[list[list[str]], list[int]]:
+    """
+    Write the podcast scripts of every variant, generating only missing ones
+
+    All missing scripts, for every variant and step, are generated as
+    parallel branches of a single graph run.
+
+    Args:
+        analysis: Result of ``run_analysis``
+        variants: Podcast settings, each with ``tone``, ``length`` (an option
+            understood by ``generate_dialog``) and ``language``
+        events: Optional bus that receives a ``workflow`` event per dialog
+        done: Workflow nodes already reported on ``events``
+        cache: Optional stage cache holding dialogs of earlier runs
+        key: Analysis key the dialogs are stored under (required with ``cache``)
+
+    Returns:
+        Tuple of the scripts of each variant in plan order and how many of
+        each variant's scripts were reused
+    """
+    events = events or EventBus()
+    pairs = list(zip(analysis["steps"], analysis["solutions"]))
+    slots = [(v, i) for v in range(len(variants)) for i in range(len(pairs))]
+    keys = {
+        (v, i): dialog_key(key, *pairs[i], variants[v]["tone"], variants[v]["length"], variants[v]["language"])
+        for v, i in slots
+    }
+    scripts = {slot: cache.get("dialog", keys[slot]) if cache is not None else None for slot in slots}
+    todo = [slot for slot in slots if scripts[slot] is None]
+    total = done + len(todo)
+    events.emit("workflow", done=done, total=total)
+
+    if todo:
+        app = _get_workflow("dialog", create_dialog_workflow)
+        requests = [
+            {"request": n, "step": pairs[i][0], "text": pairs[i][1], "tone": variants[v]["tone"],
+             "length": variants[v]["length"], "language": variants[v]["language"]}
+            for n, (v, i) in enumerate(todo)
+        ]
+        for update in app.stream({"requests": requests}):
+            values = update.get("generate_dialog")
+            if not values:
+                continue
+            slot = todo[values["Request"][0]]
+            scripts[slot] = podcast_script(values["Dialog"][0])
+            if cache is not None:
+                cache.put("dialog", keys[slot], scripts[slot])
+            done += 1
+            events.emit("workflow", done=done, total=total, message="generate_dialog")
+    per_variant = [
+        [scripts[(v, i)] for i in range(len(pairs)) if scripts[(v, i)] is not None]
+        for v in range(len(variants))
+    ]
+    reused = [len(pairs) - sum(1 for slot in todo if slot[0] == v) for v in range(len(variants))]
+    return per_variant, reused
@@ -0,0 +1,61 @@
+"""
+Splitting long documents into sections for map-reduce analysis
+"""
+
+from ..core.config import MAP_REDUCE_MIN_PAGES, SECTION_PAGES
+
+
+def use_map_reduce(pages: int, min_pages: int = MAP_REDUCE_MIN_PAGES) -> bool:
+    """Whether a document is long enough to be analysed section by section"""
+    return bool(min_pages) and pages >= min_pages
+
+
+def split_sections(pages: int, pages_per_section: int = SECTION_PAGES) -> list[dict]:
+    """
+    Divide a document into consecutive sections of at most ``pages_per_section``
+
+    Args:
+        pages: Number of pages
+        pages_per_section: Section size
+
+    Returns:
+        ``{"index": 1-based section number, "first": first page, "last":
+        last page}`` per section, with 0-based page numbers; the last page
+        is included
+    """
+    pages_per_section = max(1, pages_per_section)
+    return [
+        {"index": index + 1, "first": first, "last": min(first + pages_per_section, pages) - 1}
+        for index, first in enumerate(range(0, pages, pages_per_section))
+    ]
+
+
+def step_images(step: dict, sections: list[dict], images: list[str]) -> list[str]:
+    """
+    Page images a plan step needs to be solved
+
+    Steps merged from section outlines name the sections they draw on; only
+    those pages are sent. Steps without usable section references get every
+    page, as in single-request analysis.
+
+    Args:
+        step: Plan entry, optionally with a ``sections`` list of 1-based numbers
+        sections: Sections from ``split_sections`` (empty for whole-document analysis)
+        images: Encoded page images
+
+    Returns:
+        Images in page order
+    """
+    by_index = {section["index"]: section for section in sections}
+    wanted = []
+    for number in step.get("sections") or []:
+        try:
+            section = by_index.get(int(number))
+        except (TypeError, ValueError):
+            continue
+        if section is not None and section not in wanted:
+            wanted.append(section)
+    if not wanted:
+        return images
+    wanted.sort(key=lambda section: section["first"])
+    return [image for section in wanted for image in images[section["first"]:section["last"] + 1]]
@@ -4,7 +4,7 @@ Workflow steps for processing research papers
 
 import json
 from langchain_core.messages import HumanMessage
-from ..core.models import State, StepState
+from ..core.models import State, StepState, SectionState
 from ..core.config import get_llm
 
 
@@ -27,6 +27,64 @@ def generate_steps(state: State) -> dict:
     return {"content": [response.content], "image_path": state['image_path']}
 
 
+def summarize_section(state: SectionState) -> dict:
+    """
+    Outline the steps described in one section of a long document (map phase)
+    """
+    llm = get_llm()
+    section = state['section']
+    prompt = f"""
+    Consider you are a research scientist in artificial intelligence who is expert in understanding research papers.
+    You will be given pages {section['first'] + 1} to {section['last'] + 1} of a long research document
+    (section {section['index']} of {state['total']}).
+    Identify the steps a researcher need to perform that are described in these pages, with their substeps.
+    Only describe what these pages contain.
+    """
+    message = HumanMessage(content=[
+        {'type': 'text', 'text': prompt},
+        *[{"type": 'image_url', 'image_url': img} for img in state['image_path']]
+    ])
+    response = llm.invoke([message])
+    return {"sections": [{**section, "outline": response.content}]}
+
+
+def merge_sections(state: State) -> dict:
+    """
+    Merge the section outlines into one step plan for the document (reduce phase)
+
+    The result uses the ``markdown_to_json`` schema, plus the sections each
+    step draws on so that ``solve_substeps`` only needs those pages.
+    """
+    llm = get_llm()
+    outlines = "\n\n".join(
+        f"Section {section['index']} (pages {section['first'] + 1}-{section['last'] + 1}):\n{section['outline']}"
+        for section in sorted(state['sections'], key=lambda section: section['index'])
+    )
+    prompt = """
+    You are given outlines of consecutive sections of one long research document.
+    Merge them into a single list of the steps a researcher need to perform, in document order.
+    Combine steps that span several sections and drop repetitions. For each step, list the numbers of the
+    sections it draws on.
+    Follow following schema strictly and answer with json only.
+
+    schema:
+    [
+    {
+      "step": "description of step 1",
+      "sections": [1, 2],
+      "substeps": [
+        {
+          "key": "title of sub step 1 of step 1",
+          "value": "description of sub step 1 of step 1"
+        }]}]
+
+    Outlines:
+    %s
+    """ % outlines
+    str_response = llm.invoke([prompt])
+    return {'content': str_response.content}
+
+
 def markdown_to_json(state: State) -> dict:
     """
     Convert markdown content to JSON format
@@ -89,7 +147,10 @@ def parse_json(state: State) -> dict:
             for substep in step['substeps']:
                 substeps.append(substep['value'])
 
-            output.append({'step': step['step'], 'substeps': substeps})
+            entry = {'step': step['step'], 'substeps': substeps}
+            if step.get('sections'):
+                entry['sections'] = step['sections']
+            output.append(entry)
         print(json_content)
         return {"plan": output}
     except json.JSONDecodeError as e:
@@ -0,0 +1,421 @@
+"""
+Tests for the audio pipeline helpers
+"""
+
+import os
+import pytest
+from src.paper_to_voice.audio.pacing import PacingPolicy, is_throttle_error
+
+
+def _policy(**kwargs):
+    sleeps = []
+    policy = PacingPolicy(sleep=sleeps.append, clock=lambda: 0.0, rng=lambda: 1.0, **kwargs)
+    return policy, sleeps
+
+
+def test_pacing_no_wait_when_healthy():
+    """Healthy calls should never sleep"""
+    policy, sleeps = _policy()
+    for _ in range(5):
+        assert policy.call(lambda: "ok") == "ok"
+    assert sleeps == []
+    assert policy.stats.requests == 5
+    assert policy.stats.wait_seconds == 0
+
+
+def test_pacing_exponential_backoff_then_success():
+    """Transient failures back off exponentially and recover"""
+    policy, sleeps = _policy(max_attempts=3, base_delay=0.5)
+    calls = iter([RuntimeError("boom"), RuntimeError("boom"), "done"])
+
+    def flaky():
+        result = next(calls)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    assert policy.call(flaky) == "done"
+    assert sleeps == [0.5, 1.0]
+    assert policy.stats.retries == 2
+    assert policy.gap == 0.0
+
+
+def test_pacing_throttle_widens_gap_and_gives_up():
+    """Throttling grows the inter-request gap; exhausting attempts re-raises"""
+    policy, sleeps = _policy(max_attempts=2, base_delay=0.5, max_delay=10)
+
+    def throttled():
+        raise RuntimeError("429 Too Many Requests, retry-after: 3")
+
+    with pytest.raises(RuntimeError):
+        policy.call(throttled)
+    assert policy.stats.throttles == 2
+    assert policy.stats.failures == 1
+    assert policy.gap == 6.0
+    assert sleeps == [3.0]
+    assert is_throttle_error(RuntimeError("Rate limit exceeded"))
+    assert not is_throttle_error(ValueError("bad input"))
+
+
+def test_tts_cache_hits_and_lru_eviction(tmp_path):
+    """Cache entries are keyed by content and evicted oldest-first"""
+    from src.paper_to_voice.audio.cache import TTSCache, make_cache_key
+
+    assert make_cache_key("Welcome  back ", "EN-US", 0.9, "EN", "m") == \
+        make_cache_key("Welcome back", "EN-US", 0.9, "EN", "m")
+    assert make_cache_key("Welcome back", "EN-US", 0.9, "EN", "m") != \
+        make_cache_key("Welcome back", "EN_INDIA", 0.9, "EN", "m")
+
+    cache = TTSCache(str(tmp_path / "cache"), max_bytes=250)
+    sources = []
+    for i in range(3):
+        src = tmp_path / f"clip{i}.wav"
+        src.write_bytes(b"x" * 100)
+        sources.append(str(src))
+
+    first = cache.put("a" * 64, sources[0])
+    os.utime(first, (1, 1))
+    cache.put("b" * 64, sources[1])
+    assert cache.get("a" * 64) is not None  # refreshes "a"
+    os.utime(cache.get("b" * 64), (2, 2))
+    cache.put("c" * 64, sources[2])
+
+    assert cache.get("b" * 64) is None
+    assert cache.get("a" * 64) is not None
+    assert cache.size_bytes == 200
+    assert TTSCache(str(tmp_path / "cache"), max_bytes=250).size_bytes == 200
+    assert cache.stats()["hits"] == 3
+
+
+def test_tts_cache_recounts_files_removed_elsewhere(tmp_path):
+    """Files removed by another process no longer count towards the cap"""
+    from src.paper_to_voice.audio.cache import TTSCache
+
+    sources = []
+    for i in range(4):
+        src = tmp_path / f"clip{i}.wav"
+        src.write_bytes(b"x" * 100)
+        sources.append(str(src))
+
+    cache = TTSCache(str(tmp_path / "cache"), max_bytes=250)
+    for key, source in zip("ab", sources):
+        os.remove(cache.put(key * 64, source))  # e.g. evicted by another worker
+    cache.put("c" * 64, sources[2])
+    cache.put("d" * 64, sources[3])
+
+    assert cache.get("c" * 64) is not None
+    assert cache.get("d" * 64) is not None
+    assert cache.size_bytes == 200
+
+    # Evicted elsewhere between the lookup and the recency update: a miss
+    found = cache._find("c" * 64)
+    cache._find = lambda key: found
+    os.remove(found)
+    assert cache.get("c" * 64) is None
+    assert cache.stats()["misses"] == 1
+
+
+def test_coalesce_dialog_merges_and_splits_turns():
+    """Same-speaker lines merge; overlong turns split at sentences"""
+    from src.paper_to_voice.audio.turns import coalesce_dialog
+
+    dialog = "\n".join([
+        "## Podcast Script",
+        "**Jane:** Welcome back to the show.",
+        "Today we have a guest.",
+        "[Music fades]",
+        "**Jane:** Let's dive in.",
+        "**Dr. Sharma:** Thanks, Jane. It is great to be here. Really great.",
+    ])
+    utterances, stats, _ = coalesce_dialog(dialog, max_chars=40)
+
+    assert [(u.speaker, u.text) for u in utterances] == [
+        ("Jane", "Welcome back to the show."),
+        ("Jane", "Today we have a guest. Let's dive in."),
+        ("Dr. Sharma", "Thanks, Jane. It is great to be here."),
+        ("Dr. Sharma", "Really great."),
+    ]
+    assert stats.requests_before == 4
+    assert stats.requests_after == 4
+
+    utterances, stats, _ = coalesce_dialog(dialog, max_chars=500)
+    assert len(utterances) == 2
+    assert stats.as_dict() == {"requests_before": 4, "requests_after": 2}
+
+
+def test_script_parser_typed_stream_and_dropped_lines():
+    """One pass yields typed utterances and counts what was dropped"""
+    from src.paper_to_voice.audio.script import ScriptParser
+
+    parser = ScriptParser(
+        voices={"Jane": {"accent": "EN-US", "speed": 0.9}, "Dr. Sharma": {"accent": "EN_INDIA", "speed": 1.0}},
+        aliases={"Guest": "Dr. Sharma", "Guest name": "Dr. Sharma"},
+    )
+    dialog = "\n".join([
+        "Here is the script you asked for:",
+        "## Podcast Script",
+        "(Intro music)",
+        "**Jane:** Hi there! [laughs] Welcome.",
+        "**Guest:** Thanks for having me.",
+        "[Guest name]: It's a **big** day.",
+        "---",
+        "**Dr. Sharma** We trained [sighs] for weeks.",
+        "**Jane:** That is *really* __important__.",
+        "",
+        "*Outro music*",
+    ])
+    utterances, stats = parser.parse(dialog)
+
+    assert [(u.speaker, u.text, u.voice.accent) for u in utterances] == [
+        ("Jane", "Hi there! Welcome.", "EN-US"),
+        ("Dr. Sharma", "Thanks for having me.", "EN_INDIA"),
+        ("Dr. Sharma", "It's a big day.", "EN_INDIA"),
+        ("Dr. Sharma", "We trained for weeks.", "EN_INDIA"),
+        ("Jane", "That is really important.", "EN-US"),
+    ]
+    assert stats.utterances == 5
+    assert stats.dropped == {"no_speaker": 1, "heading": 1, "stage_direction": 2, "rule": 1, "blank": 1}
+    assert parser.parse_line("Just narration") is None
+
+
+def test_backend_registry_and_cached_synthesis(tmp_path, monkeypatch):
+    """Registered backends are selectable and their output is cached"""
+    from src.paper_to_voice.audio.backends import TTSBackend, register_backend, get_backend
+    from src.paper_to_voice.audio.cache import TTSCache
+    from src.paper_to_voice.audio.tts import get_text_to_voice, generate_podcast_audio
+
+    calls = []
+
+    class FakeBackend(TTSBackend):
+        name = "fake"
+        model = "fake-model"
+
+        def synthesize(self, text, speed, accent, language):
+            calls.append((text, accent))
+            path = tmp_path / f"out{len(calls)}.wav"
+            path.write_bytes(text.encode())
+            return str(path)
+
+    register_backend("fake", FakeBackend)
+    assert isinstance(get_backend("fake"), FakeBackend)
+    assert open(get_text_to_voice("hi", backend="fake")).read() == "hi"
+    with pytest.raises(ValueError):
+        get_backend("missing")
+
+    import src.paper_to_voice.audio.tts as tts
+    cache = TTSCache(str(tmp_path / "cache"))
+    monkeypatch.setattr(tts, "get_backend", lambda name=None: get_backend("fake"))
+    first = generate_podcast_audio("**Jane:** Welcome back", "EN", cache=cache)
+    second = generate_podcast_audio("**Jane:**  Welcome back ", "EN", cache=cache)
+    assert first == second
+    assert calls == [("hi", "EN-US"), ("Welcome back", "EN-US")]
+    assert cache.hit_rate == 0.5
+
+
+def test_stream_concat_writes_all_segments(tmp_path):
+    """Segments are decoded once each and streamed into one output"""
+    import wave
+    from pydub.generators import Sine
+    from src.paper_to_voice.audio.encoder import EncoderSettings
+    from src.paper_to_voice.audio.processor import stream_concat
+
+    paths = []
+    for i, freq in enumerate([440, 220, 330]):
+        path = tmp_path / f"seg{i}.wav"
+        Sine(freq).to_audio_segment(duration=200).set_frame_rate(22050).export(path, format="wav")
+        paths.append(str(path))
+    broken = tmp_path / "broken.wav"
+    broken.write_bytes(b"not audio")
+
+    output = tmp_path / "out.wav"
+    stats = stream_concat([*paths, str(broken)], str(output), EncoderSettings("wav"))
+
+    with wave.open(str(output)) as result:
+        assert result.getframerate() == 44100
+        assert abs(result.getnframes() - 3 * 200 * 44100 // 1000) <= 3  # resampling rounds
+        assert stats.pcm_bytes == result.getnframes() * result.getsampwidth()
+    assert stats.output_bytes == os.path.getsize(output)
+    assert abs(stats.audio_seconds - 0.6) < 0.01
+
+
+def test_stream_concat_progressive_partial_output(tmp_path):
+    """Each flushed partial file is playable while segments keep arriving"""
+    import wave
+    from pydub.generators import Sine
+    from src.paper_to_voice.audio.encoder import EncoderSettings, FileTail
+    from src.paper_to_voice.audio.processor import stream_concat
+
+    def produce():
+        for i in range(3):
+            path = tmp_path / f"seg{i}.wav"
+            Sine(440).to_audio_segment(duration=100).export(path, format="wav")
+            yield str(path)
+
+    output = str(tmp_path / "out.wav")
+    tail = FileTail(output)
+    partial_frames, streamed = [], []
+
+    def on_progress(path, segments):
+        with wave.open(path) as partial:
+            partial_frames.append(partial.getnframes())
+        streamed.append(tail.read())
+
+    stream_concat(produce(), output, EncoderSettings("wav"), on_progress=on_progress)
+
+    assert partial_frames == [4410, 8820, 13230]
+    assert all(streamed)
+
+
+def test_stream_concat_failure_keeps_error_and_removes_output(tmp_path):
+    """A failing source surfaces its own error and leaves no partial file"""
+    from pydub.generators import Sine
+    from src.paper_to_voice.audio.encoder import EncoderSettings
+    from src.paper_to_voice.audio.processor import stream_concat
+
+    def produce():
+        path = tmp_path / "seg0.wav"
+        Sine(440).to_audio_segment(duration=100).export(path, format="wav")
+        yield str(path)
+        raise ValueError("synthesis failed")
+
+    output = tmp_path / "out.wav"
+    with pytest.raises(ValueError, match="synthesis failed"):
+        stream_concat(produce(), str(output), EncoderSettings("wav"), on_progress=lambda *_: None)
+    assert not output.exists()
+
+
+def test_stream_concat_removes_reserved_output_when_encoder_cannot_start(tmp_path, monkeypatch):
+    """An encoder that fails to launch leaves no empty output behind"""
+    import src.paper_to_voice.audio.encoder as encoder
+    from src.paper_to_voice.audio.processor import stream_concat
+
+    monkeypatch.setattr(encoder, "get_encoder_name", lambda: str(tmp_path / "no-ffmpeg"))
+    output = tmp_path / "out.mp3"
+    output.touch()  # reserved by the caller, as consolidate_voice does
+    with pytest.raises(OSError):
+        stream_concat([], str(output), encoder.EncoderSettings("mp3"))
+    assert not output.exists()
+
+
+def test_mixer_crossfade_gain_and_ducking():
+    """Mixer overlaps clips, applies speaker gain and ducks the bed under speech"""
+    import numpy as np
+    from src.paper_to_voice.audio.encoder import PcmFormat
+    from src.paper_to_voice.audio.mixer import Mixer
+
+    fmt = PcmFormat(frame_rate=1000, channels=1)
+    speech = np.full((500, 1), 0.5, dtype=np.float32)
+    silence = np.zeros((500, 1), dtype=np.float32)
+
+    mixer = Mixer(fmt, crossfade_ms=100, speaker_gains_db={"Jane": -6.0})
+    out = np.concatenate([mixer.add(speech, "Jane"), mixer.add(speech), mixer.finish()])
+    assert len(out) == 900
+    assert abs(out[0, 0] - 0.5 * 10 ** (-6 / 20)) < 1e-6
+    assert abs(out[-1, 0] - 0.5) < 1e-6
+
+    bed = np.ones((100, 1), dtype=np.float32)
+    mixer = Mixer(fmt, crossfade_ms=0, bed=bed, bed_gain_db=-20.0, duck_db=-20.0, window_ms=50)
+    quiet = mixer.add(silence)
+    loud = mixer.add(speech) - speech
+    assert np.allclose(quiet[-100:], 0.1)
+    assert np.allclose(loud[-100:], 0.01)
+
+
+def test_consolidate_with_music_bed_skips_standalone_tones(tmp_path):
+    """A mixer's bed replaces the intro and outro tones instead of adding to them"""
+    import wave
+    from pydub.generators import Sine
+    from src.paper_to_voice.audio.encoder import EncoderSettings
+    from src.paper_to_voice.audio.mixer import Mixer, tone_bed
+    from src.paper_to_voice.audio.processor import consolidate_voice
+
+    clips = []
+    for i in range(2):
+        path = tmp_path / f"clip{i}.wav"
+        Sine(440).to_audio_segment(duration=500).export(path, format="wav")
+        clips.append(str(path))
+
+    def seconds(mixer):
+        output = consolidate_voice(iter(clips), str(tmp_path / "voices"), mixer=mixer,
+                                   settings=EncoderSettings("wav"), assets_dir=str(tmp_path / "assets"))
+        with wave.open(output) as result:
+            return result.getnframes() / result.getframerate()
+
+    assert seconds(Mixer(crossfade_ms=0)) == pytest.approx(3.0, abs=0.01)  # tone, clips, tone
+    assert seconds(Mixer(crossfade_ms=0, bed=tone_bed(1000))) == pytest.approx(1.0, abs=0.01)
+
+
+def test_postprocess_clip_trims_normalizes_and_resamples(tmp_path):
+    """Clips come out trimmed to the pause, at target loudness and format"""
+    import wave
+    import numpy as np
+    from pydub import AudioSegment
+    from pydub.generators import Sine
+    from src.paper_to_voice.audio.mixer import pcm_to_array
+    from src.paper_to_voice.audio.postprocess import postprocess_clip
+
+    tone = Sine(440, sample_rate=22050).to_audio_segment(duration=500, volume=-30.0)
+    silence = AudioSegment.silent(duration=1000, frame_rate=22050)
+    source = tmp_path / "raw.wav"
+    (silence + tone + silence).set_channels(2).export(source, format="wav")
+
+    result = postprocess_clip(str(source), str(tmp_path / "clips"))
+    with wave.open(result) as clip:
+        assert (clip.getframerate(), clip.getnchannels(), clip.getsampwidth()) == (44100, 1, 2)
+        samples = pcm_to_array(clip.readframes(clip.getnframes()))
+
+    assert abs(len(samples) / 44100 - 0.8) < 0.01  # 500 ms speech + 2 x 150 ms pause
+    rms_db = 20 * np.log10(np.sqrt(np.mean(samples ** 2)))
+    assert abs(rms_db - -20.0) < 0.5
+
+
+def test_resample_filters_before_downsampling():
+    """Tones above the new Nyquist frequency are removed instead of aliased"""
+    import numpy as np
+    from src.paper_to_voice.audio.postprocess import resample
+
+    t = np.arange(48000) / 48000
+
+    def level(freq):
+        samples = np.sin(2 * np.pi * freq * t).astype(np.float32)[:, None]
+        out = resample(samples, 48000, 24000)[1000:-1000]
+        return np.sqrt(np.mean(out ** 2)) / np.sqrt(0.5)
+
+    assert level(1000) == pytest.approx(1.0, abs=0.01)
+    assert level(15000) < 0.01  # would fold back to 9 kHz
+
+
+def test_codec_arguments():
+    """Codec, bitrate and VBR map onto ffmpeg output arguments"""
+    from src.paper_to_voice.audio.encoder import EncoderSettings, codec_arguments
+
+    assert codec_arguments(EncoderSettings("mp3", "128k", False)) == \
+        ["-c:a", "libmp3lame", "-b:a", "128k", "-f", "mp3"]
+    assert codec_arguments(EncoderSettings("mp3", "128k", True)) == \
+        ["-c:a", "libmp3lame", "-q:a", "5", "-f", "mp3"]
+    assert codec_arguments(EncoderSettings("opus", "48k", True)) == \
+        ["-c:a", "libopus", "-b:a", "48k", "-vbr", "on", "-f", "ogg"]
+    assert codec_arguments(EncoderSettings("aac", "96k", True))[-2:] == ["-f", "adts"]
+    with pytest.raises(ValueError):
+        codec_arguments(EncoderSettings("flac", "96k", False))
+
+
+def test_duration_estimator_calibrates_and_fits_turns(tmp_path):
+    """Measured clips set the speaking rate; overlong scripts keep their opening and closing turns"""
+    from src.paper_to_voice.audio.duration import DurationEstimator, fit_turns, script_seconds
+    from src.paper_to_voice.audio.script import Utterance, VoiceSettings
+
+    voice = VoiceSettings("EN-US", 0.5)
+    line = Utterance("Jane", " ".join(["word"] * 10), voice)
+    estimator = DurationEstimator(str(tmp_path / "rates.json"))
+    estimator.record(line, "en", 6.0)  # 0.3 s/word at speed 1.0
+    assert estimator.estimate(line, "EN") == pytest.approx(6.0)
+    estimator.record(Utterance("Jane", "Hi there", voice), "EN", 60.0)  # too short to calibrate
+    estimator.save()
+    assert DurationEstimator(str(tmp_path / "rates.json")).seconds_per_word("EN") == pytest.approx(0.3)
+
+    script = [line._replace(speaker=f"s{i}") for i in range(5)]
+    assert script_seconds(script, "EN", estimator) == pytest.approx(30.0)
+    kept = fit_turns(script, "EN", 20.0, estimator)
+    assert [u.speaker for u in kept] == ["s0", "s1", "s4"]
+    assert fit_turns(script, "EN", 30.0, estimator) == script
@@ -26,6 +26,16 @@ def test_image_encoding():
     print("✅ Image encoding function available")
 
 
+def test_config_import_is_lazy(monkeypatch):
+    """The API key is checked on first use, not when config is imported"""
+    from src.paper_to_voice.core.config import get_google_api_key
+    monkeypatch.delenv("GOOGLE_API_KEY", raising=False)
+    with pytest.raises(ValueError):
+        get_google_api_key()
+    monkeypatch.setenv("GOOGLE_API_KEY", "test-key")
+    assert get_google_api_key() == "test-key"
+
+
 if __name__ == "__main__":
     test_config_loading()
     test_image_encoding()
@@ -0,0 +1,69 @@
+"""
+Tests for the batch command line
+"""
+
+import os
+import json
+import src.paper_to_voice.cli as cli
+from src.paper_to_voice.cli import collect_pdfs, output_paths, main
+from src.paper_to_voice.pipeline import PipelineResult
+
+
+def _touch(path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(b"%PDF-1.4")
+    return str(path)
+
+
+def test_collect_pdfs_expands_directories(tmp_path, capsys):
+    """Directories expand to their PDFs, optionally recursively; anything else is skipped"""
+    top = _touch(tmp_path / "papers" / "a.pdf")
+    upper = _touch(tmp_path / "papers" / "B.PDF")
+    nested = _touch(tmp_path / "papers" / "more" / "c.pdf")
+    notes = tmp_path / "papers" / "notes.txt"
+    notes.write_text("not a paper")
+
+    assert collect_pdfs([str(tmp_path / "papers")]) == sorted([top])
+    assert collect_pdfs([str(tmp_path / "papers"), top], recursive=True) == sorted([top, nested])
+    assert collect_pdfs([upper, str(notes), str(tmp_path / "missing.pdf")]) == [upper]
+    assert "notes.txt" in capsys.readouterr().err
+
+
+def test_output_paths_keep_colliding_stems_apart(tmp_path):
+    """Papers with the same file name in different directories get numbered outputs"""
+    pdfs = [str(tmp_path / "a" / "paper.pdf"), str(tmp_path / "b" / "paper.pdf"), str(tmp_path / "other.pdf")]
+    paths = output_paths(pdfs, "out", ".mp3")
+    assert paths == {
+        pdfs[0]: os.path.join("out", "paper.mp3"),
+        pdfs[1]: os.path.join("out", "paper-2.mp3"),
+        pdfs[2]: os.path.join("out", "other.mp3"),
+    }
+
+
+def test_main_writes_summary_and_reports_failures(tmp_path, monkeypatch):
+    """One failed paper fails the run without stopping the others"""
+    def run_variants(pdf_path, variants, targets, on_status=None):
+        if os.path.basename(pdf_path) == "broken.pdf":
+            return [PipelineResult(pdf_path, error="Traceback ...\nValueError: unreadable PDF")]
+        with open(targets[0], "wb") as f:
+            f.write(b"audio")
+        return [PipelineResult(pdf_path, output_path=targets[0], stats={"variant": variants[0]})]
+
+    monkeypatch.setattr(cli, "run_variants", run_variants)
+    good = _touch(tmp_path / "papers" / "good.pdf")
+    broken = _touch(tmp_path / "papers" / "broken.pdf")
+    output_dir = tmp_path / "podcasts"
+
+    assert main([str(tmp_path / "papers"), "-o", str(output_dir), "-j", "2"]) == 1
+
+    summary = json.loads((output_dir / "summary.json").read_text())
+    assert (summary["papers"], summary["succeeded"], summary["failed"]) == (2, 1, 1)
+    by_pdf = {result["pdf_path"]: result for result in summary["results"]}
+    assert by_pdf[good]["ok"] and os.path.exists(by_pdf[good]["output_path"])
+    assert by_pdf[good]["stats"]["variant"] == {"tone": "Formal", "length": "Short (1-2 min)", "language": "EN"}
+    assert not by_pdf[broken]["ok"] and "unreadable PDF" in by_pdf[broken]["error"]
+
+    os.remove(broken)
+    assert main([str(tmp_path / "papers"), "-o", str(output_dir), "--summary", str(tmp_path / "s.json")]) == 0
+    assert json.loads((tmp_path / "s.json").read_text())["failed"] == 0
@@ -0,0 +1,92 @@
+"""
+Tests for core modules
+"""
+
+import json
+from src.paper_to_voice.core.events import EventBus, ProgressTracker, StageHistory
+from src.paper_to_voice.core.memory import MemoryAccountant, fit_render_scale, fit_image_scale, render_bytes
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_progress_tracker_uses_historical_rates(tmp_path):
+    """ETA comes from per-stage rates; totals replace historical unit counts once known"""
+    history = StageHistory(str(tmp_path / "rates.json"))
+    history.record({"render": (1.0, 1), "workflow": (10.0, 1), "tts": (2.0, 1)})
+    rates = {stage: history.rate(stage) for stage in ("render", "workflow", "tts")}
+
+    clock = _Clock()
+    updates = []
+    tracker = ProgressTracker(history, on_progress=updates.append, clock=clock)
+    bus = EventBus()
+    bus.subscribe(tracker.handle)
+
+    bus.emit("render", done=0)
+    clock.now = 2.0
+    bus.emit("render", done=2, total=2)
+    expected = (rates["workflow"]["units"] * rates["workflow"]["seconds_per_unit"]
+                + rates["tts"]["units"] * rates["tts"]["seconds_per_unit"])
+    assert abs(updates[-1].eta_seconds - expected) < 1e-6
+
+    bus.emit("workflow", done=5, total=5)
+    bus.emit("tts", done=0, total=4)
+    bus.emit("tts", advance=1, message="Jane")
+    assert updates[-1].eta_seconds == 3 * rates["tts"]["seconds_per_unit"]
+    assert "1/4 lines (Jane)" in updates[-1].message
+    assert 0 < updates[-1].percent < 100
+
+    tracker.finish()
+    saved = json.loads((tmp_path / "rates.json").read_text())
+    # 2 pages in 2s is slower than the 0.65s/page history, so the average rises
+    assert saved["render"]["seconds_per_unit"] > rates["render"]["seconds_per_unit"]
+    assert StageHistory(str(tmp_path / "rates.json")).rate("tts") == history.rate("tts")
+
+
+def test_event_bus_isolates_failing_subscribers():
+    """A broken subscriber neither stops delivery nor raises into the emitter"""
+    bus = EventBus()
+    seen = []
+    bus.subscribe(lambda event: 1 / 0)
+    unsubscribe = bus.subscribe(seen.append)
+    bus.emit("audio", done=3)
+    unsubscribe()
+    bus.emit("audio", done=4)
+    assert [event.done for event in seen] == [3]
+
+
+def test_memory_accountant_charges_peaks_to_stages():
+    """The peak between events is charged to the work that just finished"""
+    accountant = MemoryAccountant(ceiling_bytes=64 * 2 ** 20).start()
+    bus = EventBus()
+    bus.subscribe(accountant.handle)
+    try:
+        bus.emit("workflow", done=0, message="planning")
+        buffer = bytearray(8 * 2 ** 20)
+        del buffer
+        bus.emit("workflow", done=1, message="generate_steps")
+        bus.emit("tts", advance=1)
+        assert accountant.fits(2 ** 20) and not accountant.fits(128 * 2 ** 20)
+    finally:
+        accountant.finish()
+    report = accountant.report()
+    assert report["stages"]["workflow:generate_steps"]["peak_bytes"] >= 8 * 2 ** 20
+    assert report["stages"]["synthesize"]["peak_bytes"] < 8 * 2 ** 20
+    assert report["peak_bytes"] >= 8 * 2 ** 20
+
+
+def test_memory_budget_lowers_render_scale():
+    """Scales shrink only as far as needed and never below the minimum"""
+    letter = [(612.0, 792.0)]
+    assert fit_render_scale(letter, 4.0, float("inf")) == 4.0
+    scale = fit_render_scale(letter, 4.0, 8 * 2 ** 20)
+    assert 1.0 <= scale < 4.0 and render_bytes(letter, scale) <= 8 * 2 ** 20
+    assert fit_render_scale(letter, 4.0, 0, min_scale=1.0) == 1.0
+    # Three copies of 10 MB of images need 30 MB; with 7.5 MB available a quarter of the pixels fits
+    assert fit_image_scale(10_000_000, 4.0, 100_000_000) == 4.0
+    assert fit_image_scale(10_000_000, 4.0, -2_500_000, copies=3) == 2.0
@@ -0,0 +1,200 @@
+"""
+Tests for the background job queue
+"""
+
+import os
+import time
+import threading
+import pytest
+from src.paper_to_voice.jobs.queue import JobQueue, QUEUED, RUNNING, SUCCEEDED, FAILED
+from src.paper_to_voice.jobs.worker import WorkerPool
+from src.paper_to_voice.jobs.broker import ThreadBroker, ProcessBroker, RemoteBroker, register_task, serve_worker
+from src.paper_to_voice.jobs.store import PaperStore
+
+
+class _FakeResult:
+    def __init__(self, pdf_path, output_path):
+        self.pdf_path = pdf_path
+        self.output_path = output_path
+
+    def as_dict(self):
+        return {"pdf_path": self.pdf_path, "output_path": self.output_path, "ok": True, "error": None}
+
+
+def _pdf(tmp_path, name="paper.pdf"):
+    path = tmp_path / name
+    path.write_bytes(b"%PDF-1.4")
+    return str(path)
+
+
+def test_queue_claims_each_job_once_in_order(tmp_path):
+    """Jobs are claimed oldest first, survive reopening, and uploads are cleaned up"""
+    queue = JobQueue(str(tmp_path / "jobs.sqlite3"), str(tmp_path / "uploads"))
+    first = queue.submit(_pdf(tmp_path), tone="Formal", language="EN")
+    second = queue.submit(_pdf(tmp_path, "other.pdf"), tone="Conversational")
+    assert queue.position(second) == 1
+
+    reopened = JobQueue(str(tmp_path / "jobs.sqlite3"), str(tmp_path / "uploads"))
+    job = reopened.claim("w1")
+    assert job.id == first and job.status == RUNNING and job.params == {"tone": "Formal", "language": "EN"}
+    assert queue.claim("w2").id == second
+    assert queue.claim("w3") is None
+
+    queue.set_progress(first, "Halfway", 50)
+    assert reopened.get(first).progress == 50
+    queue.set_partial(first, "partial.mp3", 7)
+    assert reopened.get(first).partial_segments == 7
+    queue.complete(first, {"ok": True, "error": None, "output_path": "out.mp3"})
+    queue.complete(second, {"ok": False, "error": "boom"})
+    assert queue.get(first).status == SUCCEEDED and queue.get(first).output_path == "out.mp3"
+    assert queue.get(second).status == FAILED and queue.get(second).error == "boom"
+    assert not os.listdir(tmp_path / "uploads")
+
+    assert queue.requeue([first]) == 0
+    third = queue.submit(_pdf(tmp_path))
+    queue.claim("dead")
+    assert queue.requeue([third]) == 1 and queue.get(third).status == QUEUED
+
+
+def test_worker_pool_drains_queue(tmp_path):
+    """Workers run jobs through the runner and record results and failures"""
+    queue = JobQueue(str(tmp_path / "jobs.sqlite3"), str(tmp_path / "uploads"))
+    calls = []
+
+    def runner(pdf_path, output_path, on_status, on_partial, **params):
+        calls.append(params)
+        if params.get("tone") == "Broken":
+            raise RuntimeError("pipeline crashed")
+        on_status("Synthesizing", 90)
+        return _FakeResult(pdf_path, output_path)
+
+    jobs = [queue.submit(_pdf(tmp_path), tone=tone) for tone in ["Formal", "Broken", "Conversational"]]
+    pool = WorkerPool(queue, workers=2, poll_interval=0.01, output_dir=str(tmp_path / "out"), runner=runner).start()
+    deadline = time.time() + 5
+    while time.time() < deadline and not all(queue.get(job_id).done for job_id in jobs):
+        time.sleep(0.01)
+    pool.stop()
+
+    statuses = [queue.get(job_id).status for job_id in jobs]
+    assert statuses == [SUCCEEDED, FAILED, SUCCEEDED]
+    assert "pipeline crashed" in queue.get(jobs[1]).error
+    assert queue.get(jobs[0]).output_path.startswith(str(tmp_path / "out"))
+    assert len(calls) == 3
+
+
+def test_second_pool_in_process_leaves_running_jobs_alone(tmp_path):
+    """Only jobs of exited workers are requeued, even when the pid is ours"""
+    queue = JobQueue(str(tmp_path / "jobs.sqlite3"), str(tmp_path / "uploads"))
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def runner(pdf_path, output_path, on_status, on_partial, **params):
+        calls.append(pdf_path)
+        started.set()
+        release.wait(5)
+        return _FakeResult(pdf_path, output_path)
+
+    job_id = queue.submit(_pdf(tmp_path))
+    stale_id = queue.submit(_pdf(tmp_path, "stale.pdf"))
+    first = WorkerPool(queue, workers=1, poll_interval=0.01, output_dir=str(tmp_path / "out"), runner=runner).start()
+    assert started.wait(5)
+    # A job claimed by an earlier process that had our pid
+    assert queue.claim(f"{first.name}/99.0").id == stale_id
+    second = WorkerPool(queue, workers=1, poll_interval=0.01, output_dir=str(tmp_path / "out"), runner=runner)
+    second.start()
+    assert queue.get(job_id).status == RUNNING
+    release.set()
+    deadline = time.time() + 5
+    while time.time() < deadline and not (queue.get(job_id).done and queue.get(stale_id).done):
+        time.sleep(0.01)
+    first.stop()
+    second.stop()
+    assert queue.get(job_id).status == SUCCEEDED and queue.get(stale_id).status == SUCCEEDED
+    assert sorted(calls).count(queue.get(job_id).pdf_path) == 1
+
+
+def test_queue_finds_previous_job_for_same_paper_and_settings(tmp_path):
+    """Re-submitting identical inputs can reuse the earlier job; failures are not reused"""
+    queue = JobQueue(str(tmp_path / "jobs.sqlite3"), str(tmp_path / "uploads"))
+    pdf = _pdf(tmp_path)
+    job_id = queue.submit(pdf, language="EN", tone="Formal")
+    digest = queue.get(job_id).input_hash
+
+    assert queue.find(digest, tone="Formal", language="EN").id == job_id
+    assert queue.find(digest, tone="Conversational", language="EN") is None
+    queue.claim("w1")
+    queue.fail(job_id, "boom")
+    assert queue.find(digest, tone="Formal", language="EN") is None
+
+
+def _square(value, delay=0.0):
+    time.sleep(delay)
+    return value * value
+
+
+register_task("test_square", _square)
+
+
+def test_brokers_yield_results_in_submission_order():
+    """Later tasks may finish first, but imap hands results back in order"""
+    for broker in (ThreadBroker(workers=3), ProcessBroker(workers=2)):
+        try:
+            args = [(i, 0.05 * (5 - i)) for i in range(5)]
+            assert [f.result() for f in broker.imap("test_square", args)] == [0, 1, 4, 9, 16]
+        finally:
+            broker.close()
+
+
+def test_remote_broker_round_trip():
+    """Tasks reach a connected worker and failures come back as exceptions"""
+    broker = RemoteBroker(address=("127.0.0.1", 0), authkey="secret", workers=2)
+    stop = threading.Event()
+    worker = threading.Thread(target=serve_worker, args=(broker.address, "secret", 2, stop), daemon=True)
+    worker.start()
+    try:
+        assert [f.result(timeout=10) for f in broker.imap("test_square", [(2,), (3,)])] == [4, 9]
+        with pytest.raises(RuntimeError, match="TypeError"):
+            broker.submit("test_square", None).result(timeout=10)
+    finally:
+        stop.set()
+        worker.join(timeout=5)
+        broker.close()
+
+
+def test_remote_broker_leases_fail_unanswered_tasks():
+    """Without a worker, tasks are resent, then fail; closing fails what is left"""
+    broker = RemoteBroker(address=("127.0.0.1", 0), authkey="secret", task_timeout=0.2, attempts=2)
+    try:
+        start = time.monotonic()
+        with pytest.raises(TimeoutError, match="2 send"):
+            broker.submit("test_square", 2).result(timeout=10)
+        assert time.monotonic() - start >= 0.4
+        broker.task_timeout = 60
+        pending = broker.submit("test_square", 3)
+    finally:
+        broker.close()
+    with pytest.raises(RuntimeError, match="closed"):
+        pending.result(timeout=1)
+
+
+def test_paper_store_indexes_results_and_shares_blobs(tmp_path):
+    """Results are found by paper and parameters; identical audio is stored once"""
+    store = PaperStore(str(tmp_path / "store"))
+    store.put_json("paper", "analysis", {"model": "m"}, {"plan": "p", "steps": ["s"]})
+    assert store.get("paper", "analysis", {"model": "m"}).value["steps"] == ["s"]
+    assert store.get("paper", "analysis", {"model": "other"}) is None
+
+    clip = tmp_path / "clip.wav"
+    clip.write_bytes(b"RIFF" + bytes(100))
+    first = store.put_file("paper", "utterance", {"key": "a"}, str(clip))
+    second = store.put_file("other", "podcast", {"tone": "Formal"}, str(clip), link=False)
+    assert first == second and store.size_bytes() == 104
+    clip.unlink()
+    assert store.get("other", "podcast", {"tone": "Formal"}).path == first
+
+    # The blob survives until no record needs it, then a size cap removes it
+    assert store.forget("paper") == 0
+    assert store.prune(max_bytes=1) == 104
+    assert store.get("other", "podcast", {"tone": "Formal"}) is None
+    assert not os.path.exists(first)
+    assert store.stats()["hits"] == {"analysis": 1, "podcast": 1}
@@ -0,0 +1,204 @@
+"""
+Tests for the end-to-end pipeline: duration budgeting and audio production
+"""
+
+import os
+import json
+import wave
+import pytest
+from functools import partial
+import src.paper_to_voice.pipeline as pipeline
+import src.paper_to_voice.audio.tts as tts
+import src.paper_to_voice.audio.backends as backends
+from src.paper_to_voice.audio.backends import TTSBackend, register_backend
+from src.paper_to_voice.audio.cache import TTSCache
+from src.paper_to_voice.audio.duration import DurationEstimator
+from src.paper_to_voice.audio.encoder import EncoderSettings
+from src.paper_to_voice.audio.pacing import PacingPolicy
+from src.paper_to_voice.audio.processor import consolidate_voice
+from src.paper_to_voice.audio.script import Utterance, VoiceSettings
+from src.paper_to_voice.core.events import EventBus
+from src.paper_to_voice.utils.artifacts import ArtifactManager
+from src.paper_to_voice.utils.workspace import Workspace
+from src.paper_to_voice.workflow.cache import StageCache
+
+SHORT = {"tone": "Formal", "length": "Short (1-2 min)", "language": "EN"}
+
+
+class ToneBackend(TTSBackend):
+    """Writes a tone lasting 0.1 s per word"""
+
+    name = "tone"
+    model = "tone"
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.calls = []
+
+    def synthesize(self, text, speed, accent, language):
+        self.calls.append(text)
+        path = os.path.join(self.directory, f"tone{len(self.calls)}.wav")
+        frames = int(len(text.split()) * 0.1 * 8000)
+        with wave.open(path, "wb") as out:
+            out.setnchannels(1)
+            out.setsampwidth(2)
+            out.setframerate(8000)
+            out.writeframes(b"\x00\x40" * frames)
+        return path
+
+
+def _dialog(turns: int, words: int = 20) -> str:
+    speakers = ["Jane", "Dr. Sharma"]
+    return "\n".join(f"**{speakers[i % 2]}:** " + " ".join(["word"] * words) for i in range(turns))
+
+
+@pytest.fixture
+def estimator(tmp_path, monkeypatch):
+    estimator = DurationEstimator(str(tmp_path / "rates.json"))
+    # 0.9 s per word at speed 1.0: one second per word at the voices' speed 0.9
+    estimator.record(Utterance("Jane", " ".join(["word"] * 10), VoiceSettings("EN-US", 1.0)), "EN", 9.0)
+    monkeypatch.setattr(pipeline, "get_duration_estimator", lambda: estimator)
+    return estimator
+
+
+def test_budget_scripts_share_the_episode_length(estimator, monkeypatch):
+    """An overlong episode is cut to its length, each dialog in proportion to its estimate"""
+    monkeypatch.setattr(pipeline, "DURATION_CONDENSE", False)
+    results = [pipeline.PipelineResult("paper.pdf")]
+
+    parsed = pipeline._budget_scripts([[_dialog(6), _dialog(3)]], [SHORT], results)
+
+    # 180 s estimated for a 120 s episode: 80 s for the first dialog, 40 s for the second
+    assert [len(dialog) for dialog in parsed[0]] == [4, 2]
+    assert parsed[0][0][-1].speaker == "Dr. Sharma"  # the closing turn is kept
+    assert results[0].stats["duration"] == {
+        "target_seconds": 120, "estimated_seconds": 180.0, "budgeted_seconds": 120.0,
+        "condensed": 0, "trimmed_turns": 3,
+    }
+
+    within = pipeline._budget_scripts([[_dialog(6)]], [SHORT], [pipeline.PipelineResult("paper.pdf")])
+    assert len(within[0][0]) == 6
+
+
+def test_budget_scripts_condense_once_per_dialog(estimator, tmp_path, monkeypatch):
+    """Condensed dialogs are memoized, so a rerun makes no LLM calls"""
+    import src.paper_to_voice.workflow.dialog as dialog_module
+
+    calls = []
+
+    def condense_dialog(dialog, estimate, target, words):
+        calls.append((estimate, target))
+        lines = dialog.splitlines()
+        return "\n".join([lines[0], lines[-1]])
+
+    monkeypatch.setattr(dialog_module, "condense_dialog", condense_dialog)
+    stage_cache = StageCache(str(tmp_path / "stages"))
+    for _ in range(2):
+        results = [pipeline.PipelineResult("paper.pdf")]
+        parsed = pipeline._budget_scripts([[_dialog(6), _dialog(3)]], [SHORT], results, stage_cache)
+        assert [len(dialog) for dialog in parsed[0]] == [2, 2]
+        assert results[0].stats["duration"]["condensed"] == 2
+        assert results[0].stats["duration"]["trimmed_turns"] == 0
+    assert sorted(calls) == [(60.0, 40), (120.0, 80)]
+
+
+def test_produce_calibrates_only_new_clips(estimator, tmp_path, monkeypatch):
+    """Clips served by the utterance cache do not count again towards the speaking rate"""
+    backend = ToneBackend(str(tmp_path))
+    register_backend("tone", lambda: backend)
+    monkeypatch.setattr(backends, "TTS_BACKEND", "tone")
+    monkeypatch.setattr(tts, "_default_cache", TTSCache(str(tmp_path / "cache")))
+    monkeypatch.setattr(pipeline, "TEMP_DIR", str(tmp_path))
+    monkeypatch.setattr(pipeline, "consolidate_voice", partial(consolidate_voice, settings=EncoderSettings("wav")))
+    recorded = []
+    monkeypatch.setattr(estimator, "record", lambda utterance, language, seconds: recorded.append(utterance.text))
+
+    voice = VoiceSettings("EN-US", 1.0)
+    utterances = [Utterance("Jane", "welcome back to the show everyone", voice),
+                  Utterance("Jane", "today we read a paper about speech", voice)]
+    manager = ArtifactManager(str(tmp_path / "artifacts"), exclude=())
+    for run in range(2):
+        artifacts = manager.start()
+        workspace = Workspace(root=str(tmp_path / "jobs")).create()
+        result = pipeline.PipelineResult("paper.pdf")
+        pipeline._produce(result, SHORT, utterances, str(tmp_path / f"run{run}.wav"), "", workspace,
+                          artifacts, EventBus(), PacingPolicy(), window=2, streaming=True)
+        manager.finish(artifacts.job_id)
+        assert result.ok, result.warnings
+
+    assert len(backend.calls) == 2
+    assert recorded == [utterance.text for utterance in utterances]
+
+
+class ScriptedLLM:
+    """Answers each workflow prompt with a canned, well-formed response"""
+
+    def __init__(self):
+        self.plans = 0
+
+    def invoke(self, messages):
+        parts = []
+        for message in messages:
+            content = getattr(message, "content", message)
+            parts.extend(content if isinstance(content, list) else [content])
+        prompt = "\n".join(part.get("text", "") if isinstance(part, dict) else str(part) for part in parts)
+        if "parse this data into json" in prompt:
+            content = json.dumps([{"step": "Method", "substeps": [{"key": "Idea", "value": "What is new?"}]}])
+        elif "Questions:" in prompt:
+            content = "What is new?\nAnswer: the method reads papers aloud."
+        elif "Dr. Sharma" in prompt:
+            content = "## Podcast Script\n\nJane: Welcome to the show.\n\nDr. Sharma: Glad to be here today."
+        else:
+            self.plans += 1
+            content = "## Method\n- Idea"
+        return type("Response", (), {"content": content})()
+
+
+def test_run_variants_share_analysis_and_isolate_failures(tmp_path, monkeypatch):
+    """Two variants of a paper come from one analysis, and one failing variant spares the other"""
+    pytest.importorskip("src.paper_to_voice.workflow.orchestrator")
+    import pypdfium2 as pdfium
+    import src.paper_to_voice.core.events as events
+    from src.paper_to_voice.core.config import set_llm_factory
+
+    backend = ToneBackend(str(tmp_path))
+    register_backend("tone", lambda: backend)
+    monkeypatch.setattr(backends, "TTS_BACKEND", "tone")
+    monkeypatch.setattr(tts, "_default_cache", TTSCache(str(tmp_path / "cache")))
+    monkeypatch.setattr(events, "get_stage_history", lambda: events.StageHistory(str(tmp_path / "rates.json")))
+    monkeypatch.setattr(pipeline, "TEMP_DIR", str(tmp_path))
+    monkeypatch.setattr(pipeline, "get_paper_store", lambda: None)
+    monkeypatch.setattr(pipeline, "get_stage_cache", lambda: None)
+    monkeypatch.setattr(pipeline, "get_artifact_manager", lambda: ArtifactManager(str(tmp_path), exclude=()))
+    monkeypatch.setattr(pipeline, "get_duration_estimator", lambda: DurationEstimator(str(tmp_path / "speech.json")))
+    monkeypatch.setattr(pipeline, "Workspace", partial(Workspace, root=str(tmp_path / "jobs")))
+    monkeypatch.setattr(pipeline, "consolidate_voice", partial(consolidate_voice, settings=EncoderSettings("wav")))
+    llm = ScriptedLLM()
+    set_llm_factory(lambda: llm)
+
+    pdf = pdfium.PdfDocument.new()
+    pdf.new_page(60, 80)
+    pdf_path = str(tmp_path / "paper.pdf")
+    pdf.save(pdf_path)
+    blocked = tmp_path / "blocked"
+    blocked.write_text("a file where a directory is needed")
+    variants = [SHORT, {**SHORT, "tone": "Conversational"}]
+    try:
+        formal, conversational = pipeline.run_variants(
+            pdf_path, variants, [str(tmp_path / "out" / "formal.wav"), str(blocked / "conversational.wav")])
+    finally:
+        set_llm_factory(None)
+
+    assert llm.plans == 1
+    assert formal.ok and os.path.exists(formal.output_path), (formal.error, formal.warnings)
+    assert formal.stats["variant"] == SHORT
+    assert not conversational.ok and "blocked" in conversational.error
+
+    try:
+        set_llm_factory(lambda: llm)
+        results = pipeline.run_variants(
+            pdf_path, variants, [str(tmp_path / "out" / f"{name}.wav") for name in ("formal", "conversational")])
+    finally:
+        set_llm_factory(None)
+    assert [os.path.basename(result.output_path) for result in results if result.ok] == \
+        ["formal.wav", "conversational.wav"]
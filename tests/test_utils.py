@@ -0,0 +1,126 @@
+"""
+Tests for utility modules
+"""
+
+import os
+import pytest
+from src.paper_to_voice.utils.artifacts import ArtifactManager
+
+
+def _write(path, size):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"x" * size)
+    return str(path)
+
+
+def test_artifact_manager_cleans_up_jobs(tmp_path):
+    """Intermediates are removed on completion; kept results survive success only"""
+    manager = ArtifactManager(str(tmp_path), quota_bytes=10_000, exclude=())
+
+    with manager.job() as job:
+        page = job.track(_write(tmp_path / "pages" / "Photo_000.jpg", 100))
+        result = job.keep(_write(tmp_path / "voices" / "tmp" / "out.mp3", 50))
+        assert manager.usage()["active_job_bytes"][job.job_id] == 150
+    assert not os.path.exists(page)
+    assert os.path.exists(result)
+
+    with pytest.raises(RuntimeError):
+        with manager.job() as job:
+            failed = job.keep(_write(tmp_path / "voices" / "tmp" / "bad.mp3", 50))
+            raise RuntimeError("synthesis failed")
+    assert not os.path.exists(failed)
+    assert manager.usage()["cleaned_bytes"] == 150
+
+
+def test_artifact_manager_quota_evicts_lru_but_not_active(tmp_path):
+    """Over quota, the oldest files go first and running jobs are protected"""
+    manager = ArtifactManager(str(tmp_path), quota_bytes=250, exclude=(str(tmp_path / "cache"),))
+    old = _write(tmp_path / "old.mp3", 100)
+    newer = _write(tmp_path / "newer.mp3", 100)
+    cached = _write(tmp_path / "cache" / "clip.wav", 500)
+    os.utime(old, (1, 1))
+    os.utime(newer, (2, 2))
+
+    job = manager.start()
+    active = job.track(_write(tmp_path / "active.jpg", 100))
+    os.utime(active, (0, 0))
+    manager.enforce_quota()
+
+    assert not os.path.exists(old)
+    assert os.path.exists(newer) and os.path.exists(active) and os.path.exists(cached)
+    usage = manager.usage()
+    assert usage["used_bytes"] == 200
+    assert usage["evicted_files"] == 1
+    manager.finish(job.job_id)
+    assert not os.path.exists(active)
+
+
+def test_artifact_manager_spares_protected_trees_and_rescans_lazily(tmp_path):
+    """Untracked files under a running job's protected paths survive eviction"""
+    manager = ArtifactManager(str(tmp_path), quota_bytes=250, exclude=())
+    job = manager.start()
+    job.protect(str(tmp_path / "jobs" / job.job_id))
+    job.protect(str(tmp_path / "voices" / "light-guitar.wav"))
+    encoding = _write(tmp_path / "jobs" / job.job_id / "voices" / "tmp" / "out.mp3", 200)
+    tone = _write(tmp_path / "voices" / "light-guitar.wav", 100)
+    old = _write(tmp_path / "voices" / "old.mp3", 100)
+    for path in (encoding, tone, old):
+        os.utime(path, (1, 1))
+
+    # Under quota and recently scanned: no walk, so the new files go unnoticed
+    assert manager.enforce_quota() == 0 and manager.usage()["used_bytes"] == 0
+    assert manager.enforce_quota(rescan=True) == 100
+    assert os.path.exists(encoding) and os.path.exists(tone) and not os.path.exists(old)
+    manager.finish(job.job_id)
+
+
+def test_artifact_leases_protect_across_managers(tmp_path):
+    """A quota pass in another process spares paths leased by a running job"""
+    owner = ArtifactManager(str(tmp_path), quota_bytes=10_000, exclude=())
+    other = ArtifactManager(str(tmp_path), quota_bytes=150, exclude=())
+    job = owner.start()
+    job.protect(str(tmp_path / "jobs" / job.job_id))
+    clip = _write(tmp_path / "jobs" / job.job_id / "clips" / "00000.wav", 100)
+    old = _write(tmp_path / "voices" / "old.mp3", 100)
+    for path in (clip, old):
+        os.utime(path, (1, 1))
+
+    assert other.enforce_quota(rescan=True) == 100
+    assert os.path.exists(clip) and not os.path.exists(old)
+
+    # A lease that is no longer renewed lapses, as when its process died
+    for lease in job.leases:
+        os.utime(lease, (1, 1))
+    _write(tmp_path / "voices" / "new.mp3", 100)
+    assert other.enforce_quota(rescan=True) == 100
+    assert not os.path.exists(clip) and not os.listdir(tmp_path / ".leases")
+    owner.finish(job.job_id)
+
+
+def test_workspaces_isolate_concurrent_jobs(tmp_path):
+    """Jobs render identically named pages into their own workspaces"""
+    import pypdfium2 as pdfium
+    from concurrent.futures import ThreadPoolExecutor
+    from src.paper_to_voice.utils.pdf_processor import process_pdf
+    from src.paper_to_voice.utils.workspace import Workspace
+
+    pdf = pdfium.PdfDocument.new()
+    for _ in range(2):
+        pdf.new_page(60, 80)
+    pdf_path = str(tmp_path / "paper.pdf")
+    pdf.save(pdf_path)
+
+    workspaces = [Workspace(root=str(tmp_path / "jobs")).create() for _ in range(3)]
+
+    def render(workspace):
+        return process_pdf(workspace.add_input(pdf_path), workspace.pages_dir)
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        pages = list(executor.map(render, workspaces))
+
+    assert pages == [["Photo_000.jpg", "Photo_001.jpg"]] * 3
+    for workspace in workspaces:
+        assert sorted(os.listdir(workspace.pages_dir)) == ["Photo_000.jpg", "Photo_001.jpg"]
+        assert os.listdir(workspace.input_dir) == ["paper.pdf"]
+    workspaces[0].cleanup()
+    assert not os.path.exists(workspaces[0].root) and os.path.exists(workspaces[1].root)
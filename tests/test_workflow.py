@@ -0,0 +1,55 @@
+"""
+Tests for workflow modules that do not need the LLM stack
+"""
+
+import pytest
+from src.paper_to_voice.workflow.cache import StageCache, analysis_key, dialog_key
+from src.paper_to_voice.workflow.sections import use_map_reduce, split_sections, step_images
+from src.paper_to_voice.cli import parse_variant
+from src.paper_to_voice.pipeline import variant_name
+
+
+def test_stage_cache_keys_dialogs_by_analysis_and_settings(tmp_path):
+    """A new tone misses only the dialog; a new analysis invalidates its dialogs"""
+    cache = StageCache(str(tmp_path))
+    paper = analysis_key("paper-hash")
+    assert paper != analysis_key("paper-hash", model="other-model")
+    assert cache.get("analysis", paper) is None
+
+    analysis = {"plan": [{"step": "A", "substeps": []}], "steps": ["A"], "solutions": ["answer"]}
+    cache.put("analysis", paper, analysis)
+    formal = dialog_key(paper, "A", "answer", "Formal", "Short (1-2 min)", "EN")
+    cache.put("dialog", formal, "Jane: Hello")
+
+    assert cache.get("analysis", paper) == analysis
+    assert cache.get("dialog", formal) == "Jane: Hello"
+    assert cache.get("dialog", dialog_key(paper, "A", "answer", "Conversational", "Short (1-2 min)", "EN")) is None
+    assert cache.get("dialog", dialog_key(paper, "A", "new answer", "Formal", "Short (1-2 min)", "EN")) is None
+    assert cache.stats() == {"hits": {"analysis": 1, "dialog": 1}, "misses": {"analysis": 1, "dialog": 2}}
+
+
+def test_map_reduce_sections_limit_pages_per_step():
+    """Long documents split into sections; steps get only their sections' pages"""
+    assert not use_map_reduce(10, min_pages=24) and use_map_reduce(120, min_pages=24)
+    assert not use_map_reduce(500, min_pages=0)
+
+    sections = split_sections(20, pages_per_section=8)
+    assert [(s["index"], s["first"], s["last"]) for s in sections] == [(1, 0, 7), (2, 8, 15), (3, 16, 19)]
+
+    images = [f"page-{i}" for i in range(20)]
+    assert step_images({"step": "A", "sections": [3, "1", 3]}, sections, images) == images[:8] + images[16:]
+    # Missing or unusable references fall back to the whole document
+    assert step_images({"step": "B"}, sections, images) == images
+    assert step_images({"step": "C", "sections": [9, "x"]}, sections, images) == images
+
+
+def test_variants_parse_from_abbreviations():
+    """CLI variants accept option prefixes and name their output files"""
+    variant = parse_variant("conv:med:en")
+    assert variant == {"tone": "Conversational", "length": "Medium (3-5 min)", "language": "EN"}
+    assert variant_name(variant) == "conversational-medium-en"
+    assert parse_variant("Formal:s")["language"] == "EN"
+    with pytest.raises(ValueError):
+        parse_variant("formal")
+    with pytest.raises(ValueError, match="language"):
+        parse_variant("formal:short:FR")